@@ -3,6 +3,8 @@ import pandas as pd
 import numpy as np
 import altair as alt
 import math
+from scipy.stats import poisson
+from modulos.triage import CATEGORIAS_START, gerar_fluxo_vitimas, agregar_chegadas
 
 # =============================================================================
 # 1. FUNÇÕES MATEMÁTICAS (TEORIA DAS FILAS M/M/s)
@@ -28,14 +30,37 @@ def calcular_probabilidade_espera(s, rho):
     Retorna:
     - Probabilidade de espera (0-1)
     """
-    if rho >= 1: 
+    if rho >= 1:
         return 1.0  # Sistema saturado, probabilidade de espera é 100%
-    
-    # Fórmula de Erlang-C simplificada
-    # P(W > 0) = (rho^s) / (s! * (1 - rho)) / [soma de (rho^n)/n! para n=0 até s-1 + termo acima]
-    pw = (rho ** s) / (math.factorial(s) * (1 - rho))
-    divisor = sum([(rho ** n) / math.factorial(n) for n in range(s)]) + pw
-    return min(pw / divisor, 1.0)
+
+    # Erlang-C com carga oferecida a = lambda/mu = s × rho
+    return float(calcular_erlang_c(s, s * rho))
+
+def calcular_erlang_c(s, carga_oferecida):
+    """
+    Fórmula de Erlang-C vetorizada e numericamente estável.
+
+    Usa a recursão de Erlang-B, B(0) = 1 e B(k) = a·B(k-1) / (k + a·B(k-1)),
+    que evita fatoriais e potências grandes (estável para milhares de leitos), e
+    converte para Erlang-C: C = s·B / (s - a·(1 - B)).
+
+    Parâmetros:
+    - s: Número de servidores (escalar ou array de inteiros)
+    - carga_oferecida: a = taxa_chegada / cap_atendimento (escalar ou array)
+
+    Retorna:
+    - Probabilidade de espera P(W > 0) com o formato do broadcast das entradas
+      (1.0 onde a >= s, sistema saturado)
+    """
+    s, a = np.broadcast_arrays(np.asarray(s, dtype=int), np.asarray(carga_oferecida, dtype=float))
+    erlang_b = np.ones(s.shape)
+    for k in range(1, int(s.max(initial=0)) + 1):
+        ativo = k <= s
+        erlang_b = np.where(ativo, a * erlang_b / (k + a * erlang_b), erlang_b)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        erlang_c = s * erlang_b / (s - a * (1 - erlang_b))
+    return np.where(a >= s, 1.0, np.clip(erlang_c, 0.0, 1.0))
 
 def simular_fila_hospitalar(taxa_chegada, cap_atendimento, num_leitos):
     """
@@ -96,8 +121,376 @@ def simular_fila_hospitalar(taxa_chegada, cap_atendimento, num_leitos):
         "deficit": 0
     }
 
+def classificar_ocupacao(rho):
+    """
+    Classifica a taxa de ocupação nos níveis operacionais usados pelo módulo.
+
+    Aceita escalar ou array NumPy (classificação vetorizada para redes de hospitais).
+
+    Parâmetros:
+    - rho: Taxa de ocupação (escalar ou array)
+
+    Retorna:
+    - Status (string) ou array de status
+    """
+    rho = np.asarray(rho, dtype=float)
+    status = np.select(
+        [rho >= 1.0, rho >= 0.95, rho >= 0.85, rho >= 0.7],
+        ["COLAPSO TOTAL", "CRÍTICO", "SATURAÇÃO IMINENTE", "ATENÇÃO"],
+        default="OPERACIONAL"
+    )
+    return status.item() if status.ndim == 0 else status
+
+def simular_fila_transiente(taxa_chegada, cap_atendimento, num_leitos, tempos_h,
+                            pacientes_iniciais=0, tolerancia=1e-10):
+    """
+    Resolve o M/M/s fora do regime estacionário (solução transiente) por uniformização.
+
+    As fórmulas de Erlang-C só valem em equilíbrio com rho < 1. Em incidentes com
+    vítimas em massa o sistema parte vazio e pode ficar sobrecarregado (rho >= 1).
+    Aqui a cadeia de nascimento e morte é truncada em N estados, com taxas
+    lambda (nascimento) e mu·min(n, s) (morte), e a distribuição no tempo t é
+
+        p(t) = Σ_k Poisson(k; Λt) · p(0)·P^k,   P = I + Q/Λ,   Λ = lambda + s·mu
+
+    O produto p(0)·P^k é tridiagonal (custo O(N) por termo) e a soma é feita para
+    todos os instantes de uma vez, usando a matriz de pesos de Poisson (termos × tempos).
+
+    Parâmetros:
+    - taxa_chegada: Taxa de chegada (vítimas/hora)
+    - cap_atendimento: Capacidade por leito (vítimas/hora)
+    - num_leitos: Número de leitos/equipes
+    - tempos_h: Instantes de avaliação (horas)
+    - pacientes_iniciais: Pacientes no sistema em t = 0
+    - tolerancia: Massa de probabilidade de Poisson desprezada na cauda
+
+    Retorna:
+    - DataFrame com P(espera > 0)(t), fila média e pacientes no sistema por instante
+    - Matriz (estados × tempos) com a distribuição do número de pacientes no sistema
+    """
+    tempos_h = np.atleast_1d(np.asarray(tempos_h, dtype=float))
+    s = int(num_leitos)
+    lam, mu = float(taxa_chegada), float(cap_atendimento)
+    t_max = tempos_h.max(initial=0.0)
+
+    # Truncamento: cobre o crescimento determinístico da fila mais ~10 desvios-padrão
+    excesso = max(lam - s * mu, 0.0) * t_max
+    n_estados = int(s + pacientes_iniciais + excesso + 10 * math.sqrt(lam * t_max + 1) + 50)
+    n = np.arange(n_estados + 1)
+
+    nascimento = np.where(n < n_estados, lam, 0.0)
+    morte = mu * np.minimum(n, s)
+    taxa_unif = max(lam + s * mu, 1e-12)
+    permanencia = 1.0 - (nascimento + morte) / taxa_unif
+
+    # Pesos de Poisson para todos os termos e instantes (termos × tempos)
+    medias = taxa_unif * tempos_h
+    k_max = int(poisson.ppf(1 - tolerancia, medias.max(initial=0.0))) + 1
+    pesos = poisson.pmf(np.arange(k_max + 1)[:, None], medias[None, :])
+
+    v = np.zeros(n_estados + 1)
+    v[min(int(pacientes_iniciais), n_estados)] = 1.0
+    distribuicao = np.zeros((n_estados + 1, tempos_h.size))
+    for k in range(k_max + 1):
+        distribuicao += np.outer(v, pesos[k])
+        # v ← v·P (matriz tridiagonal de transição uniformizada)
+        v_novo = v * permanencia
+        v_novo[1:] += v[:-1] * nascimento[:-1] / taxa_unif
+        v_novo[:-1] += v[1:] * morte[1:] / taxa_unif
+        v = v_novo
+
+    distribuicao /= distribuicao.sum(axis=0, keepdims=True)
+    df_transiente = pd.DataFrame({
+        'Horas após o Início': tempos_h,
+        'Probabilidade de Espera (%)': distribuicao[n >= s].sum(axis=0) * 100,
+        'Pacientes Aguardando': np.maximum(n - s, 0) @ distribuicao,
+        'Pacientes no Sistema': n @ distribuicao
+    })
+    return df_transiente, distribuicao
+
+# =============================================================================
+# 2. DIMENSIONAMENTO INVERSO (LEITOS MÍNIMOS PARA UMA META DE SERVIÇO)
+# =============================================================================
+# Pergunta do planejador: "quantos leitos são necessários para que a espera média
+# fique abaixo de X minutos?". Wq(s) e P(W>0)(s) são monótonas decrescentes em s,
+# então o menor s que atende a meta é a primeira raiz da condição ao percorrer s
+# a partir do mínimo estável (s > a). A recursão de Erlang-B avança um servidor
+# por iteração para todos os cenários ao mesmo tempo, e cada cenário é congelado
+# assim que atinge a meta (busca monótona vetorizada, custo O(s_max) no lote).
+
+def dimensionar_leitos(taxas_chegada, cap_atendimento, espera_alvo_min=None,
+                       prob_espera_alvo=None, s_max=5000):
+    """
+    Calcula o número mínimo de leitos/equipes que atende a meta de serviço
+    para cada taxa de chegada de um lote de cenários.
+
+    Parâmetros:
+    - taxas_chegada: Taxas de chegada (vítimas/hora), escalar ou array
+    - cap_atendimento: Capacidade por leito (vítimas/hora), escalar ou array
+    - espera_alvo_min: Meta de tempo médio de espera na fila Wq (minutos)
+    - prob_espera_alvo: Meta de probabilidade de espera P(W>0) (0-1)
+    - s_max: Limite superior de busca (cenários sem solução retornam NaN)
+
+    Retorna:
+    - DataFrame com a curva de dimensionamento (leitos mínimos, ocupação,
+      espera média e probabilidade de espera resultantes por cenário)
+    """
+    if espera_alvo_min is None and prob_espera_alvo is None:
+        raise ValueError("Informe espera_alvo_min e/ou prob_espera_alvo.")
+
+    taxas_chegada, mu = np.broadcast_arrays(np.atleast_1d(np.asarray(taxas_chegada, dtype=float)),
+                                            np.asarray(cap_atendimento, dtype=float))
+    carga = taxas_chegada / mu
+
+    leitos_min = np.full(carga.shape, np.nan)
+    prob_final = np.full(carga.shape, np.nan)
+    erlang_b = np.ones(carga.shape)
+    pendente = np.ones(carga.shape, dtype=bool)
+
+    for s in range(1, s_max + 1):
+        erlang_b = carga * erlang_b / (s + carga * erlang_b)
+        estavel = pendente & (s > carga)
+        if not estavel.any():
+            continue
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prob = s * erlang_b / (s - carga * (1 - erlang_b))
+            espera_min = prob / (s * mu - taxas_chegada) * 60
+
+        atende = estavel.copy()
+        if espera_alvo_min is not None:
+            atende &= espera_min <= espera_alvo_min
+        if prob_espera_alvo is not None:
+            atende &= prob <= prob_espera_alvo
+
+        leitos_min[atende] = s
+        prob_final[atende] = prob[atende]
+        pendente &= ~atende
+        if not pendente.any():
+            break
+
+    capacidade = leitos_min * mu
+    with np.errstate(divide='ignore', invalid='ignore'):
+        espera_final = prob_final / (capacidade - taxas_chegada) * 60
+
+    return pd.DataFrame({
+        'Taxa de Chegada (vítimas/hora)': taxas_chegada,
+        'Leitos Mínimos': leitos_min,
+        'Ocupação (ρ)': taxas_chegada / capacidade,
+        'Espera Média (min)': espera_final,
+        'Probabilidade de Espera (%)': prob_final * 100
+    })
+
+# =============================================================================
+# 3. REDE REGIONAL DE HOSPITAIS (ROTEAMENTO E BALANCEAMENTO DE CARGA)
+# =============================================================================
+# Rede de filas M/M/s transientes: cada hospital i tem s_i leitos, taxa de
+# serviço mu_i e uma distribuição p_i(n, t) do número de pacientes no sistema.
+# A cada passo dt:
+#   - chegadas saem dos pontos de origem e entram em trânsito (tempo de viagem)
+#   - as que chegam ao hospital definem a taxa de Poisson lambda_i do passo
+#   - p_i evolui pela cadeia de nascimento (lambda_i) e morte (mu_i·min(n, s_i)),
+#     a mesma de simular_fila_transiente, em subpassos uniformizados
+#   - fila = E[max(0, n - s_i)], ocupação = E[n]/s_i
+# Assim a rede forma fila também abaixo da saturação (rho < 1), como o M/M/s de
+# hospital único, e converge para o Erlang-C quando as chegadas se estabilizam.
+# Referências: Gross & Harris (1998); Jacobson et al. (2012)
+
+FRACAO_REPARTICAO_LEITOS = 0.1  # Peso mínimo de cada hospital na repartição, por leito
+
+POLITICAS_ROTEAMENTO = {
+    "Hospital Mais Próximo": "proximo",
+    "Menor Carga (Balanceamento)": "menor_carga",
+    "Compatível com Capacidade (Graves → Referência)": "capacidade"
+}
+
+def _repartir_por_folga(folga, leitos, permitido):
+    """
+    Fração das chegadas destinada a cada hospital, proporcional aos leitos livres.
+
+    Uma parcela mínima proporcional aos leitos (FRACAO_REPARTICAO_LEITOS) evita
+    que todo o volume vá ao único hospital com folga residual quando a rede
+    satura, e torna a repartição proporcional aos leitos quando não há folga.
+
+    Parâmetros:
+    - folga: Leitos livres por hospital (leitos - sistema - trânsito), pode ser negativa
+    - leitos: Leitos/equipes por hospital
+    - permitido: Máscara booleana (hospitais,) de destinos aceitos
+
+    Retorna:
+    - Array (hospitais,) de frações que somam 1
+    """
+    if not permitido.any():
+        permitido = np.ones_like(permitido)
+    pesos = np.where(permitido, np.maximum(folga, 0.0) + FRACAO_REPARTICAO_LEITOS * np.maximum(leitos, 1e-9), 0.0)
+    return pesos / pesos.sum()
+
+def _escolher_destino(custo, permitido):
+    """
+    Escolhe, para cada origem, o hospital de menor custo entre os permitidos.
+
+    Parâmetros:
+    - custo: Matriz (origens × hospitais) de custo de roteamento
+    - permitido: Máscara booleana (hospitais,) de destinos aceitos
+
+    Retorna:
+    - Índice do hospital escolhido para cada origem
+    """
+    if not permitido.any():
+        permitido = np.ones_like(permitido)
+    return np.argmin(np.where(permitido[None, :], custo, np.inf), axis=1)
+
+def simular_rede_hospitalar(taxas_chegada, num_leitos, cap_atendimento, tempos_viagem_min,
+                            politica="proximo", referencia=None, fracao_graves=0.2,
+                            horizonte_h=12.0, dt_h=1/60, intervalo_taxas_h=1.0):
+    """
+    Simula uma rede regional de N hospitais recebendo vítimas de K pontos de origem.
+
+    As vítimas são roteadas a cada passo de tempo segundo a política escolhida e
+    chegam ao hospital após o tempo de viagem da matriz. O estado de todos os
+    hospitais é atualizado de forma vetorizada (arrays NumPy de tamanho N).
+
+    Políticas:
+    - proximo: cada origem envia ao hospital de menor tempo de viagem
+    - menor_carga: reparte as chegadas entre os hospitais na proporção dos leitos
+      livres (leitos - sistema - trânsito); sem folga, na proporção dos leitos
+    - capacidade: vítimas graves são repartidas entre os hospitais de referência
+      e as demais entre os gerais, pela mesma regra (preservando os centros de referência)
+
+    Parâmetros:
+    - taxas_chegada: Taxa de chegada por ponto de origem (vítimas/hora), tamanho K,
+      ou perfil variável no tempo (intervalos × K), constante por intervalo e nulo
+      após o último (ex.: contagens de agregar_chegadas convertidas em taxa)
+    - num_leitos: Leitos/equipes por hospital, tamanho N
+    - cap_atendimento: Capacidade por leito (vítimas/hora), escalar ou tamanho N
+    - tempos_viagem_min: Matriz K × N de tempos de viagem (minutos)
+    - politica: "proximo", "menor_carga" ou "capacidade"
+    - referencia: Máscara booleana (N) de hospitais de referência (trauma/UTI)
+    - fracao_graves: Fração das chegadas que exige hospital de referência (0-1)
+    - horizonte_h: Horizonte de simulação em horas
+    - dt_h: Passo de tempo em horas
+    - intervalo_taxas_h: Largura de cada intervalo do perfil de taxas (horas)
+
+    Retorna:
+    - Dicionário com evolução temporal (DataFrame), tempo de entrada em "CRÍTICO"
+      por hospital (horas, NaN se não atingido), espera regional total
+      (paciente-horas) e espera média por vítima (minutos)
+    """
+    taxas_chegada = np.asarray(taxas_chegada, dtype=float)
+    perfil = taxas_chegada if taxas_chegada.ndim == 2 else np.atleast_1d(taxas_chegada)[None, :]
+    num_leitos = np.atleast_1d(np.asarray(num_leitos, dtype=float))
+    n_hosp = num_leitos.size
+    mu = np.broadcast_to(np.asarray(cap_atendimento, dtype=float), (n_hosp,))
+    tempos_viagem_min = np.asarray(tempos_viagem_min, dtype=float).reshape(perfil.shape[1], n_hosp)
+    if referencia is None:
+        referencia = np.ones(n_hosp, dtype=bool)
+    referencia = np.asarray(referencia, dtype=bool)
+
+    n_passos = int(round(horizonte_h / dt_h))
+
+    # Chegadas de cada passo (passos × origens): taxa constante ou perfil por intervalo
+    if taxas_chegada.ndim == 2:
+        intervalo = (np.arange(n_passos) * dt_h / intervalo_taxas_h + 1e-9).astype(int)
+        chegadas_passos = np.where((intervalo < len(perfil))[:, None],
+                                   perfil[np.minimum(intervalo, len(perfil) - 1)], 0.0) * dt_h
+    else:
+        chegadas_passos = np.broadcast_to(perfil * dt_h, (n_passos, perfil.shape[1]))
+
+    # Trânsito modelado como buffer circular: chegadas agendadas em (passo + atraso)
+    atrasos = np.maximum(1, np.round(tempos_viagem_min / 60 / dt_h).astype(int))
+    tamanho_buffer = atrasos.max() + 1
+    em_transito = np.zeros((tamanho_buffer, n_hosp))
+
+    if politica not in POLITICAS_ROTEAMENTO.values():
+        raise ValueError(f"Política de roteamento desconhecida: {politica}")
+
+    # Distribuição do número de pacientes em cada hospital (hospitais × estados),
+    # truncada acima do total de chegadas com folga de ~10 desvios-padrão
+    leitos = np.maximum(np.round(num_leitos).astype(int), 1)
+    total_chegadas = float(chegadas_passos.sum())
+    n_estados = int(leitos.max() + total_chegadas + 10 * math.sqrt(total_chegadas + 1) + 50)
+    n = np.arange(n_estados + 1)
+    morte = mu[:, None] * np.minimum(n[None, :], leitos[:, None])
+    aguardando = np.maximum(n[None, :] - leitos[:, None], 0)
+    distribuicao = np.zeros((n_hosp, n_estados + 1))
+    distribuicao[:, 0] = 1.0
+
+    transporte_acumulado = 0.0
+    tempo_critico = np.full(n_hosp, np.nan)
+    historico_fila = np.zeros((n_passos + 1, n_hosp))
+    historico_ocupacao = np.zeros((n_passos + 1, n_hosp))
+    no_sistema = np.zeros(n_hosp)
+    todos = np.ones(n_hosp, dtype=bool)
+    if politica == "proximo":
+        repartir_proximo = np.zeros((perfil.shape[1], n_hosp))
+        repartir_proximo[np.arange(perfil.shape[1]), _escolher_destino(tempos_viagem_min, todos)] = 1.0
+
+    for passo in range(1, n_passos + 1):
+        chegadas_passo = chegadas_passos[passo - 1]
+        # 1. Roteamento das chegadas deste passo (volumes origens × hospitais)
+        if politica == "proximo":
+            volumes = chegadas_passo[:, None] * repartir_proximo
+        else:
+            folga = num_leitos - no_sistema - em_transito.sum(axis=0)
+            if politica == "menor_carga":
+                volumes = np.outer(chegadas_passo, _repartir_por_folga(folga, num_leitos, todos))
+            else:
+                volumes = (np.outer(chegadas_passo * fracao_graves,
+                                    _repartir_por_folga(folga, num_leitos, referencia))
+                           + np.outer(chegadas_passo * (1 - fracao_graves),
+                                      _repartir_por_folga(folga, num_leitos, ~referencia)))
+
+        np.add.at(em_transito, ((passo + atrasos) % tamanho_buffer, np.arange(n_hosp)[None, :]), volumes)
+        transporte_acumulado += float(np.sum(volumes * atrasos)) * dt_h
+
+        # 2. Vítimas que chegam ao hospital neste passo (taxa de Poisson do passo)
+        indice = passo % tamanho_buffer
+        lam = em_transito[indice] / dt_h
+        em_transito[indice] = 0.0
+
+        # 3. Nascimento e morte em subpassos uniformizados, (lambda + s·mu)·h <= 0.5
+        nascimento = np.where(n[None, :] < n_estados, lam[:, None], 0.0)
+        subpassos = max(1, math.ceil(2 * float(np.max(lam + leitos * mu)) * dt_h))
+        h = dt_h / subpassos
+        for _ in range(subpassos):
+            fluxo_nasc = distribuicao * nascimento * h
+            fluxo_morte = distribuicao * morte * h
+            distribuicao = distribuicao - fluxo_nasc - fluxo_morte
+            distribuicao[:, 1:] += fluxo_nasc[:, :-1]
+            distribuicao[:, :-1] += fluxo_morte[:, 1:]
+
+        no_sistema = distribuicao @ n
+        ocupacao = no_sistema / np.maximum(num_leitos, 1)
+        novos_criticos = np.isnan(tempo_critico) & (ocupacao >= 0.95)
+        tempo_critico[novos_criticos] = passo * dt_h
+
+        historico_fila[passo] = (distribuicao * aguardando).sum(axis=1)
+        historico_ocupacao[passo] = ocupacao
+
+    espera_acumulada = historico_fila[1:].sum(axis=0) * dt_h
+
+    tempos = np.arange(n_passos + 1) * dt_h
+    df_evolucao = pd.DataFrame({
+        'Horas após o Início': np.repeat(tempos, n_hosp),
+        'Hospital': np.tile(np.arange(1, n_hosp + 1), n_passos + 1),
+        'Pacientes Aguardando': historico_fila.ravel(),
+        'Ocupação': historico_ocupacao.ravel()
+    })
+
+    espera_total_h = float(espera_acumulada.sum())
+
+    return {
+        "df_evolucao": df_evolucao,
+        "tempo_critico_h": tempo_critico,
+        "espera_por_hospital_h": espera_acumulada,
+        "espera_total_h": espera_total_h,
+        "espera_media_min": espera_total_h / total_chegadas * 60 if total_chegadas > 0 else 0.0,
+        "transporte_total_h": transporte_acumulado,
+        "status_final": classificar_ocupacao(historico_ocupacao[-1])
+    }
+
 # =============================================================================
-# 2. INTERFACE VISUAL
+# 4. INTERFACE VISUAL
 # =============================================================================
 def renderizar():
     st.title("Gestão de Colapso Hospitalar")
@@ -272,30 +665,13 @@ def renderizar():
     st.markdown("---")
     st.markdown("#### Projeção de Acúmulo de Fila (Próximas 12 Horas)")
     
-    horas = np.arange(0, 13, 1)
+    horas = np.arange(0, 12.5, 0.5)
     
-    # Simulação de acúmulo de fila ao longo do tempo
-    # Se taxa_chegada > capacidade_total, a fila cresce linearmente
-    # Se taxa_chegada <= capacidade_total, a fila se estabiliza ou diminui
+    # Solução transiente do M/M/s (uniformização) a partir do sistema vazio.
+    # Vale também em sobrecarga (rho >= 1), quando a fila cresce sem limite.
     capacidade_total = resultado['capacidade_total']
-    deficit = taxa_vimas - capacidade_total
-    
-    pacientes_aguardando = []
-    for h in horas:
-        if deficit > 0:
-            # Sistema em colapso: fila cresce linearmente
-            acumulo = deficit * h
-        else:
-            # Sistema estável: fila se estabiliza (usando modelo de fila M/M/s)
-            # Aproximação: fila se estabiliza em um valor baseado na probabilidade de espera
-            if resultado['prob_espera'] > 0:
-                # Fila média em regime estacionário
-                fila_media = (resultado['prob_espera'] / 100) * (taxa_vimas / (capacidade_total - taxa_vimas)) if (capacidade_total - taxa_vimas) > 0 else 0
-                # Simulação de convergência exponencial
-                acumulo = fila_media * (1 - np.exp(-h / 2))  # Converge em ~6 horas
-            else:
-                acumulo = 0
-        pacientes_aguardando.append(max(0, acumulo))
+    df_transiente, _ = simular_fila_transiente(taxa_vimas, cap_mu, leitos_efetivos, horas)
+    pacientes_aguardando = df_transiente['Pacientes Aguardando'].to_numpy()
     
     df_projecao = pd.DataFrame({
         'Horas após o Início': horas,
@@ -333,6 +709,18 @@ def renderizar():
               "A linha azul mostra as chegadas acumuladas. A linha verde tracejada mostra a capacidade total de processamento. "
               "Quando a linha vermelha cresce indefinidamente, o sistema está em colapso.")
 
+    chart_prob = alt.Chart(df_transiente).mark_area(opacity=0.5, color='#e74c3c', line=True).encode(
+        x=alt.X('Horas após o Início:Q', title='Horas após o Início do Incidente'),
+        y=alt.Y('Probabilidade de Espera (%):Q', title='P(Espera > 0) (%)', scale=alt.Scale(domain=[0, 100])),
+        tooltip=['Horas após o Início:Q', alt.Tooltip('Probabilidade de Espera (%):Q', format='.1f'),
+                 alt.Tooltip('Pacientes no Sistema:Q', format='.1f')]
+    ).properties(height=250, title="Probabilidade de Espera ao Longo do Tempo (Solução Transiente)")
+    st.altair_chart(chart_prob, use_container_width=True)
+
+    st.caption("**Solução Transiente:** As curvas são obtidas da distribuição exata do número de pacientes no tempo "
+               "(cadeia de nascimento e morte resolvida por uniformização), partindo do hospital vazio. "
+               "Ao contrário das fórmulas de equilíbrio, valem também nas primeiras horas e em sobrecarga (ρ ≥ 1).")
+
     # --- RECOMENDAÇÕES OPERACIONAIS ---
     st.markdown("---")
     st.markdown("### Recomendações Operacionais")
@@ -398,7 +786,152 @@ def renderizar():
     if resultado['prob_espera'] > 50:
         st.warning("**ALTA PROBABILIDADE DE ESPERA:** Mais de 50% dos pacientes encontrarão todos os leitos ocupados. "
                   "Isso indica necessidade urgente de aumentar a capacidade do sistema.")
-    
+
+    # --- DIMENSIONAMENTO INVERSO ---
+    st.markdown("---")
+    st.markdown("### Dimensionamento Mínimo de Leitos/Equipes")
+    st.caption("Responde à pergunta inversa: quantos leitos são necessários para cumprir uma meta de espera, "
+               "para toda uma faixa de taxas de chegada de uma só vez.")
+
+    col_dim1, col_dim2 = st.columns(2)
+    with col_dim1:
+        meta_espera = st.number_input(
+            "Meta de Espera Média (minutos)", min_value=1.0, value=30.0, step=5.0,
+            help="Tempo médio máximo aceitável na fila antes do atendimento."
+        )
+    with col_dim2:
+        meta_prob = st.slider(
+            "Meta de Probabilidade de Espera (%)", 1, 100, 100, step=1,
+            help="Probabilidade máxima de uma vítima encontrar todos os leitos ocupados. 100% = sem restrição."
+        ) / 100
+
+    taxas_faixa = np.arange(1, max(2 * taxa_vimas, 20) + 1)
+    df_curva = dimensionar_leitos(taxas_faixa, cap_mu, espera_alvo_min=meta_espera,
+                                  prob_espera_alvo=meta_prob if meta_prob < 1 else None)
+    leitos_atual = df_curva.loc[df_curva['Taxa de Chegada (vítimas/hora)'] == taxa_vimas, 'Leitos Mínimos'].iloc[0]
+
+    d1, d2 = st.columns(2)
+    d1.metric("Leitos Mínimos para a Taxa Atual", f"{leitos_atual:.0f}",
+              f"{leitos_atual - leitos_efetivos:+.0f} em relação ao disponível", delta_color="inverse",
+              help="Menor número de leitos/equipes que atende as metas para a taxa de chegada informada.")
+    d2.metric("Faixa Analisada", f"1 a {int(taxas_faixa[-1])} vítimas/hora",
+              help="Curva calculada em uma única chamada para todas as taxas de chegada da faixa.")
+
+    chart_curva = alt.Chart(df_curva).mark_line(point=True, interpolate='step-after').encode(
+        x=alt.X('Taxa de Chegada (vítimas/hora):Q'),
+        y=alt.Y('Leitos Mínimos:Q'),
+        tooltip=['Taxa de Chegada (vítimas/hora):Q', 'Leitos Mínimos:Q',
+                 alt.Tooltip('Espera Média (min):Q', format='.1f'),
+                 alt.Tooltip('Probabilidade de Espera (%):Q', format='.1f')]
+    ).properties(height=300, title="Curva Mínima de Dimensionamento")
+    st.altair_chart(chart_curva, use_container_width=True)
+
+    # --- REDE REGIONAL ---
+    st.markdown("---")
+    st.markdown("### Rede Regional de Hospitais (Transbordo)")
+    st.caption("Distribui a taxa de chegada informada acima entre vários hospitais, considerando tempo de viagem "
+               "e política de despacho das ambulâncias. O tempo de viagem é medido a partir do ponto de triagem.")
+
+    df_hospitais_padrao = pd.DataFrame({
+        'Hospital': ["Hospital Central", "Hospital Norte", "Hospital Sul", "UPA Leste"],
+        'Leitos/Equipes': [leitos_efetivos, 8, 6, 4],
+        'Tempo Atendimento (min)': [tempo_atendimento, 40, 40, 25],
+        'Tempo de Viagem (min)': [10, 20, 25, 15],
+        'Referência (Trauma/UTI)': [True, True, False, False]
+    })
+    df_hospitais = st.data_editor(
+        df_hospitais_padrao,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key="rede_hospitais"
+    ).dropna()
+
+    col_rede1, col_rede2 = st.columns(2)
+    with col_rede1:
+        politica_nome = st.selectbox(
+            "Política de Roteamento",
+            list(POLITICAS_ROTEAMENTO.keys()),
+            help="Critério usado pela regulação para escolher o hospital de destino de cada vítima."
+        )
+    with col_rede2:
+        fracao_graves = st.slider(
+            "Fração de Vítimas Graves (%)", 0, 100, 20, step=5,
+            help="Usado pela política 'Compatível com Capacidade': graves só vão para hospitais de referência."
+        ) / 100
+
+    # Perfil de chegada: taxa constante ou fluxo estocástico do módulo de Triagem
+    perfil_chegada = st.radio(
+        "Perfil de Chegada à Rede",
+        ["Taxa Constante", "Fluxo Estocástico da Triagem"],
+        horizontal=True,
+        help="O fluxo estocástico amostra vítimas individuais (START + chegadas de Poisson) e agrega as "
+             "chegadas em intervalos de 15 minutos; óbitos (Preto) não são encaminhados aos hospitais."
+    )
+    taxas_rede, intervalo_rede_h = np.array([taxa_vimas], dtype=float), 1.0
+    if perfil_chegada == "Fluxo Estocástico da Triagem":
+        col_fl1, col_fl2, col_fl3, col_fl4 = st.columns(4)
+        vitimas_fluxo = col_fl1.number_input("Total de Vítimas", min_value=0, value=int(taxa_vimas * 4), step=10,
+                                             key="rede_vitimas_fluxo")
+        gravidade_fluxo = col_fl2.slider("Gravidade do Incidente", 0.0, 1.0, 0.5, 0.05, key="rede_gravidade_fluxo")
+        duracao_fluxo = col_fl3.slider("Duração do Fluxo (h)", 0.5, 12.0, 2.0, 0.5, key="rede_duracao_fluxo")
+        semente_rede = col_fl4.number_input("Semente Aleatória", min_value=0, value=42, step=1,
+                                            key="rede_semente_fluxo")
+
+        intervalo_rede_h = 0.25
+        df_chegadas_rede = agregar_chegadas(
+            gerar_fluxo_vitimas(vitimas_fluxo, gravidade_fluxo, duracao_chegada_h=duracao_fluxo,
+                                semente=int(semente_rede)),
+            intervalo_min=intervalo_rede_h * 60, categorias=CATEGORIAS_START[:3]
+        )
+        contagens_rede = df_chegadas_rede.drop(columns='Início (Horas)').sum(axis=1).to_numpy(dtype=float)
+        taxas_rede = (contagens_rede / intervalo_rede_h)[:, None] if len(contagens_rede) else np.zeros((1, 1))
+        st.caption(f"**Vítimas encaminhadas:** {contagens_rede.sum():.0f} | "
+                   f"**Pico de chegada:** {taxas_rede.max():.0f} vítimas/hora")
+
+    if len(df_hospitais) > 0:
+        rede = simular_rede_hospitalar(
+            taxas_rede,
+            df_hospitais['Leitos/Equipes'].to_numpy(dtype=float),
+            60 / df_hospitais['Tempo Atendimento (min)'].clip(lower=1).to_numpy(dtype=float),
+            df_hospitais['Tempo de Viagem (min)'].to_numpy(dtype=float)[None, :],
+            politica=POLITICAS_ROTEAMENTO[politica_nome],
+            referencia=df_hospitais['Referência (Trauma/UTI)'].to_numpy(dtype=bool),
+            fracao_graves=fracao_graves,
+            intervalo_taxas_h=intervalo_rede_h
+        )
+
+        r1, r2, r3 = st.columns(3)
+        r1.metric("Espera Regional Total", f"{rede['espera_total_h']:.1f} paciente-horas",
+                  help="Soma do tempo que todas as vítimas passaram em fila nos hospitais da rede (12 horas).")
+        r2.metric("Espera Média por Vítima", f"{rede['espera_media_min']:.1f} min",
+                  help="Espera regional total dividida pelo número de chegadas no horizonte.")
+        r3.metric("Tempo Total de Transporte", f"{rede['transporte_total_h']:.1f} vítima-horas",
+                  help="Soma dos tempos de viagem de todas as vítimas despachadas.")
+
+        df_rede = pd.DataFrame({
+            'Hospital': df_hospitais['Hospital'].to_numpy(),
+            'Entrada em CRÍTICO': [f"{t:.1f} h" if not np.isnan(t) else "Não atingido"
+                                   for t in rede['tempo_critico_h']],
+            'Espera Acumulada (paciente-horas)': np.round(rede['espera_por_hospital_h'], 1),
+            'Status em 12h': rede['status_final']
+        })
+        st.dataframe(df_rede, use_container_width=True, hide_index=True)
+
+        # Amostrar a cada 15 minutos para o gráfico
+        df_evol_rede = rede['df_evolucao']
+        passo_linha = np.arange(len(df_evol_rede)) // len(df_hospitais)
+        df_evol_rede = df_evol_rede[passo_linha % 15 == 0].copy()
+        df_evol_rede['Hospital'] = df_hospitais['Hospital'].to_numpy()[df_evol_rede['Hospital'] - 1]
+
+        chart_rede = alt.Chart(df_evol_rede).mark_line().encode(
+            x=alt.X('Horas após o Início:Q', title='Horas após o Início do Incidente'),
+            y=alt.Y('Pacientes Aguardando:Q', title='Pacientes Aguardando'),
+            color=alt.Color('Hospital:N'),
+            tooltip=['Horas após o Início:Q', 'Hospital:N', 'Pacientes Aguardando:Q', 'Ocupação:Q']
+        ).properties(height=350, title="Fila por Hospital da Rede")
+        st.altair_chart(chart_rede, use_container_width=True)
+
     st.markdown("---")
     st.markdown("### Considerações Técnicas")
     st.info("""
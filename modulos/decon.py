@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
+import heapq
+from concurrent.futures import ProcessPoolExecutor
 
 # =============================================================================
 # 1. PARÂMETROS TÁTICOS DE REFERÊNCIA
@@ -202,7 +204,345 @@ def simular_decon(num_vitimas, num_linhas, tempo_por_pessoa):
     return df_evolucao, vazao_total_hora, tempo_total_horas
 
 # =============================================================================
-# 4. INTERFACE DO USUÁRIO
+# 4. SIMULADOR DE EVENTOS DISCRETOS (CORREDOR MULTIESTÁGIO)
+# =============================================================================
+# O corredor real é uma linha de produção: cada vítima passa por estágios em
+# sequência, cada estágio de cada faixa tem uma estação por linha ativa, e as
+# estações de lavagem/enxágue disputam os pontos de água disponíveis.
+# - Faixa 0: ambulantes | Faixa 1: não-ambulantes (maca)
+# - Tempos de serviço estocásticos (distribuição Gama com média e CV por estágio)
+# - Fila com prioridade: vítimas Vermelhas (Imediato) são atendidas primeiro
+# Referências: Law & Kelton (2000) - Simulation Modeling; NFPA 472; US Army
+# SBCCOM (2000) - Guidelines for Mass Casualty Decontamination
+
+ETAPAS_DECON = {
+    "Despir": {"fracao": 0.20, "usa_agua": False},
+    "Lavar": {"fracao": 0.35, "usa_agua": True},
+    "Enxaguar": {"fracao": 0.20, "usa_agua": True},
+    "Secar": {"fracao": 0.10, "usa_agua": False},
+    "Vestir": {"fracao": 0.15, "usa_agua": False}
+}
+
+def _replicar_decon(args):
+    """
+    Executa uma replicação do corredor multiestágio (uso interno, paralelizável).
+
+    Retorna a trajetória (fila na zona suja, fila entre estágios, processadas)
+    amostrada na grade de tempo e o tempo de conclusão da replicação.
+    """
+    faixa, prioridade, chegadas, tempo_faixa, linhas, pontos_agua, cv, grade_min, semente = args
+    rng = np.random.default_rng(semente)
+
+    fracoes = np.array([e["fracao"] for e in ETAPAS_DECON.values()])
+    usa_agua = [e["usa_agua"] for e in ETAPAS_DECON.values()]
+    n_etapas = len(fracoes)
+    n_vitimas = len(faixa)
+
+    # Tempos de serviço pré-sorteados (vítimas × estágios)
+    medias = tempo_faixa[faixa][:, None] * fracoes[None, :]
+    if cv > 0:
+        servico = rng.gamma(1 / cv**2, medias * cv**2)
+    else:
+        servico = medias
+
+    livres = np.array([[linhas[0]] * n_etapas, [linhas[1]] * n_etapas])
+    agua_livre = pontos_agua
+    filas = [[[] for _ in range(n_etapas)] for _ in range(2)]
+    etapa = np.zeros(n_vitimas, dtype=int)
+
+    eventos = [(t, i, 0, i) for i, t in enumerate(chegadas)]  # (tempo, desempate, tipo, vítima)
+    heapq.heapify(eventos)
+    seq = n_vitimas
+    fila_suja = fila_interna = processadas = 0
+    registro_t, registro = [0.0], [(0, 0, 0)]
+
+    def despachar(agora):
+        nonlocal agua_livre, seq, fila_suja, fila_interna
+        for f in (0, 1):
+            for e in range(n_etapas):
+                fila = filas[f][e]
+                while fila and livres[f, e] > 0 and (not usa_agua[e] or agua_livre > 0):
+                    _, _, v = heapq.heappop(fila)
+                    livres[f, e] -= 1
+                    if usa_agua[e]:
+                        agua_livre -= 1
+                    if e == 0:
+                        fila_suja -= 1
+                    else:
+                        fila_interna -= 1
+                    seq += 1
+                    heapq.heappush(eventos, (agora + servico[v, e], seq, 1, v))
+
+    while eventos:
+        agora, _, tipo, v = heapq.heappop(eventos)
+        f, e = faixa[v], etapa[v]
+        if tipo == 0:
+            # Chegada à zona suja (fila do primeiro estágio)
+            heapq.heappush(filas[f][0], (prioridade[v], v, v))
+            fila_suja += 1
+        else:
+            # Fim de estágio: libera estação (e ponto de água) e avança a vítima
+            livres[f, e] += 1
+            if usa_agua[e]:
+                agua_livre += 1
+            if e + 1 < n_etapas:
+                etapa[v] = e + 1
+                heapq.heappush(filas[f][e + 1], (prioridade[v], v, v))
+                fila_interna += 1
+            else:
+                processadas += 1
+        despachar(agora)
+        registro_t.append(agora)
+        registro.append((fila_suja, fila_interna, processadas))
+
+    # Amostragem da função degrau na grade de tempo
+    registro = np.array(registro)
+    indices = np.searchsorted(np.array(registro_t), grade_min, side='right') - 1
+    return registro[indices], registro_t[-1]
+
+# Abaixo deste volume (vítimas × réplicas) o custo de iniciar o pool de processos
+# supera o ganho do paralelismo e as réplicas rodam em série
+LIMITE_SERIAL_DECON = 50_000
+
+def simular_decon_estagios(num_vitimas, num_linhas, tempo_por_pessoa, num_linhas_maca=1,
+                           tempo_maca=None, fracao_maca=0.1, fracao_vermelhos=0.15,
+                           pontos_agua=None, cv_servico=0.3, taxa_chegada_h=None,
+                           num_replicacoes=50, horizonte_h=None, semente=42, n_processos=None,
+                           vitimas=None):
+    """
+    Simula o corredor de descontaminação como pipeline de eventos discretos
+    com réplicas de Monte Carlo executadas em paralelo.
+
+    Parâmetros:
+        num_vitimas: Número total de vítimas
+        num_linhas: Linhas ambulantes ativas (uma estação por estágio em cada linha)
+        tempo_por_pessoa: Tempo médio total por vítima ambulante (minutos)
+        num_linhas_maca: Linhas para vítimas não-ambulantes (maca)
+        tempo_maca: Tempo médio total por vítima em maca (minutos); padrão de TIPOS_DECON
+        fracao_maca: Fração das vítimas que são não-ambulantes (0-1)
+        fracao_vermelhos: Fração de vítimas Vermelhas (prioridade na fila) (0-1)
+        pontos_agua: Pontos de água compartilhados pelos estágios de lavagem/enxágue
+                     (None = sem restrição)
+        cv_servico: Coeficiente de variação dos tempos de serviço (0 = determinístico)
+        taxa_chegada_h: Taxa de chegada de Poisson (vítimas/hora); None = todas em t = 0
+        num_replicacoes: Número de réplicas de Monte Carlo
+        horizonte_h: Horizonte da grade de saída (horas); padrão estimado pela vazão
+        semente: Semente do gerador aleatório (reprodutibilidade)
+        n_processos: Processos em paralelo (None = núcleos disponíveis, ou serial abaixo
+                     de LIMITE_SERIAL_DECON vítimas × réplicas; 1 = serial)
+        vitimas: Registros individuais de vítimas (DataFrame ou iterável de lotes do
+                 fluxo de triagem, com colunas Categoria, Chegada (min), Ambulante e
+                 Necessita Descontaminação); substitui o perfil sintético
+
+    Retorna:
+        Tupla: (DataFrame com percentis P10/P50/P90 das filas e processadas ao longo
+                do tempo, DataFrame com o resumo de cada réplica)
+    """
+    if tempo_maca is None:
+        tempo_maca = TIPOS_DECON["Vítimas Não-Ambulantes (Maca)"]["tempo_medio"]
+    if pontos_agua is None:
+        pontos_agua = 2 * (num_linhas + num_linhas_maca)
+
+    sementes = np.random.SeedSequence(semente).spawn(num_replicacoes + 1)
+    rng = np.random.default_rng(sementes[0])
+
+    # Perfil das vítimas (comum a todas as réplicas para comparação pareada)
+    if vitimas is not None:
+        if not isinstance(vitimas, pd.DataFrame):
+            vitimas = pd.concat(list(vitimas), ignore_index=True)
+        vitimas = vitimas[vitimas['Necessita Descontaminação']]
+        num_vitimas = len(vitimas)
+        faixa = (~vitimas['Ambulante'].to_numpy()).astype(int)
+        prioridade = np.where(vitimas['Categoria'].astype(str).str.startswith("Vermelho"), 0, 1)
+        chegadas = vitimas['Chegada (min)'].to_numpy(dtype=float)
+    else:
+        faixa = (rng.random(num_vitimas) < fracao_maca).astype(int)
+        prioridade = np.where(rng.random(num_vitimas) < fracao_vermelhos, 0, 1)
+        if taxa_chegada_h:
+            chegadas = np.cumsum(rng.exponential(60 / taxa_chegada_h, num_vitimas))
+        else:
+            chegadas = np.zeros(num_vitimas)
+    if num_linhas_maca == 0:
+        faixa[:] = 0
+
+    if horizonte_h is None:
+        vazao_h = 60 / tempo_por_pessoa * max(num_linhas, 1) + 60 / tempo_maca * num_linhas_maca
+        horizonte_h = min(max(2 * num_vitimas / vazao_h, chegadas.max(initial=0) / 60 * 1.5, 1.0), 48)
+    grade_min = np.linspace(0, horizonte_h * 60, 97)
+
+    tempo_faixa = np.array([tempo_por_pessoa, tempo_maca], dtype=float)
+    linhas = (num_linhas, num_linhas_maca)
+    tarefas = [(faixa, prioridade, chegadas, tempo_faixa, linhas, pontos_agua, cv_servico, grade_min, s)
+               for s in sementes[1:]]
+
+    serial = n_processos is None and num_vitimas * num_replicacoes < LIMITE_SERIAL_DECON
+    if n_processos == 1 or num_replicacoes == 1 or serial:
+        resultados = list(map(_replicar_decon, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            resultados = list(executor.map(_replicar_decon, tarefas))
+
+    trajetorias = np.stack([r[0] for r in resultados])  # réplicas × tempos × 3
+    p10, p50, p90 = np.percentile(trajetorias, [10, 50, 90], axis=0)
+
+    df_percentis = pd.DataFrame({
+        'Tempo (Horas)': grade_min / 60,
+        'Fila Zona Suja P10': p10[:, 0], 'Fila Zona Suja P50': p50[:, 0], 'Fila Zona Suja P90': p90[:, 0],
+        'Fila entre Estágios P50': p50[:, 1], 'Fila entre Estágios P90': p90[:, 1],
+        'Processadas P10': p10[:, 2], 'Processadas P50': p50[:, 2], 'Processadas P90': p90[:, 2]
+    })
+    df_replicas = pd.DataFrame({
+        'Réplica': np.arange(1, num_replicacoes + 1),
+        'Tempo Total (Horas)': [r[1] / 60 for r in resultados]
+    })
+    return df_percentis, df_replicas
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _simular_decon_estagios_cache(num_vitimas, num_linhas, tempo_por_pessoa, num_linhas_maca,
+                                  fracao_maca, fracao_vermelhos, pontos_agua, cv_servico, num_replicacoes):
+    """Simulação por estágios memorizada por entrada (evita refazer as réplicas a cada rerun)."""
+    return simular_decon_estagios(
+        num_vitimas, num_linhas, tempo_por_pessoa, num_linhas_maca=num_linhas_maca,
+        fracao_maca=fracao_maca, fracao_vermelhos=fracao_vermelhos, pontos_agua=pontos_agua,
+        cv_servico=cv_servico, num_replicacoes=num_replicacoes
+    )
+
+# =============================================================================
+# 5. OTIMIZADOR DE RECURSOS (FRONTEIRA DE PARETO TEMPO × PESSOAL)
+# =============================================================================
+# Busca a configuração mais barata (linhas, linhas de maca e operadores por linha)
+# que descontamina todas as vítimas dentro do limite de permanência na zona quente.
+# 1. Poda: o limite inferior determinístico do tempo (vítimas / vazão do estágio
+#    gargalo) descarta configurações inviáveis sem simular.
+# 2. Avaliação em lote: as configurações restantes são simuladas em paralelo.
+# 3. Cache: resultados ficam guardados por configuração e são reaproveitados.
+# 4. Dominância: retorna a fronteira de Pareto (menor tempo para cada nível de pessoal).
+
+# Efeito do tamanho da equipe por linha ambulante no tempo de serviço
+# (3 operadores = referência dos tempos de TIPOS_DECON)
+EQUIPE_POR_LINHA = {
+    2: {"fator_tempo": 1.30, "desc": "Equipe mínima. Operador acumula funções (orientação + lavagem)."},
+    3: {"fator_tempo": 1.00, "desc": "Equipe padrão: orientação/despir, lavagem, controle de saída."},
+    4: {"fator_tempo": 0.85, "desc": "Equipe reforçada com operador dedicado ao enxágue e verificação."}
+}
+OPERADORES_LINHA_MACA = 4  # 2 a 4 operadores para manipular a maca (TIPOS_DECON)
+
+_CACHE_CONFIG_DECON = {}
+MAX_CONFIGS_CACHE = 1024
+
+def _avaliar_configuracao_decon(chave):
+    """
+    Simula uma configuração do corredor e retorna o tempo total P90 (horas).
+    A chave é a tupla de parâmetros da configuração (uso interno, paralelizável).
+    """
+    (num_vitimas, linhas, linhas_maca, tempo_pessoa, tempo_maca,
+     fracao_maca, num_replicacoes, semente) = chave
+    _, df_replicas = simular_decon_estagios(
+        num_vitimas, linhas, tempo_pessoa,
+        num_linhas_maca=linhas_maca, tempo_maca=tempo_maca, fracao_maca=fracao_maca,
+        num_replicacoes=num_replicacoes, semente=semente, n_processos=1
+    )
+    return float(df_replicas['Tempo Total (Horas)'].quantile(0.9))
+
+def otimizar_recursos_decon(num_vitimas, tipo_decon, contaminante=None, limite_permanencia_h=2.0,
+                            max_linhas=10, max_linhas_maca=3, fracao_maca=0.1,
+                            num_replicacoes=20, semente=42, n_processos=None):
+    """
+    Avalia configurações de linhas e pessoal e retorna a fronteira de Pareto
+    entre tempo de descontaminação e recursos humanos.
+
+    Parâmetros:
+        num_vitimas: Número total de vítimas
+        tipo_decon: Chave de TIPOS_DECON para a faixa ambulante
+        contaminante: Chave de CONTAMINANTES_DECON (acrescenta tempo_extra) ou None
+        limite_permanencia_h: Limite de permanência na zona quente (horas)
+        max_linhas: Máximo de linhas ambulantes avaliadas
+        max_linhas_maca: Máximo de linhas de maca avaliadas
+        fracao_maca: Fração de vítimas não-ambulantes (0-1)
+        num_replicacoes: Réplicas de Monte Carlo por configuração
+        semente: Semente do gerador aleatório (mesma para todas as configurações)
+        n_processos: Processos em paralelo (None = núcleos disponíveis, ou serial abaixo
+                     de LIMITE_SERIAL_DECON configurações × vítimas × réplicas; 1 = serial)
+
+    Retorna:
+        Tupla: (DataFrame com todas as configurações avaliadas, incluindo se atendem
+                o limite e se pertencem à fronteira de Pareto; linha da configuração
+                viável mais barata ou None se nenhuma atende o limite)
+    """
+    tempo_extra = CONTAMINANTES_DECON[contaminante]['tempo_extra'] if contaminante else 0
+    tempo_base = TIPOS_DECON[tipo_decon]['tempo_medio'] + tempo_extra
+    tempo_maca = TIPOS_DECON["Vítimas Não-Ambulantes (Maca)"]['tempo_medio'] + tempo_extra
+    fracao_gargalo = max(e["fracao"] for e in ETAPAS_DECON.values())
+
+    # Grade de candidatos (vetorizada): linhas × linhas de maca × operadores por linha
+    opcoes_equipe = np.array(list(EQUIPE_POR_LINHA.keys()))
+    fatores = np.array([e["fator_tempo"] for e in EQUIPE_POR_LINHA.values()])
+    L, M, E = np.meshgrid(np.arange(1, max_linhas + 1), np.arange(0, max_linhas_maca + 1),
+                          np.arange(len(opcoes_equipe)), indexing='ij')
+    L, M, E = L.ravel(), M.ravel(), E.ravel()
+    if fracao_maca == 0:
+        mask_sem_maca = M == 0
+        L, M, E = L[mask_sem_maca], M[mask_sem_maca], E[mask_sem_maca]
+
+    tempo_pessoa = np.round(tempo_base * fatores[E], 3)
+    operadores = opcoes_equipe[E] * L + OPERADORES_LINHA_MACA * M
+
+    # Limite inferior determinístico: cada faixa limitada pelo seu estágio gargalo
+    with np.errstate(divide='ignore'):
+        t_amb = num_vitimas * (1 - fracao_maca) * tempo_pessoa * fracao_gargalo / L
+        t_maca = np.where(M > 0, num_vitimas * fracao_maca * tempo_maca * fracao_gargalo / M,
+                          np.where(fracao_maca > 0, np.inf, 0.0))
+    limite_inferior_h = np.maximum(t_amb, t_maca) / 60
+    viavel_lb = limite_inferior_h <= limite_permanencia_h
+
+    chaves = [(int(num_vitimas), int(l), int(m), float(tp), float(tempo_maca),
+               float(fracao_maca), int(num_replicacoes), int(semente))
+              for l, m, tp in zip(L, M, tempo_pessoa)]
+
+    # Avaliar apenas candidatos não podados e ainda fora do cache
+    avaliados = {c: _CACHE_CONFIG_DECON[c] for c, ok in zip(chaves, viavel_lb) if ok and c in _CACHE_CONFIG_DECON}
+    pendentes = sorted({c for c, ok in zip(chaves, viavel_lb) if ok and c not in avaliados})
+    if pendentes:
+        volume = len(pendentes) * num_vitimas * num_replicacoes
+        if n_processos == 1 or len(pendentes) == 1 or (n_processos is None and volume < LIMITE_SERIAL_DECON):
+            tempos = list(map(_avaliar_configuracao_decon, pendentes))
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                tempos = list(executor.map(_avaliar_configuracao_decon, pendentes))
+        avaliados.update(zip(pendentes, tempos))
+        # Cache limitado: descarta as configurações mais antigas (ordem de inserção)
+        for chave, tempo in zip(pendentes, tempos):
+            if len(_CACHE_CONFIG_DECON) >= MAX_CONFIGS_CACHE:
+                _CACHE_CONFIG_DECON.pop(next(iter(_CACHE_CONFIG_DECON)))
+            _CACHE_CONFIG_DECON[chave] = tempo
+
+    tempo_p90 = np.array([avaliados.get(c, np.nan) if ok else np.nan
+                          for c, ok in zip(chaves, viavel_lb)])
+
+    df = pd.DataFrame({
+        'Linhas Ambulantes': L,
+        'Linhas de Maca': M,
+        'Operadores por Linha': opcoes_equipe[E],
+        'Operadores Totais': operadores,
+        'Tempo Mínimo Teórico (h)': limite_inferior_h,
+        'Tempo Total P90 (h)': tempo_p90,
+        'Simulado': ~np.isnan(tempo_p90),
+        'Atende Limite': tempo_p90 <= limite_permanencia_h
+    })
+
+    # Fronteira de Pareto: ordenar por pessoal e manter quem melhora o menor tempo já visto
+    avaliados = df[df['Simulado']].sort_values(['Operadores Totais', 'Tempo Total P90 (h)'])
+    melhor_ate_agora = np.minimum.accumulate(avaliados['Tempo Total P90 (h)'].to_numpy())
+    anterior = np.concatenate(([np.inf], melhor_ate_agora[:-1]))
+    df['Pareto'] = False
+    df.loc[avaliados.index[avaliados['Tempo Total P90 (h)'].to_numpy() < anterior], 'Pareto'] = True
+
+    viaveis = df[df['Atende Limite']].sort_values(['Operadores Totais', 'Tempo Total P90 (h)'])
+    melhor = viaveis.iloc[0] if len(viaveis) > 0 else None
+    return df, melhor
+
+# =============================================================================
+# 6. INTERFACE DO USUÁRIO
 # =============================================================================
 def renderizar():
     st.title("Corredor de Descontaminação")
@@ -383,7 +723,121 @@ def renderizar():
         df_display['Vítimas na Fila (Zona Suja)'] = df_display['Vítimas na Fila (Zona Suja)'].apply(lambda x: f"{int(x):,}")
         
         st.dataframe(df_display, use_container_width=True, hide_index=True)
-        
+
+        # Simulação estocástica multiestágio
+        st.markdown("---")
+        st.markdown("#### Simulação Estocástica por Estágios (Eventos Discretos)")
+        st.caption("Modela o corredor como linha de produção (Despir → Lavar → Enxaguar → Secar → Vestir) com faixas "
+                   "ambulante e maca, pontos de água compartilhados, tempos de serviço variáveis e prioridade para "
+                   "vítimas Vermelhas. Como várias vítimas ocupam estágios diferentes ao mesmo tempo, a vazão é "
+                   "limitada pelo estágio mais lento, e não pelo tempo total por pessoa.")
+
+        col_des1, col_des2, col_des3 = st.columns(3)
+        with col_des1:
+            fracao_maca = st.slider("Vítimas em Maca (%)", 0, 100, 10, step=5,
+                                    help="Fração de vítimas não-ambulantes, processadas na faixa de maca.") / 100
+            linhas_maca = st.number_input("Linhas de Maca", min_value=0, max_value=10, value=1, step=1,
+                                          help="Linhas dedicadas a vítimas não-ambulantes.")
+        with col_des2:
+            fracao_vermelhos = st.slider("Vítimas Vermelhas (%)", 0, 100, 15, step=5,
+                                         help="Vítimas com prioridade de atendimento em todas as filas.") / 100
+            pontos_agua = st.number_input("Pontos de Água Disponíveis", min_value=1, max_value=100,
+                                          value=2 * (linhas + 1), step=1,
+                                          help="Chuveiros/pontos de água compartilhados pelos estágios de lavagem e enxágue.")
+        with col_des3:
+            cv_servico = st.slider("Variabilidade do Tempo de Serviço (CV)", 0.0, 1.0, 0.3, step=0.05,
+                                   help="Coeficiente de variação dos tempos de cada estágio. 0 = determinístico.")
+            num_replicacoes = st.number_input("Réplicas de Monte Carlo", min_value=10, max_value=500, value=50, step=10,
+                                              help="Número de simulações independentes usadas para os percentis.")
+
+        df_perc, df_rep = _simular_decon_estagios_cache(
+            int(total_vitimas), int(linhas), float(tempo_manual), int(linhas_maca),
+            float(fracao_maca), float(fracao_vermelhos), int(pontos_agua), float(cv_servico),
+            int(num_replicacoes)
+        )
+
+        e1, e2, e3 = st.columns(3)
+        tempos_rep = df_rep['Tempo Total (Horas)']
+        e1.metric("Tempo Total (Mediana)", f"{tempos_rep.median():.2f} h",
+                  help="Mediana do tempo para descontaminar todas as vítimas nas réplicas.")
+        e2.metric("Tempo Total (P90)", f"{tempos_rep.quantile(0.9):.2f} h",
+                  help="Em 90% das réplicas a operação termina antes deste tempo.")
+        e3.metric("Pico da Fila na Zona Suja (P90)", f"{df_perc['Fila Zona Suja P90'].max():.0f} vítimas",
+                  help="Maior fila aguardando o primeiro estágio (percentil 90).")
+
+        banda = alt.Chart(df_perc).mark_area(opacity=0.3, color='#e74c3c').encode(
+            x=alt.X('Tempo (Horas):Q', title="Tempo (Horas)"),
+            y=alt.Y('Fila Zona Suja P10:Q', title="Vítimas na Fila (Zona Suja)"),
+            y2='Fila Zona Suja P90:Q'
+        )
+        mediana = alt.Chart(df_perc).mark_line(color='#e74c3c').encode(
+            x='Tempo (Horas):Q',
+            y='Fila Zona Suja P50:Q',
+            tooltip=[alt.Tooltip('Tempo (Horas):Q', format='.2f'),
+                     alt.Tooltip('Fila Zona Suja P10:Q', format='.0f'),
+                     alt.Tooltip('Fila Zona Suja P50:Q', format='.0f'),
+                     alt.Tooltip('Fila Zona Suja P90:Q', format='.0f')]
+        )
+        st.altair_chart((banda + mediana).properties(height=300, title="Fila na Zona Suja: Mediana e Faixa P10-P90"),
+                        use_container_width=True)
+
+        # Otimização de recursos
+        st.markdown("---")
+        st.markdown("#### Otimização de Recursos (Linhas × Pessoal)")
+        st.caption("Busca a configuração com menos operadores que descontamina todas as vítimas dentro do limite de "
+                   "permanência na zona quente (tempo total P90 das réplicas). Configurações impossíveis pelo limite "
+                   "teórico do estágio gargalo são descartadas sem simulação; resultados repetidos vêm do cache.")
+
+        col_opt1, col_opt2 = st.columns(2)
+        with col_opt1:
+            limite_permanencia = st.number_input("Limite de Permanência na Zona Quente (horas)",
+                                                 min_value=0.25, value=2.0, step=0.25,
+                                                 help="Tempo máximo aceitável para concluir a descontaminação de todas as vítimas.")
+        with col_opt2:
+            max_linhas_opt = st.slider("Máximo de Linhas Ambulantes Avaliadas", 1, 20, 10,
+                                       help="Limite superior da busca de linhas ambulantes.")
+
+        # O resultado vale para as entradas do clique: mudar qualquer uma exige nova otimização
+        entradas_otimizacao = (total_vitimas, tipo_alvo, contaminante, limite_permanencia, max_linhas_opt, fracao_maca)
+        if st.button("Otimizar Configuração", use_container_width=True):
+            st.session_state['decon_otimizar'] = entradas_otimizacao
+
+        if st.session_state.get('decon_otimizar') == entradas_otimizacao:
+            df_opt, melhor = otimizar_recursos_decon(
+                total_vitimas, tipo_alvo,
+                contaminante=None if contaminante == "Não especificado" else contaminante,
+                limite_permanencia_h=limite_permanencia,
+                max_linhas=max_linhas_opt,
+                fracao_maca=fracao_maca
+            )
+
+            if melhor is not None:
+                st.success(f"**CONFIGURAÇÃO MAIS ECONÔMICA:** {int(melhor['Linhas Ambulantes'])} linhas ambulantes com "
+                           f"{int(melhor['Operadores por Linha'])} operadores cada e {int(melhor['Linhas de Maca'])} "
+                           f"linhas de maca ({int(melhor['Operadores Totais'])} operadores). "
+                           f"Tempo total P90: {melhor['Tempo Total P90 (h)']:.2f} horas.")
+            else:
+                st.error("**NENHUMA CONFIGURAÇÃO ATENDE O LIMITE:** Aumente o número máximo de linhas, "
+                         "reduza o volume por corredor (abrir outro corredor) ou reavalie o limite de permanência.")
+
+            df_avaliados = df_opt[df_opt['Simulado']]
+            if len(df_avaliados) > 0:
+                pontos = alt.Chart(df_avaliados).mark_circle(size=60).encode(
+                    x=alt.X('Operadores Totais:Q', title="Operadores Totais"),
+                    y=alt.Y('Tempo Total P90 (h):Q', title="Tempo Total P90 (Horas)"),
+                    color=alt.Color('Pareto:N', scale=alt.Scale(domain=[True, False], range=['#2ecc71', '#95a5a6']),
+                                    legend=alt.Legend(title="Fronteira de Pareto")),
+                    tooltip=['Linhas Ambulantes', 'Linhas de Maca', 'Operadores por Linha',
+                             'Operadores Totais', alt.Tooltip('Tempo Total P90 (h):Q', format='.2f')]
+                )
+                limite = alt.Chart(pd.DataFrame({'limite': [limite_permanencia]})).mark_rule(
+                    color='#e74c3c', strokeDash=[5, 5]).encode(y='limite:Q')
+                st.altair_chart((pontos + limite).properties(height=300, title="Tempo × Recursos"),
+                                use_container_width=True)
+
+                st.dataframe(df_opt[df_opt['Pareto']].sort_values('Operadores Totais'),
+                             use_container_width=True, hide_index=True)
+
         # Recomendações operacionais
         st.markdown("---")
         with st.expander("Recomendações Operacionais", expanded=False):
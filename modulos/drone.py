@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import altair as alt
 import folium
 from streamlit_folium import st_folium
 import math
+from concurrent.futures import ProcessPoolExecutor
+from scipy import ndimage
 
 # =============================================================================
 # 1. BANCO DE DADOS: SENSORES TÁTICOS
@@ -108,8 +111,694 @@ def calcular_geometria_voo(altura, fov, largura_area, comprimento_area, sobrepos
     return largura_sensor_solo, num_passagens, distancia_total
 
 # =============================================================================
-# 3. INTERFACE VISUAL
+# 3. PLANEJADOR DE COBERTURA DE POLÍGONOS (BOUSTROPHEDON)
 # =============================================================================
+# Áreas reais de busca (pegadas de pluma, campos de escombros) são polígonos
+# irregulares. O planejador gira o polígono para o ângulo de varredura que
+# minimiza o número de passagens, corta-o com linhas de varredura paralelas e
+# agrupa os segmentos em células de Boustrophedon, varridas em zigue-zague.
+# Referências: Choset (2000) - Coverage of Known Spaces: The Boustrophedon
+# Cellular Decomposition; Huang (2001) - Optimal Line-sweep-based Decompositions
+
+METROS_POR_GRAU = 111000  # Mesma aproximação usada no mapa tático
+
+
+def projetar_local(latitudes, longitudes, lat_ref, lon_ref):
+    """
+    Converte coordenadas geográficas em metros (x leste, y norte) em torno de um
+    ponto de referência (projeção equiretangular, adequada para poucos km).
+    """
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+    x = (lon - lon_ref) * METROS_POR_GRAU * math.cos(math.radians(lat_ref))
+    y = (lat - lat_ref) * METROS_POR_GRAU
+    return np.column_stack([x, y])
+
+
+def desprojetar_local(pontos_xy, lat_ref, lon_ref):
+    """Inversa de projetar_local: retorna array (N, 2) de [lat, lon]."""
+    pontos_xy = np.asarray(pontos_xy, dtype=float).reshape(-1, 2)
+    lat = lat_ref + pontos_xy[:, 1] / METROS_POR_GRAU
+    lon = lon_ref + pontos_xy[:, 0] / (METROS_POR_GRAU * math.cos(math.radians(lat_ref)))
+    return np.column_stack([lat, lon])
+
+
+def _arestas_aneis(aneis):
+    """Concatena as arestas de todos os anéis (contorno e buracos) em arrays (E, 2)."""
+    inicios, fins = [], []
+    for anel in aneis:
+        anel = np.asarray(anel, dtype=float)
+        if len(anel) > 1 and np.allclose(anel[0], anel[-1]):
+            anel = anel[:-1]
+        inicios.append(anel)
+        fins.append(np.roll(anel, -1, axis=0))
+    return np.vstack(inicios), np.vstack(fins)
+
+
+def _rotacionar(pontos, angulo_rad):
+    """Gira pontos (N, 2) por -angulo, alinhando a direção de varredura ao eixo x."""
+    c, s = math.cos(angulo_rad), math.sin(angulo_rad)
+    return pontos @ np.array([[c, -s], [s, c]])
+
+
+def _segmentos_varredura(p1, p2, espacamento):
+    """
+    Interseção vetorizada de todas as linhas de varredura horizontais com todas
+    as arestas (já rotacionadas). Usa a regra par-ímpar, de modo que buracos são
+    respeitados automaticamente.
+
+    Retorna arrays (S,) com linha, x_inicio, x_fim e y de cada segmento.
+    """
+    y_min = min(p1[:, 1].min(), p2[:, 1].min())
+    y_max = max(p1[:, 1].max(), p2[:, 1].max())
+    largura = y_max - y_min
+    num_linhas = max(1, math.ceil(largura / espacamento - 1e-9))
+    passo = largura / num_linhas
+    ys = y_min + (np.arange(num_linhas) + 0.5) * passo
+
+    y1, y2 = p1[:, 1], p2[:, 1]
+    yy = ys[:, None]
+    # Intervalo semiaberto evita contar duas vezes um vértice sobre a linha
+    cruza = ((y1 <= yy) & (y2 > yy)) | ((y2 <= yy) & (y1 > yy))
+    dy = np.where(y2 != y1, y2 - y1, 1.0)
+    xs = p1[:, 0] + (yy - y1) * (p2[:, 0] - p1[:, 0]) / dy
+    xs = np.sort(np.where(cruza, xs, np.nan), axis=1)
+
+    max_cruz = int(cruza.sum(axis=1).max()) if cruza.size else 0
+    max_cruz -= max_cruz % 2
+    if max_cruz == 0:
+        vazio = np.zeros(0)
+        return vazio.astype(int), vazio, vazio, vazio
+    inicio = xs[:, 0:max_cruz:2]
+    fim = xs[:, 1:max_cruz:2]
+    valido = ~np.isnan(inicio) & ~np.isnan(fim) & (fim > inicio)
+    linha = np.broadcast_to(np.arange(num_linhas)[:, None], inicio.shape)
+    return linha[valido], inicio[valido], fim[valido], np.broadcast_to(yy, inicio.shape)[valido]
+
+
+def _decompor_celulas(linha, x_ini, x_fim):
+    """
+    Agrupa os segmentos em células de Boustrophedon: dois segmentos de linhas
+    consecutivas pertencem à mesma célula quando se sobrepõem e nenhum deles
+    se divide ou se funde com outro (evento crítico do contorno).
+    """
+    num_seg = len(linha)
+    proximo = np.full(num_seg, -1)
+    tem_anterior = np.zeros(num_seg, dtype=bool)
+    limites = np.searchsorted(linha, np.arange(linha.max() + 2)) if num_seg else np.zeros(1, int)
+
+    for k in range(len(limites) - 2):
+        a0, a1 = limites[k], limites[k + 1]
+        b0, b1 = limites[k + 1], limites[k + 2]
+        if a1 == a0 or b1 == b0:
+            continue
+        sobrepoe = (x_ini[a0:a1, None] < x_fim[None, b0:b1]) & (x_ini[None, b0:b1] < x_fim[a0:a1, None])
+        grau_a = sobrepoe.sum(axis=1)
+        grau_b = sobrepoe.sum(axis=0)
+        ia, ib = np.nonzero(sobrepoe & (grau_a[:, None] == 1) & (grau_b[None, :] == 1))
+        proximo[a0 + ia] = b0 + ib
+        tem_anterior[b0 + ib] = True
+
+    celulas = []
+    for s in np.nonzero(~tem_anterior)[0]:
+        cadeia = [s]
+        while proximo[cadeia[-1]] >= 0:
+            cadeia.append(proximo[cadeia[-1]])
+        celulas.append(np.array(cadeia))
+    return celulas
+
+
+def _zigue_zague(x_ini, x_fim, y, inverter_linhas, comecar_direita):
+    """Waypoints (2n, 2) de uma célula percorrida em zigue-zague."""
+    if inverter_linhas:
+        x_ini, x_fim, y = x_ini[::-1], x_fim[::-1], y[::-1]
+    n = len(y)
+    para_direita = (np.arange(n) % 2 == 0) != comecar_direita
+    pontos = np.empty((2 * n, 2))
+    pontos[0::2, 0] = np.where(para_direita, x_ini, x_fim)
+    pontos[1::2, 0] = np.where(para_direita, x_fim, x_ini)
+    pontos[0::2, 1] = y
+    pontos[1::2, 1] = y
+    return pontos
+
+
+def _angulos_candidatos(poligono, num_angulos):
+    """
+    Direções das arestas do contorno (módulo 180°) ordenadas pela largura do
+    polígono na direção normal, calculada para todas de uma só vez.
+    """
+    d = np.roll(poligono, -1, axis=0) - poligono
+    angulos = np.unique(np.round(np.mod(np.arctan2(d[:, 1], d[:, 0]), np.pi), 6))
+    normais = np.column_stack([-np.sin(angulos), np.cos(angulos)])
+    projecao = poligono @ normais.T
+    larguras = projecao.max(axis=0) - projecao.min(axis=0)
+    return angulos[np.argsort(larguras, kind="stable")[:num_angulos]]
+
+
+def planejar_cobertura_poligono(poligono, espacamento, buracos=None, ponto_inicial=None,
+                                num_angulos_avaliados=8, angulo_graus=None):
+    """
+    Planeja a cobertura de um polígono arbitrário por decomposição de Boustrophedon.
+
+    O ângulo de varredura ótimo (mínimo de curvas) é sempre paralelo a alguma
+    aresta: a largura do polígono na direção normal a cada aresta é calculada de
+    uma só vez por projeção matricial. Os ângulos mais estreitos são então
+    avaliados contando os segmentos reais de varredura (cada segmento custa duas
+    curvas), o que também penaliza reentrâncias de polígonos não convexos.
+
+    Parâmetros:
+    - poligono: Array (N, 2) com os vértices em metros (x leste, y norte)
+    - espacamento: Distância entre linhas de varredura (metros), tipicamente
+      largura_sensor_solo × (1 - sobreposicao) de calcular_geometria_voo
+    - buracos: Lista opcional de arrays (M, 2) com zonas de exclusão internas
+    - ponto_inicial: (x, y) da decolagem; padrão é o primeiro vértice
+    - num_angulos_avaliados: Quantos ângulos candidatos passam pela contagem exata
+    - angulo_graus: Força um ângulo de varredura (graus a partir do leste)
+
+    Retorna:
+    - Dicionário com waypoints (array (W, 2) em metros), angulo_graus,
+      num_passagens, num_celulas, num_curvas, distancia_varredura e
+      distancia_total (metros, incluindo translados entre células)
+    """
+    poligono = np.asarray(poligono, dtype=float)
+    aneis = [poligono] + [np.asarray(b, dtype=float) for b in (buracos or [])]
+    p1, p2 = _arestas_aneis(aneis)
+
+    if angulo_graus is None:
+        candidatos = _angulos_candidatos(poligono, num_angulos_avaliados)
+    else:
+        candidatos = [math.radians(angulo_graus)]
+
+    melhor = None
+    for angulo in candidatos:
+        r1, r2 = _rotacionar(p1, angulo), _rotacionar(p2, angulo)
+        linha, x_ini, x_fim, y = _segmentos_varredura(r1, r2, espacamento)
+        chave = (len(linha), float(np.sum(x_fim - x_ini)))
+        if melhor is None or chave < melhor[0]:
+            melhor = (chave, angulo, linha, x_ini, x_fim, y)
+
+    _, angulo, linha, x_ini, x_fim, y = melhor
+    if len(linha) == 0:
+        return {
+            "waypoints": np.zeros((0, 2)), "angulo_graus": math.degrees(angulo),
+            "num_passagens": 0, "num_celulas": 0, "num_curvas": 0,
+            "distancia_varredura": 0.0, "distancia_total": 0.0,
+        }
+    celulas = _decompor_celulas(linha, x_ini, x_fim)
+
+    # Ordem gulosa de visita das células: entra pelo canto mais próximo
+    inicio = poligono[0] if ponto_inicial is None else np.asarray(ponto_inicial, dtype=float)
+    posicao = _rotacionar(inicio[None, :], angulo)[0]
+    # Quatro entradas possíveis por célula: (primeira|última linha) × (esquerda|direita)
+    primeiro = np.array([s[0] for s in celulas])
+    ultimo = np.array([s[-1] for s in celulas])
+    entradas = np.stack([
+        np.column_stack([x_ini[primeiro], y[primeiro]]),
+        np.column_stack([x_fim[primeiro], y[primeiro]]),
+        np.column_stack([x_ini[ultimo], y[ultimo]]),
+        np.column_stack([x_fim[ultimo], y[ultimo]]),
+    ], axis=1)
+    pendente = np.ones(len(celulas), dtype=bool)
+    trechos = []
+    for _ in range(len(celulas)):
+        dist = np.hypot(*(entradas - posicao).transpose(2, 0, 1))
+        dist[~pendente] = np.inf
+        c, opcao = np.unravel_index(np.argmin(dist), dist.shape)
+        s = celulas[c]
+        pontos = _zigue_zague(x_ini[s], x_fim[s], y[s], opcao >= 2, opcao % 2 == 1)
+        trechos.append(pontos)
+        posicao = pontos[-1]
+        pendente[c] = False
+
+    rotacionados = np.vstack(trechos)
+    waypoints = _rotacionar(rotacionados, -angulo)
+    passos = np.hypot(*np.diff(waypoints, axis=0).T)
+    distancia_varredura = float(np.sum(x_fim - x_ini))
+
+    return {
+        "waypoints": waypoints,
+        "angulo_graus": math.degrees(angulo),
+        "num_passagens": int(len(linha)),
+        "num_celulas": len(celulas),
+        "num_curvas": max(0, len(waypoints) - 2),
+        "distancia_varredura": distancia_varredura,
+        "distancia_total": float(passos.sum()),
+    }
+
+# =============================================================================
+# 4. MISSÃO MULTI-DRONE (PARTIÇÃO DA ÁREA E AUTONOMIA DE BATERIA)
+# =============================================================================
+# Heurística de roteamento de veículos "rota primeiro, agrupamento depois"
+# (route-first, cluster-second): o percurso Boustrophedon é uma rota gigante
+# com o mínimo de curvas; ela é cortada em K trechos contíguos com tempo de voo
+# equilibrado (busca binária no makespan) e cada trecho é dividido em surtidas
+# que retornam à base antes do fim da bateria.
+# Referências: Beasley (1983) - Route first-cluster second methods for vehicle
+# routing; Maza & Ollero (2007) - Multiple UAV cooperative searching operation
+# using polygon area decomposition
+
+ATIVIDADES_MISSAO = ["Translado", "Varredura", "Retorno à Base", "Troca de Bateria"]
+
+
+def _executar_surtidas(inicios, fins, base, velocidade, autonomia_s, troca_s, registrar=False):
+    """
+    Simula um drone voando as passagens na ordem dada a partir da base. Antes de
+    cada passagem verifica se a bateria comporta translado + varredura + retorno;
+    caso contrário, insere o retorno à base e a troca de bateria.
+
+    Retorna:
+    - tempo_total (s), distancia (m), num_surtidas, excede_autonomia e, se
+      registrar=True, as listas de waypoints [(x, y, tipo, surtida)] e eventos
+      [(surtida, atividade, inicio_s, fim_s)]
+    """
+    posicao = np.asarray(base, dtype=float)
+    t_surtida = t_total = distancia = 0.0
+    surtida = 1
+    excede = False
+    waypoints = [(posicao[0], posicao[1], "Decolagem", 1)] if registrar else None
+    eventos = [] if registrar else None
+
+    def voar(destino, atividade, tipo):
+        nonlocal posicao, t_surtida, t_total, distancia
+        d = float(np.hypot(*(destino - posicao)))
+        if registrar and d > 0:
+            eventos.append((surtida, atividade, t_total, t_total + d / velocidade))
+            waypoints.append((destino[0], destino[1], tipo, surtida))
+        posicao = destino
+        distancia += d
+        t_surtida += d / velocidade
+        t_total += d / velocidade
+
+    for a, b in zip(inicios, fins):
+        em_voo = t_surtida > 0
+        necessario = (np.hypot(*(a - posicao)) + np.hypot(*(b - a)) + np.hypot(*(b - base))) / velocidade
+        if em_voo and t_surtida + necessario > autonomia_s:
+            voar(base, "Retorno à Base", "Pouso")
+            if registrar:
+                eventos.append((surtida, "Troca de Bateria", t_total, t_total + troca_s))
+            t_total += troca_s
+            t_surtida = 0.0
+            surtida += 1
+            if registrar:
+                waypoints.append((base[0], base[1], "Decolagem", surtida))
+        voar(a, "Translado", "Início de Passagem")
+        voar(b, "Varredura", "Fim de Passagem")
+        excede = excede or t_surtida + np.hypot(*(b - base)) / velocidade > autonomia_s
+
+    if t_surtida > 0:
+        voar(base, "Retorno à Base", "Pouso")
+    return t_total, distancia, surtida, excede, waypoints, eventos
+
+
+def _particionar_rota(inicios, fins, base, num_drones, velocidade, autonomia_s, troca_s):
+    """
+    Corta a rota gigante em até num_drones trechos contíguos minimizando o maior
+    tempo de missão (makespan). Para um makespan T, um passe guloso estende cada
+    trecho enquanto o drone termina (incluindo surtidas e retorno) dentro de T;
+    a busca binária encontra o menor T viável. As distâncias são pré-calculadas
+    de uma vez, e cada teste de T custa O(P).
+
+    Retorna a lista de índices de corte [0, c1, ..., P].
+    """
+    comprimento = (np.hypot(*(fins - inicios).T) / velocidade).tolist()
+    ida = (np.hypot(*(inicios - base).T) / velocidade).tolist()
+    volta = (np.hypot(*(fins - base).T) / velocidade).tolist()
+    entre = np.zeros(len(inicios))
+    entre[1:] = np.hypot(*(inicios[1:] - fins[:-1]).T) / velocidade
+    entre = entre.tolist()
+
+    def avancar(t_total, t_surtida, p):
+        """Estado (tempo total, tempo da surtida) após voar a passagem p."""
+        translado = entre[p] if t_surtida > 0 else ida[p]
+        if t_surtida > 0 and t_surtida + translado + comprimento[p] + volta[p] > autonomia_s:
+            t_total += volta[p - 1] + troca_s
+            t_surtida = 0.0
+            translado = ida[p]
+        return t_total + translado + comprimento[p], t_surtida + translado + comprimento[p]
+
+    def cortes_para(limite):
+        cortes = [0]
+        t_total = t_surtida = 0.0
+        for p in range(len(inicios)):
+            t_total, t_surtida = avancar(t_total, t_surtida, p)
+            if t_total + volta[p] > limite and p > cortes[-1]:
+                # Passagem não cabe no trecho atual: inicia o próximo drone
+                cortes.append(p)
+                if len(cortes) > num_drones:
+                    return None
+                t_total, t_surtida = avancar(0.0, 0.0, p)
+            if t_total + volta[p] > limite:
+                return None
+        return cortes + [len(inicios)]
+
+    hi = _executar_surtidas(inicios, fins, base, velocidade, autonomia_s, troca_s)[0]
+    lo = hi / num_drones
+    melhor = cortes_para(hi) or [0, len(inicios)]
+    for _ in range(40):
+        if hi - lo < 1.0:
+            break
+        meio = 0.5 * (lo + hi)
+        cortes = cortes_para(meio)
+        if cortes is None:
+            lo = meio
+        else:
+            hi, melhor = meio, cortes
+    return melhor
+
+
+def _avaliar_plano_multidrone(args):
+    """
+    Avalia um plano candidato (ângulo de varredura × sentido da rota gigante).
+    Função de módulo para ser serializável pelo ProcessPoolExecutor.
+    """
+    poligono, espacamento, angulo, inverter, base, num_drones, velocidade, autonomia_s, troca_s = args
+    plano = planejar_cobertura_poligono(poligono, espacamento, ponto_inicial=base, angulo_graus=angulo)
+    passagens = plano["waypoints"].reshape(-1, 2, 2)
+    if inverter:
+        passagens = passagens[::-1, ::-1]
+    inicios, fins = passagens[:, 0], passagens[:, 1]
+    if len(passagens) == 0:
+        return {"makespan_s": 0.0, "angulo_graus": angulo, "cortes": [0], "inicios": inicios, "fins": fins}
+    cortes = _particionar_rota(inicios, fins, base, num_drones, velocidade, autonomia_s, troca_s)
+    tempos = [_executar_surtidas(inicios[i:j], fins[i:j], base, velocidade, autonomia_s, troca_s)[0]
+              for i, j in zip(cortes[:-1], cortes[1:])]
+    return {"makespan_s": max(tempos), "angulo_graus": angulo, "cortes": cortes,
+            "inicios": inicios, "fins": fins}
+
+
+def planejar_missao_multidrone(poligono, sensor, altura, sobreposicao, num_drones, velocidade,
+                               autonomia_min, base=(0.0, 0.0), margem_seguranca=0.8,
+                               tempo_troca_min=3.0, num_angulos=4, n_processos=1):
+    """
+    Divide a cobertura de um polígono entre K drones com tempo de voo equilibrado
+    e surtidas limitadas pela bateria.
+
+    A faixa de varredura vem de calcular_geometria_voo com o FOV do sensor em
+    SENSORES. Os planos candidatos (ângulos de varredura mais estreitos × dois
+    sentidos da rota gigante) são avaliados e vence o de menor makespan (tempo
+    até o último drone pousar). A avaliação é serial por padrão: com poucos
+    candidatos o custo de iniciar o pool de processos supera o ganho.
+
+    Parâmetros:
+    - poligono: Array (N, 2) em metros (x leste, y norte) relativo à base
+    - sensor: Chave de SENSORES
+    - altura, sobreposicao: Como em calcular_geometria_voo
+    - num_drones: Número de aeronaves disponíveis (K)
+    - velocidade: Velocidade de cruzeiro (m/s)
+    - autonomia_min: Autonomia nominal da bateria (minutos)
+    - base: (x, y) do ponto de decolagem e troca de baterias
+    - margem_seguranca: Fração utilizável da autonomia
+    - tempo_troca_min: Tempo em solo para troca de bateria (minutos)
+    - num_angulos: Ângulos de varredura candidatos
+    - n_processos: Processos em paralelo (1 = serial, None = núcleos disponíveis)
+
+    Retorna:
+    - df_waypoints: DataFrame (Drone, Surtida, Ordem, X (m), Y (m), Tipo)
+    - df_cronograma: DataFrame (Drone, Surtida, Atividade, Início (min), Fim (min))
+    - resumo: Dicionário com makespan_min, angulo_graus, largura_faixa,
+      num_passagens e o DataFrame por_drone (tempo, distância, surtidas)
+    """
+    poligono = np.asarray(poligono, dtype=float)
+    base = np.asarray(base, dtype=float)
+    extensao = np.ptp(poligono, axis=0)
+    largura_faixa, _, _ = calcular_geometria_voo(altura, SENSORES[sensor]["fov"],
+                                                  extensao[0], extensao[1], sobreposicao)
+    espacamento = largura_faixa * (1 - sobreposicao)
+    autonomia_s = autonomia_min * margem_seguranca * 60
+    troca_s = tempo_troca_min * 60
+
+    tarefas = [(poligono, espacamento, math.degrees(a), inverter, base, int(num_drones),
+                velocidade, autonomia_s, troca_s)
+               for a in _angulos_candidatos(poligono, num_angulos) for inverter in (False, True)]
+    if n_processos == 1 or len(tarefas) == 1:
+        candidatos = list(map(_avaliar_plano_multidrone, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            candidatos = list(executor.map(_avaliar_plano_multidrone, tarefas))
+    melhor = min(candidatos, key=lambda c: c["makespan_s"])
+
+    linhas_wp, linhas_cron, linhas_drone = [], [], []
+    cortes = melhor["cortes"]
+    for k, (i, j) in enumerate(zip(cortes[:-1], cortes[1:]), start=1):
+        t, dist, surtidas, excede, wps, eventos = _executar_surtidas(
+            melhor["inicios"][i:j], melhor["fins"][i:j], base, velocidade, autonomia_s, troca_s, registrar=True)
+        linhas_wp += [(k, s, n, x, y, tipo) for n, (x, y, tipo, s) in enumerate(wps, start=1)]
+        linhas_cron += [(k, s, atv, ini / 60, fim / 60) for s, atv, ini, fim in eventos]
+        linhas_drone.append((k, j - i, surtidas, dist, t / 60, excede))
+
+    df_waypoints = pd.DataFrame(linhas_wp, columns=["Drone", "Surtida", "Ordem", "X (m)", "Y (m)", "Tipo"])
+    df_cronograma = pd.DataFrame(linhas_cron, columns=["Drone", "Surtida", "Atividade", "Início (min)", "Fim (min)"])
+    por_drone = pd.DataFrame(linhas_drone, columns=["Drone", "Passagens", "Surtidas", "Distância (m)",
+                                                    "Tempo de Missão (min)", "Excede Autonomia"])
+    resumo = {
+        "makespan_min": melhor["makespan_s"] / 60,
+        "angulo_graus": melhor["angulo_graus"],
+        "largura_faixa": largura_faixa,
+        "num_passagens": len(melhor["inicios"]),
+        "por_drone": por_drone,
+    }
+    return df_waypoints, df_cronograma, resumo
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _planejar_missao_multidrone_cache(poligono, sensor, altura, sobreposicao, num_drones, velocidade,
+                                      autonomia_min, margem_seguranca=0.8, tempo_troca_min=3.0):
+    """Plano multi-drone memorizado por entrada (evita replanejar a cada rerun da interface)."""
+    return planejar_missao_multidrone(poligono, sensor, altura, sobreposicao, num_drones, velocidade,
+                                      autonomia_min, margem_seguranca=margem_seguranca,
+                                      tempo_troca_min=tempo_troca_min)
+
+# =============================================================================
+# 5. RASTER DE COBERTURA DO SENSOR (PROVA DE COBERTURA E LACUNAS)
+# =============================================================================
+# Cada quadro do sensor projeta no solo um retângulo de largura igual à faixa
+# (swath) orientado na direção da passagem. A área é rasterizada em blocos
+# (tiles) para que grades de 1 cm sobre hectares caibam na memória: dentro de
+# uma passagem, todos os quadros compartilham a orientação, então o número de
+# quadros que enxergam cada célula é obtido por busca binária nas posições dos
+# centros dos quadros (searchsorted), sem laço por quadro.
+# Referências: ASPRS Positional Accuracy Standards (2014); Pix4D - Image
+# acquisition guidelines (sobreposição frontal e lateral)
+
+
+def _gerar_quadros(passagens, espacamento_frontal):
+    """
+    Posições dos centros dos quadros ao longo de cada passagem.
+
+    Retorna lista de arrays com a coordenada ao longo da passagem (metros) e o
+    número total de quadros.
+    """
+    comprimentos = np.hypot(*(passagens[:, 1] - passagens[:, 0]).T)
+    quadros = [np.linspace(0.0, c, max(1, math.ceil(c / espacamento_frontal)) + 1) for c in comprimentos]
+    return quadros, int(sum(len(q) for q in quadros))
+
+
+def _mascara_poligono(p1, p2, xs, ys):
+    """
+    Mascara (R, C) das células cujo centro está dentro dos anéis (regra
+    par-ímpar): os cruzamentos de cada linha com as arestas marcam trocas de
+    paridade, acumuladas por cumsum ao longo das colunas.
+    """
+    yy = ys[:, None]
+    y1, y2 = p1[:, 1], p2[:, 1]
+    cruza = ((y1 <= yy) & (y2 > yy)) | ((y2 <= yy) & (y1 > yy))
+    dy = np.where(y2 != y1, y2 - y1, 1.0)
+    xc = p1[:, 0] + (yy - y1) * (p2[:, 0] - p1[:, 0]) / dy
+    linhas, arestas = np.nonzero(cruza)
+    passo = xs[1] - xs[0] if len(xs) > 1 else 1.0
+    colunas = np.clip(np.ceil((xc[linhas, arestas] - xs[0]) / passo), 0, len(xs)).astype(int)
+    trocas = np.zeros((len(ys), len(xs) + 1), dtype=np.int8)
+    np.add.at(trocas, (linhas, colunas), 1)
+    return (np.cumsum(trocas, axis=1)[:, :len(xs)] % 2) == 1
+
+
+def calcular_raster_cobertura(poligono, passagens, largura_faixa, sobreposicao, resolucao=0.05,
+                              buracos=None, razao_aspecto=1.0, min_observacoes=1,
+                              tamanho_bloco=2048, max_celulas_resumo=200):
+    """
+    Rasteriza as pegadas do sensor ao longo das passagens e conta quantas vezes
+    cada célula do polígono foi observada.
+
+    Parâmetros:
+    - poligono: Array (N, 2) em metros (x leste, y norte)
+    - passagens: Array (P, 2, 2) com início e fim de cada linha de varredura
+    - largura_faixa: Largura da faixa no solo (metros), de calcular_geometria_voo
+    - sobreposicao: Sobreposição frontal entre quadros consecutivos (0-1)
+    - resolucao: Tamanho da célula do raster (metros; 0.01 = 1 cm)
+    - buracos: Zonas de exclusão internas, não contadas como área a cobrir
+    - razao_aspecto: Comprimento do quadro ao longo da passagem / largura da faixa
+    - min_observacoes: Observações exigidas por célula (2+ para fotogrametria)
+    - tamanho_bloco: Lado do tile processado por vez (células)
+    - max_celulas_resumo: Lado máximo dos mapas-resumo retornados
+
+    Retorna:
+    - Dicionário com cobertura_percentual, area_alvo_m2, area_lacunas_m2,
+      num_quadros, num_celulas, histograma (Series observações → área m²),
+      mapa_lacunas (fração não coberta por bloco do resumo), mapa_observacoes
+      (média de observações por bloco), extensao (x0, y0, x1, y1) e lacunas
+      (DataFrame com área e centroide de cada região descoberta)
+    """
+    poligono = np.asarray(poligono, dtype=float)
+    passagens = np.asarray(passagens, dtype=float).reshape(-1, 2, 2)
+    p1, p2 = _arestas_aneis([poligono] + [np.asarray(b, dtype=float) for b in (buracos or [])])
+
+    x0, y0 = poligono.min(axis=0)
+    x1, y1 = poligono.max(axis=0)
+    nx = max(1, math.ceil((x1 - x0) / resolucao))
+    ny = max(1, math.ceil((y1 - y0) / resolucao))
+
+    # Fator de redução do resumo; os tiles são múltiplos dele
+    fator = max(1, math.ceil(max(nx, ny) / max_celulas_resumo))
+    bloco = max(fator, (tamanho_bloco // fator) * fator)
+    nbx, nby = math.ceil(nx / fator), math.ceil(ny / fator)
+    alvo_resumo = np.zeros((nby, nbx))
+    lacuna_resumo = np.zeros((nby, nbx))
+    obs_resumo = np.zeros((nby, nbx))
+    max_hist = 16
+    histograma = np.zeros(max_hist + 1, dtype=np.int64)
+
+    espacamento_frontal = largura_faixa * razao_aspecto * (1 - sobreposicao)
+    quadros, num_quadros = _gerar_quadros(passagens, max(espacamento_frontal, resolucao))
+    meia_largura = largura_faixa / 2
+    meio_comprimento = largura_faixa * razao_aspecto / 2
+    direcoes = passagens[:, 1] - passagens[:, 0]
+    direcoes = direcoes / np.maximum(np.hypot(*direcoes.T), 1e-12)[:, None]
+    # Caixa envolvente de cada passagem expandida pela meia-diagonal do quadro
+    folga = math.hypot(meia_largura, meio_comprimento)
+    caixa_min = passagens.min(axis=1) - folga
+    caixa_max = passagens.max(axis=1) + folga
+
+    for r0 in range(0, ny, bloco):
+        ys = y0 + (r0 + np.arange(min(bloco, ny - r0)) + 0.5) * resolucao
+        for c0 in range(0, nx, bloco):
+            xs = x0 + (c0 + np.arange(min(bloco, nx - c0)) + 0.5) * resolucao
+            dentro = _mascara_poligono(p1, p2, xs, ys)
+            if not dentro.any():
+                continue
+            contagem = np.zeros(dentro.shape, dtype=np.uint16)
+
+            tocam = np.nonzero((caixa_max[:, 0] >= xs[0]) & (caixa_min[:, 0] <= xs[-1]) &
+                               (caixa_max[:, 1] >= ys[0]) & (caixa_min[:, 1] <= ys[-1]))[0]
+            for p in tocam:
+                # Janela do tile afetada pela passagem
+                ca, cb = np.searchsorted(xs, [caixa_min[p, 0], caixa_max[p, 0]])
+                ra, rb = np.searchsorted(ys, [caixa_min[p, 1], caixa_max[p, 1]])
+                if ca >= cb or ra >= rb:
+                    continue
+                dx = (xs[ca:cb] - passagens[p, 0, 0]).astype(np.float32)[None, :]
+                dy = (ys[ra:rb] - passagens[p, 0, 1]).astype(np.float32)[:, None]
+                ux, uy = np.float32(direcoes[p, 0]), np.float32(direcoes[p, 1])
+                faixa = np.abs(dy * ux - dx * uy) <= meia_largura
+                u = dx * ux + dy * uy
+                # Quadros igualmente espaçados: contagem em forma fechada
+                n_q = len(quadros[p])
+                passo_q = np.float32(quadros[p][-1] / (n_q - 1)) if quadros[p][-1] > 0 else None
+                if passo_q is None:
+                    vistos = np.where(np.abs(u) <= meio_comprimento, n_q, 0)
+                else:
+                    ultimo = np.minimum(np.floor((u + meio_comprimento) / passo_q), n_q - 1)
+                    primeiro = np.maximum(np.ceil((u - meio_comprimento) / passo_q), 0)
+                    vistos = np.maximum(ultimo - primeiro + 1, 0)
+                contagem[ra:rb, ca:cb] += np.where(faixa, vistos, 0).astype(np.uint16)
+
+            observacoes = np.where(dentro, contagem, 0)
+            lacuna = dentro & (contagem < min_observacoes)
+            histograma += np.bincount(np.minimum(contagem[dentro], max_hist), minlength=max_hist + 1)
+
+            # Redução por blocos do resumo (tile é múltiplo do fator, exceto nas bordas)
+            R, C = dentro.shape
+            pr, pc = (-R) % fator, (-C) % fator
+            br, bc = r0 // fator, c0 // fator
+            for destino, campo in ((alvo_resumo, dentro), (lacuna_resumo, lacuna), (obs_resumo, observacoes)):
+                if pr or pc:
+                    campo = np.pad(campo, ((0, pr), (0, pc)))
+                reduzido = (campo.reshape((R + pr) // fator, fator, (C + pc) // fator, fator)
+                            .sum(axis=3, dtype=np.int64).sum(axis=1))
+                destino[br:br + reduzido.shape[0], bc:bc + reduzido.shape[1]] += reduzido
+
+    area_celula = resolucao ** 2
+    celulas_alvo = int(alvo_resumo.sum())
+    celulas_lacuna = int(lacuna_resumo.sum())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mapa_lacunas = np.where(alvo_resumo > 0, lacuna_resumo / alvo_resumo, np.nan)
+        mapa_observacoes = np.where(alvo_resumo > 0, obs_resumo / alvo_resumo, np.nan)
+
+    # Regiões descobertas: componentes conexos dos blocos do resumo com lacunas
+    rotulos, num_lacunas = ndimage.label(lacuna_resumo > 0, structure=np.ones((3, 3)))
+    if num_lacunas:
+        idx = np.arange(1, num_lacunas + 1)
+        area = ndimage.sum(lacuna_resumo, rotulos, idx) * area_celula
+        cy, cx = np.array(ndimage.center_of_mass(lacuna_resumo, rotulos, idx)).reshape(-1, 2).T
+        lacunas = pd.DataFrame({
+            "Lacuna": idx,
+            "Área (m²)": area,
+            "X (m)": x0 + (cx + 0.5) * fator * resolucao,
+            "Y (m)": y0 + (cy + 0.5) * fator * resolucao,
+        }).sort_values("Área (m²)", ascending=False, ignore_index=True)
+    else:
+        lacunas = pd.DataFrame(columns=["Lacuna", "Área (m²)", "X (m)", "Y (m)"])
+
+    return {
+        "cobertura_percentual": 100.0 * (1 - celulas_lacuna / celulas_alvo) if celulas_alvo else 0.0,
+        "area_alvo_m2": celulas_alvo * area_celula,
+        "area_lacunas_m2": celulas_lacuna * area_celula,
+        "num_quadros": num_quadros,
+        "num_celulas": nx * ny,
+        "histograma": pd.Series(histograma * area_celula, index=np.arange(max_hist + 1)),
+        "mapa_lacunas": mapa_lacunas,
+        "mapa_observacoes": mapa_observacoes,
+        "extensao": (x0, y0, x0 + nbx * fator * resolucao, y0 + nby * fator * resolucao),
+        "lacunas": lacunas,
+    }
+
+# =============================================================================
+# 6. INTERFACE VISUAL
+# =============================================================================
+def montar_geojson_varredura(lat_ref, lon_ref, largura_faixa, sobreposicao, num_passagens, comprimento_m):
+    """
+    Monta as linhas de varredura do padrão lawnmower como uma única
+    FeatureCollection GeoJSON.
+
+    As coordenadas de todas as passagens são calculadas de uma vez com NumPy e
+    os dados de cada passagem viajam como propriedades da feição (lidas pelo
+    tooltip do próprio layer), em vez de um objeto folium com HTML próprio por
+    passagem. Os marcadores de início/fim da primeira e da última passagem
+    entram na mesma coleção como pontos.
+
+    Retorna:
+    - Dicionário GeoJSON (FeatureCollection)
+    """
+    i = np.arange(num_passagens)
+    offset_m = i * largura_faixa * (1 - sobreposicao)
+    lon_linha = lon_ref + offset_m / (METROS_POR_GRAU * math.cos(math.radians(lat_ref)))
+    lat_fim = lat_ref + comprimento_m / METROS_POR_GRAU
+    cores = np.where(i % 2 == 0, "red", "orange")
+
+    # GeoJSON usa a ordem [longitude, latitude]
+    inicio = np.column_stack([lon_linha, np.full(num_passagens, lat_ref)])
+    fim = np.column_stack([lon_linha, np.full(num_passagens, lat_fim)])
+    linhas = np.stack([inicio, fim], axis=1).round(7).tolist()
+
+    feicoes = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": coords},
+            "properties": {"rotulo": f"Passagem {n}/{num_passagens}", "offset_m": off, "cor": cor},
+        }
+        for n, coords, off, cor in zip((i + 1).tolist(), linhas, offset_m.round(1).tolist(), cores.tolist())
+    ]
+    extremos = sorted({0, num_passagens - 1}) if num_passagens else []
+    for k in extremos:
+        for ponto, rotulo in ((linhas[k][0], "Início"), (linhas[k][1], "Fim")):
+            feicoes.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": ponto},
+                "properties": {"rotulo": f"{rotulo} Passagem {k + 1}", "offset_m": float(offset_m[k].round(1)),
+                               "cor": str(cores[k])},
+            })
+    return {"type": "FeatureCollection", "features": feicoes}
+
+
 def renderizar():
     st.title("Planejamento de Missão de Reconhecimento Aéreo (Drone)")
     st.markdown("**Reconhecimento aéreo autônomo para mapeamento de áreas de risco e planejamento de missões de drone**")
@@ -359,9 +1048,9 @@ def renderizar():
         
         # Cálculo Geográfico da Área
         # 1 grau de latitude ≈ 111.000 metros (constante)
-        dlat = (comprimento_m / 111000)
+        dlat = (comprimento_m / METROS_POR_GRAU)
         # Longitude depende da latitude (cosseno da latitude)
-        dlon = (largura_m / (111000 * math.cos(math.radians(lat_input))))
+        dlon = (largura_m / (METROS_POR_GRAU * math.cos(math.radians(lat_input))))
         
         # Coordenadas dos cantos da área
         canto_inferior_esquerdo = [lat_input, lon_input]
@@ -378,45 +1067,15 @@ def renderizar():
             popup=f"<b>Área de Mapeamento</b><br>Dimensões: {largura_m} × {comprimento_m} m<br>Área: {area_cobertura:.2f} hectares<br>Passagens: {passagens}"
         ).add_to(m)
 
-        # Gerar e desenhar as linhas de varredura (Sweep Lines)
+        # Linhas de varredura (Sweep Lines) em um único layer GeoJSON
         # Padrão alternado de cores para facilitar visualização
-        for i in range(passagens):
-            # Offset lateral proporcional à largura do sensor e sobreposição
-            offset_m = i * (swath * (1 - sobreposicao))
-            offset_lon = offset_m / (111000 * math.cos(math.radians(lat_input)))
-            
-            # Alternar cores para facilitar visualização
-            cor = "red" if i % 2 == 0 else "orange"
-            
-            # Coordenadas da linha de varredura
-            ponto_inicio = [lat_input, lon_input + offset_lon]
-            ponto_fim = [lat_input + dlat, lon_input + offset_lon]
-            
-            folium.PolyLine(
-                [ponto_inicio, ponto_fim],
-                color=cor, 
-                weight=3, 
-                opacity=0.8,
-                tooltip=f"<b>Linha de Varredura {i+1}/{passagens}</b><br>Largura da faixa: {swath:.1f} m",
-                popup=f"<b>Passagem {i+1}</b><br>Largura da faixa: {swath:.1f} m<br>Offset: {offset_m:.1f} m"
-            ).add_to(m)
-            
-            # Adicionar marcadores nos pontos de início e fim das linhas (apenas nas extremidades)
-            if i == 0 or i == passagens - 1:
-                folium.CircleMarker(
-                    ponto_inicio,
-                    radius=5,
-                    color=cor,
-                    fill=True,
-                    tooltip=f"Início Passagem {i+1}"
-                ).add_to(m)
-                folium.CircleMarker(
-                    ponto_fim,
-                    radius=5,
-                    color=cor,
-                    fill=True,
-                    tooltip=f"Fim Passagem {i+1}"
-                ).add_to(m)
+        folium.GeoJson(
+            montar_geojson_varredura(lat_input, lon_input, swath, sobreposicao, passagens, comprimento_m),
+            name="Linhas de Varredura",
+            style_function=lambda f: {"color": f["properties"]["cor"], "weight": 3, "opacity": 0.8},
+            marker=folium.CircleMarker(radius=5, fill=True),
+            tooltip=folium.GeoJsonTooltip(fields=["rotulo", "offset_m"], aliases=["Linha:", "Offset (m):"]),
+        ).add_to(m)
 
         # Adicionar legenda
         legend_html = f'''
@@ -438,6 +1097,219 @@ def renderizar():
                   f"**Área:** {area_cobertura:.2f} hectares | "
                   f"**Passagens:** {passagens} linhas de voo")
         
+        # --- COBERTURA DE POLÍGONO IRREGULAR ---
+        st.markdown("---")
+        st.subheader("Cobertura de Área Irregular (Polígono)")
+        st.caption("Áreas reais de busca raramente são retângulos. Informe os vértices do polígono "
+                  "(pegada de pluma, campo de escombros) e o planejador escolhe o ângulo de varredura "
+                  "com menos curvas, decompõe a área em células de Boustrophedon e gera os waypoints.")
+
+        # Polígono de exemplo: pegada irregular ao redor do ponto de decolagem
+        exemplo_xy = np.array([
+            [0, 0], [120, -30], [260, 10], [320, 120], [250, 180],
+            [280, 300], [150, 340], [90, 230], [-40, 260], [-60, 110]
+        ], dtype=float)
+        exemplo_latlon = desprojetar_local(exemplo_xy, lat_input, lon_input)
+        texto_padrao = "\n".join(f"{la:.6f}, {lo:.6f}" for la, lo in exemplo_latlon)
+
+        texto_poligono = st.text_area(
+            "Vértices do Polígono (uma linha por vértice: latitude, longitude)",
+            value=texto_padrao,
+            height=200,
+            help="Cole coordenadas em graus decimais, uma por linha, na ordem do contorno."
+        )
+
+        try:
+            vertices = np.array([
+                [float(v) for v in linha.replace(";", ",").split(",")[:2]]
+                for linha in texto_poligono.strip().splitlines() if linha.strip()
+            ])
+        except ValueError:
+            vertices = np.zeros((0, 2))
+
+        if vertices.ndim != 2 or len(vertices) < 3 or vertices.shape[1] != 2:
+            st.error("Informe pelo menos 3 vértices no formato 'latitude, longitude'.")
+        else:
+            poligono_xy = projetar_local(vertices[:, 0], vertices[:, 1], lat_input, lon_input)
+            espacamento = swath * (1 - sobreposicao)
+            plano = planejar_cobertura_poligono(poligono_xy, espacamento, ponto_inicial=(0.0, 0.0))
+
+            area_poligono = 0.5 * abs(np.dot(poligono_xy[:, 0], np.roll(poligono_xy[:, 1], 1))
+                                      - np.dot(poligono_xy[:, 1], np.roll(poligono_xy[:, 0], 1)))
+            waypoints_latlon = desprojetar_local(plano["waypoints"], lat_input, lon_input)
+            # Distância inclui ida do ponto de decolagem ao primeiro waypoint e retorno
+            if len(plano["waypoints"]):
+                ida = np.hypot(*plano["waypoints"][0])
+                volta = np.hypot(*plano["waypoints"][-1])
+            else:
+                ida = volta = 0.0
+            dist_poligono = plano["distancia_total"] + ida + volta
+            tempo_poligono = dist_poligono / velocidade / 60
+
+            p1, p2, p3, p4 = st.columns(4)
+            p1.metric("Ângulo de Varredura", f"{plano['angulo_graus']:.1f}°",
+                     help="Direção das passagens medida a partir do leste (anti-horário)")
+            p2.metric("Passagens / Células", f"{plano['num_passagens']} / {plano['num_celulas']}",
+                     help="Segmentos de varredura e células de Boustrophedon")
+            p3.metric("Distância Total", f"{dist_poligono:.0f} m", f"{plano['num_curvas']} curvas",
+                     help="Inclui translados entre células, ida e retorno ao ponto de decolagem")
+            p4.metric("Tempo Estimado", f"{tempo_poligono:.1f} min", f"{area_poligono / 10000:.2f} ha",
+                     help="Tempo a velocidade de cruzeiro constante")
+
+            if tempo_poligono > autonomia_util:
+                st.warning(f"O tempo estimado ({tempo_poligono:.1f} min) excede a autonomia útil "
+                          f"({autonomia_util:.1f} min). Divida a área em múltiplos voos.")
+
+            m_poli = folium.Map(location=[lat_input, lon_input], zoom_start=17, tiles="OpenStreetMap")
+            folium.Marker([lat_input, lon_input], tooltip="Ponto de Decolagem/Pouso",
+                          icon=folium.Icon(color="blue", icon="home", prefix="fa")).add_to(m_poli)
+            folium.Polygon(vertices.tolist(), color="blue", fill=True, fill_opacity=0.15, weight=3,
+                           tooltip=f"Área de busca: {area_poligono / 10000:.2f} ha").add_to(m_poli)
+            if len(waypoints_latlon):
+                rota = [[lat_input, lon_input]] + waypoints_latlon.tolist() + [[lat_input, lon_input]]
+                folium.PolyLine(rota, color="red", weight=2, opacity=0.8,
+                                tooltip=f"Rota de cobertura: {len(waypoints_latlon)} waypoints").add_to(m_poli)
+            st_folium(m_poli, width=None, height=500, key="mapa_poligono")
+
+            with st.expander("Waypoints da Missão"):
+                st.dataframe(pd.DataFrame({
+                    "Waypoint": np.arange(1, len(waypoints_latlon) + 1),
+                    "Latitude": waypoints_latlon[:, 0],
+                    "Longitude": waypoints_latlon[:, 1],
+                }), hide_index=True, use_container_width=True)
+
+            # --- PROVA DE COBERTURA ---
+            st.markdown("#### Prova de Cobertura do Sensor (Raster de Observações)")
+            st.caption("Rasteriza a pegada de cada quadro do sensor ao longo das passagens e verifica se todo o "
+                      "polígono foi observado o número mínimo de vezes, apontando as lacunas.")
+            c_cb1, c_cb2, c_cb3, c_cb4 = st.columns(4)
+            resolucao_cob = c_cb1.select_slider(
+                "Resolução do Raster (m)", options=[1.0, 0.5, 0.25, 0.1, 0.05, 0.01], value=0.25,
+                help="Tamanho da célula. Resoluções finas (1 cm) são processadas em blocos e levam alguns segundos por hectare."
+            )
+            min_obs = c_cb2.number_input("Observações Mínimas por Célula", min_value=1, max_value=6, value=1,
+                                         help="1 para detecção; 2 ou mais para fotogrametria/estéreo.")
+            pixels_sensor = c_cb3.number_input("Pixels na Largura do Sensor", min_value=100, max_value=20000,
+                                               value=4000, step=100,
+                                               help="Resolução transversal do sensor, usada para calcular o GSD.")
+            gsd_exigido = c_cb4.number_input("GSD Exigido (cm/pixel)", min_value=0.1, max_value=100.0,
+                                             value=2.0, step=0.1,
+                                             help="Distância de amostragem no solo máxima aceitável.")
+
+            gsd_cm = swath / pixels_sensor * 100
+            if gsd_cm > gsd_exigido:
+                st.error(f"**GSD INSUFICIENTE:** {gsd_cm:.2f} cm/pixel a {altura_voo} m excede o exigido "
+                        f"({gsd_exigido:.2f} cm/pixel). Reduza a altura de voo.")
+            else:
+                st.success(f"**GSD ATENDIDO:** {gsd_cm:.2f} cm/pixel (exigido ≤ {gsd_exigido:.2f} cm/pixel).")
+
+            if 'drone_cobertura' not in st.session_state:
+                st.session_state['drone_cobertura'] = False
+            if st.button("Calcular Raster de Cobertura", use_container_width=True):
+                st.session_state['drone_cobertura'] = True
+
+            if st.session_state['drone_cobertura'] and len(plano["waypoints"]):
+                with st.spinner("Rasterizando pegadas do sensor..."):
+                    cobertura = calcular_raster_cobertura(
+                        poligono_xy, plano["waypoints"].reshape(-1, 2, 2), swath, sobreposicao,
+                        resolucao=resolucao_cob, min_observacoes=int(min_obs), max_celulas_resumo=60
+                    )
+
+                cb1, cb2, cb3, cb4 = st.columns(4)
+                cb1.metric("Cobertura", f"{cobertura['cobertura_percentual']:.2f}%",
+                          help=f"Fração da área com pelo menos {int(min_obs)} observação(ões)")
+                cb2.metric("Área Descoberta", f"{cobertura['area_lacunas_m2']:.1f} m²",
+                          f"{len(cobertura['lacunas'])} lacuna(s)", delta_color="inverse")
+                cb3.metric("Quadros do Sensor", f"{cobertura['num_quadros']}")
+                cb4.metric("Células Avaliadas", f"{cobertura['num_celulas']:,}".replace(",", "."))
+
+                x0c, y0c, x1c, y1c = cobertura["extensao"]
+                nby, nbx = cobertura["mapa_lacunas"].shape
+                gx, gy = np.meshgrid(np.linspace(x0c, x1c, nbx, endpoint=False) + (x1c - x0c) / nbx / 2,
+                                     np.linspace(y0c, y1c, nby, endpoint=False) + (y1c - y0c) / nby / 2)
+                df_cob = pd.DataFrame({
+                    "X (m)": gx.ravel().round(1), "Y (m)": gy.ravel().round(1),
+                    "Fração Descoberta": cobertura["mapa_lacunas"].ravel(),
+                    "Observações Médias": cobertura["mapa_observacoes"].ravel(),
+                }).dropna()
+                mapa_cob = alt.Chart(df_cob).mark_rect().encode(
+                    x=alt.X("X (m):O", axis=None),
+                    y=alt.Y("Y (m):O", axis=None, sort="descending"),
+                    color=alt.Color("Fração Descoberta:Q", scale=alt.Scale(scheme="reds", domain=[0, 1])),
+                    tooltip=["X (m)", "Y (m)", alt.Tooltip("Fração Descoberta:Q", format=".1%"),
+                             alt.Tooltip("Observações Médias:Q", format=".1f")]
+                ).properties(height=400, title="Mapa de Lacunas (fração não observada por bloco)")
+                st.altair_chart(mapa_cob, use_container_width=True)
+
+                if len(cobertura["lacunas"]):
+                    latlon_lac = desprojetar_local(cobertura["lacunas"][["X (m)", "Y (m)"]].to_numpy(),
+                                                   lat_input, lon_input)
+                    st.dataframe(cobertura["lacunas"].assign(Latitude=latlon_lac[:, 0], Longitude=latlon_lac[:, 1])
+                                 .drop(columns=["X (m)", "Y (m)"]).round({"Área (m²)": 2}),
+                                 hide_index=True, use_container_width=True)
+                    st.warning("Programe passagens complementares sobre as lacunas listadas.")
+
+            # --- MISSÃO MULTI-DRONE ---
+            st.markdown("#### Divisão da Área entre Múltiplos Drones")
+            st.caption("A rota de cobertura é dividida entre os drones com tempos de voo equilibrados. "
+                      "Quando a bateria não comporta a próxima passagem mais o retorno, o drone volta à "
+                      "base para troca e retoma a varredura.")
+            c_md1, c_md2 = st.columns(2)
+            num_drones = c_md1.number_input("Número de Drones", min_value=1, max_value=10, value=3, step=1,
+                                            help="Aeronaves operando simultaneamente a partir do ponto de decolagem.")
+            tempo_troca = c_md2.number_input("Tempo de Troca de Bateria (min)", min_value=0.0, max_value=30.0,
+                                             value=3.0, step=0.5,
+                                             help="Tempo em solo entre surtidas (pouso, troca e decolagem).")
+
+            df_wp, df_cron, resumo_md = _planejar_missao_multidrone_cache(
+                poligono_xy, sensor_nome, altura_voo, sobreposicao, int(num_drones), velocidade,
+                autonomia_bateria, margem_seguranca=margem_seguranca, tempo_troca_min=tempo_troca
+            )
+            por_drone = resumo_md["por_drone"]
+
+            md1, md2, md3 = st.columns(3)
+            md1.metric("Tempo até o Último Pouso", f"{resumo_md['makespan_min']:.1f} min",
+                      f"{tempo_poligono - resumo_md['makespan_min']:.1f} min vs. 1 drone sem troca",
+                      help="Makespan: tempo até o último drone concluir sua parte da missão")
+            md2.metric("Surtidas Totais", f"{int(por_drone['Surtidas'].sum())}",
+                      help="Número total de decolagens (cada surtida usa uma bateria)")
+            md3.metric("Ângulo de Varredura", f"{resumo_md['angulo_graus']:.1f}°",
+                      help="Melhor ângulo entre os candidatos avaliados")
+
+            if por_drone["Excede Autonomia"].any():
+                st.error("Há passagens que, somadas ao translado e ao retorno, excedem a autonomia útil de uma bateria. "
+                        "Reduza a área, aproxime a base ou aumente a altura de voo.")
+
+            st.dataframe(por_drone.style.format({"Distância (m)": "{:.0f}", "Tempo de Missão (min)": "{:.1f}"}),
+                         hide_index=True, use_container_width=True)
+
+            cronograma = alt.Chart(df_cron).mark_bar().encode(
+                x=alt.X("Início (min):Q", title="Tempo (min)"),
+                x2="Fim (min):Q",
+                y=alt.Y("Drone:O"),
+                color=alt.Color("Atividade:N", scale=alt.Scale(
+                    domain=ATIVIDADES_MISSAO, range=["#9e9e9e", "#d62728", "#1f77b4", "#ff7f0e"])),
+                tooltip=["Drone", "Surtida", "Atividade",
+                         alt.Tooltip("Início (min):Q", format=".1f"), alt.Tooltip("Fim (min):Q", format=".1f")]
+            ).properties(height=40 * int(num_drones) + 60, title="Cronograma da Missão")
+            st.altair_chart(cronograma, use_container_width=True)
+
+            cores_drones = ["red", "green", "purple", "orange", "darkblue", "cadetblue", "darkred", "pink", "black", "gray"]
+            m_multi = folium.Map(location=[lat_input, lon_input], zoom_start=16, tiles="OpenStreetMap")
+            folium.Marker([lat_input, lon_input], tooltip="Base de Decolagem e Troca de Baterias",
+                          icon=folium.Icon(color="blue", icon="home", prefix="fa")).add_to(m_multi)
+            folium.Polygon(vertices.tolist(), color="blue", fill=True, fill_opacity=0.1, weight=2).add_to(m_multi)
+            for drone_id, grupo in df_wp.groupby("Drone"):
+                latlon = desprojetar_local(grupo[["X (m)", "Y (m)"]].to_numpy(), lat_input, lon_input)
+                folium.PolyLine(latlon.tolist(), color=cores_drones[(drone_id - 1) % len(cores_drones)],
+                                weight=2, opacity=0.8, tooltip=f"Drone {drone_id}").add_to(m_multi)
+            st_folium(m_multi, width=None, height=500, key="mapa_multidrone")
+
+            with st.expander("Waypoints por Drone"):
+                latlon_wp = desprojetar_local(df_wp[["X (m)", "Y (m)"]].to_numpy(), lat_input, lon_input)
+                st.dataframe(df_wp.assign(Latitude=latlon_wp[:, 0], Longitude=latlon_wp[:, 1])
+                             .drop(columns=["X (m)", "Y (m)"]), hide_index=True, use_container_width=True)
+
         # Recomendações
         st.markdown("---")
         st.markdown("### Recomendações Operacionais")
@@ -471,6 +1343,7 @@ def renderizar():
         - Não considera obstáculos (edifícios, árvores, linhas de energia)
         - Assume condições ideais de voo (sem vento, visibilidade perfeita)
         - Não modela consumo de bateria variável (subida, descida, vento)
+        - Na divisão multi-drone, não considera conflitos de espaço aéreo nem fila na troca de baterias
         - Assume velocidade constante durante toda a missão
         
         **Interpretação dos Resultados:**
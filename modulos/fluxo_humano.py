@@ -1,27 +1,175 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import networkx as nx
 import math
+import heapq
+import json
+import os
+import hashlib
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
 import altair as alt
+import folium
+from streamlit_folium import st_folium
 
 # =============================================================================
 # 1. MOTOR DE ROTEAMENTO (ALGORITMO DE BUSCA PONDERADA)
 # =============================================================================
-# Baseado em: Algoritmos de Roteamento em Grafos (Dijkstra, A*), NetworkX
+# Baseado em: Algoritmos de Roteamento em Grafos (Dijkstra, A*), scipy.sparse.csgraph
 # O algoritmo encontra o caminho de menor custo considerando:
 # - Distância física
 # - Zonas de perigo (plumas tóxicas, radiação, etc.)
 # - Gargalos logísticos (pontes estreitas, obstruções, trânsito)
+# A grade é representada como matriz esparsa CSR (nó = y·N + x) montada a partir
+# de rasters de custo em NumPy, sem laços Python por aresta.
 # Referências: Dijkstra (1959), Hart et al. (1968) - A* algorithm
 
+def calcular_rasters_custo(tamanho_grade, zonas_perigo, gargalos):
+    """
+    Calcula os rasters de custo da grade (indexados [y, x]).
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - zonas_perigo: Lista de dicionários com {'x', 'y', 'raio', 'intensidade'}
+    - gargalos: Lista de coordenadas (x, y) que representam gargalos logísticos
+
+    Retorna:
+    - custo_saida: Custo de deixar cada célula (distância base + risco)
+    - custo_entrada: Custo de entrar em cada célula (gargalos)
+    """
+    eixo = np.arange(tamanho_grade)
+    xx, yy = np.meshgrid(eixo, eixo)
+
+    # Custo base é a distância (1 unidade por célula)
+    custo_saida = np.ones((tamanho_grade, tamanho_grade))
+
+    # Penalidade pesada para risco: intensidade × 50 por zona que contém a célula
+    # Isso faz com que o algoritmo evite zonas de perigo
+    for zona in zonas_perigo:
+        dentro = np.hypot(xx - zona['x'], yy - zona['y']) <= zona['raio']
+        custo_saida += dentro * zona['intensidade'] * 50
+
+    # Gargalos reduzem a velocidade de evacuação mas não são letais (+10)
+    custo_entrada = np.zeros((tamanho_grade, tamanho_grade))
+    if gargalos:
+        g = np.asarray(gargalos, dtype=int).reshape(-1, 2)
+        g = g[(g >= 0).all(axis=1) & (g < tamanho_grade).all(axis=1)]
+        custo_entrada[g[:, 1], g[:, 0]] = 10.0
+
+    return custo_saida, custo_entrada
+
+def construir_grafo_grade(custo_saida, custo_entrada):
+    """
+    Monta o grafo direcionado da grade (4 vizinhos) como matriz CSR.
+
+    O peso da aresta u → v é custo_saida[u] + custo_entrada[v]. As linhas são
+    preenchidas diretamente na ordem de vizinhos (acima, esquerda, direita,
+    abaixo), que já é crescente no índice, dispensando ordenação COO → CSR.
+
+    Parâmetros:
+    - custo_saida, custo_entrada: Rasters (N, N) de calcular_rasters_custo
+
+    Retorna:
+    - grafo: scipy.sparse.csr_matrix (N², N²)
+    """
+    n = custo_saida.shape[0]
+    total = n * n
+    no = np.arange(total, dtype=np.int32)
+    x, y = no % n, no // n
+
+    deslocamentos = np.array([-n, -1, 1, n], dtype=np.int32)
+    vizinhos = no[:, None] + deslocamentos[None, :]
+    valido = np.stack([y > 0, x > 0, x < n - 1, y < n - 1], axis=1)
+
+    destinos = vizinhos[valido]
+    origens = np.repeat(no, valido.sum(axis=1))
+    pesos = custo_saida.ravel()[origens] + custo_entrada.ravel()[destinos]
+
+    indptr = np.zeros(total + 1, dtype=np.int32)
+    np.cumsum(valido.sum(axis=1), out=indptr[1:])
+    return csr_matrix((pesos, destinos, indptr), shape=(total, total))
+
+# Campos de evacuação já calculados, indexados pela configuração de perigo
+_CACHE_CAMPOS_EVACUACAO = {}
+MAX_CAMPOS_CACHE = 32
+
+def _chave_configuracao(tamanho_grade, pontos_seguros, zonas_perigo, gargalos):
+    zonas = tuple((z['x'], z['y'], z['raio'], z['intensidade']) for z in zonas_perigo)
+    return (tamanho_grade, tuple(map(tuple, pontos_seguros)), zonas, tuple(map(tuple, gargalos)))
+
+def calcular_campo_evacuacao(tamanho_grade, pontos_seguros, zonas_perigo, gargalos):
+    """
+    Calcula o campo reverso de distâncias até o ponto seguro mais próximo.
+
+    Um único Dijkstra multi-fonte sobre o grafo transposto, partindo de todos os
+    pontos seguros, fornece para cada célula o custo até a saída mais barata e o
+    próximo passo da rota. O resultado é guardado em cache pela configuração de
+    zonas de perigo, gargalos e saídas: trocar a origem não recalcula nada.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - pontos_seguros: Lista de coordenadas (x, y) de pontos seguros (destinos)
+    - zonas_perigo: Lista de dicionários com {'x', 'y', 'raio', 'intensidade'}
+    - gargalos: Lista de coordenadas (x, y) que representam gargalos logísticos
+
+    Retorna:
+    - Dicionário com 'distancias' (raster N x N, custo até a saída), 'proximo'
+      (próximo nó da rota ótima; negativo nas saídas e células isoladas),
+      'saida' (índice da saída alcançada) e 'grafo' (matriz CSR)
+    """
+    chave = _chave_configuracao(tamanho_grade, pontos_seguros, zonas_perigo, gargalos)
+    if chave in _CACHE_CAMPOS_EVACUACAO:
+        return _CACHE_CAMPOS_EVACUACAO[chave]
+
+    custo_saida, custo_entrada = calcular_rasters_custo(tamanho_grade, zonas_perigo, gargalos)
+    G = construir_grafo_grade(custo_saida, custo_entrada)
+
+    # No grafo transposto, o predecessor de cada célula é o seu próximo passo rumo à saída
+    destinos = np.array([p[1] * tamanho_grade + p[0] for p in pontos_seguros], dtype=int)
+    distancias, proximo, saida = dijkstra(G.T.tocsr(), directed=True, indices=destinos,
+                                          return_predecessors=True, min_only=True)
+
+    campo = {
+        'distancias': distancias.reshape(tamanho_grade, tamanho_grade),
+        'proximo': proximo,
+        'saida': saida,
+        'grafo': G
+    }
+    if len(_CACHE_CAMPOS_EVACUACAO) >= MAX_CAMPOS_CACHE:
+        _CACHE_CAMPOS_EVACUACAO.pop(next(iter(_CACHE_CAMPOS_EVACUACAO)))
+    _CACHE_CAMPOS_EVACUACAO[chave] = campo
+    return campo
+
+def rota_do_campo(campo, ponto_origem, tamanho_grade):
+    """
+    Percorre o campo de próximos passos da origem até a saída mais próxima.
+
+    Retorna:
+    - Lista de coordenadas (x, y); apenas a origem se não houver saída alcançável
+    """
+    no = ponto_origem[1] * tamanho_grade + ponto_origem[0]
+    if not np.isfinite(campo['distancias'].flat[no]):
+        return [ponto_origem]
+    caminho = [no]
+    proximo = campo['proximo']
+    while proximo[no] >= 0:
+        no = proximo[no]
+        caminho.append(no)
+    return [(int(n % tamanho_grade), int(n // tamanho_grade)) for n in caminho]
+
 def simular_evacuacao(tamanho_grade, ponto_origem, pontos_seguros, zonas_perigo, gargalos):
     """
     Simula evacuação calculando a rota de menor risco usando algoritmo de caminho mais curto.
     
-    Cria uma grade de grafos onde cada célula é um nó e as conexões adjacentes são arestas.
-    O algoritmo de Dijkstra encontra o caminho de menor custo ponderado, onde o custo
-    considera distância, risco de zonas de perigo e gargalos logísticos.
+    Cria uma grade onde cada célula é um nó e as conexões adjacentes são arestas
+    (matriz esparsa CSR). O campo reverso de distâncias a partir de todos os pontos
+    seguros (calcular_campo_evacuacao, em cache) fornece a rota de qualquer origem
+    até a saída de menor custo por simples caminhada no vetor de próximos passos.
+    O custo considera distância, risco de zonas de perigo e gargalos logísticos.
     
     Parâmetros:
     - tamanho_grade: Tamanho da grade (N x N)
@@ -32,61 +180,1020 @@ def simular_evacuacao(tamanho_grade, ponto_origem, pontos_seguros, zonas_perigo,
     
     Retorna:
     - melhor_rota: Lista de coordenadas (x, y) representando a rota ótima
-    - grafo: Objeto NetworkX Graph com a estrutura da grade
+    - grafo: Matriz CSR com os pesos das arestas (nó = y·N + x)
     """
-    # Criar grafo de grade 2D (cada célula é um nó, conectado aos 4 vizinhos)
-    G = nx.grid_2d_graph(tamanho_grade, tamanho_grade)
-    
-    # Adicionar pesos às arestas baseados no risco e gargalos
-    # O peso representa o "custo" de atravessar uma aresta
-    for u, v in G.edges():
-        # Custo base é a distância (1 unidade por célula)
-        custo = 1.0
-        
-        # Aumentar custo se o ponto estiver em zona de perigo
-        # Quanto mais próximo do centro da zona de perigo, maior o custo
-        for zona in zonas_perigo:
-            dist_u = math.sqrt((u[0]-zona['x'])**2 + (u[1]-zona['y'])**2)
-            if dist_u <= zona['raio']:
-                # Penalidade pesada para risco: intensidade × 50
-                # Isso faz com que o algoritmo evite zonas de perigo
-                custo += zona['intensidade'] * 50
-        
-        # Aumentar custo se houver gargalo (ex: trânsito, ponte estreita, obstrução)
-        # Gargalos reduzem a velocidade de evacuação mas não são letais
-        if v in gargalos:
-            custo += 10.0  # Penalidade moderada para gargalos
-            
-        G.add_edge(u, v, weight=custo)
-
-    # Encontrar a rota para o ponto seguro mais próximo usando algoritmo de Dijkstra
-    # O algoritmo encontra o caminho de menor custo total (não necessariamente menor distância)
-    melhor_rota = []
-    menor_custo = float('inf')
-    
-    for destino in pontos_seguros:
-        try:
-            # Calcular caminho mais curto usando Dijkstra
-            rota = nx.shortest_path(G, source=ponto_origem, target=destino, weight='weight')
-            custo_rota = nx.shortest_path_length(G, source=ponto_origem, target=destino, weight='weight')
-            
-            # Manter a rota com menor custo
-            if custo_rota < menor_custo:
-                menor_custo = custo_rota
-                melhor_rota = rota
-        except nx.NetworkXNoPath:
-            # Se não houver caminho para este destino, tentar o próximo
+    if len(pontos_seguros) == 0:
+        custo_saida, custo_entrada = calcular_rasters_custo(tamanho_grade, zonas_perigo, gargalos)
+        return [ponto_origem], construir_grafo_grade(custo_saida, custo_entrada)
+
+    campo = calcular_campo_evacuacao(tamanho_grade, pontos_seguros, zonas_perigo, gargalos)
+    return rota_do_campo(campo, ponto_origem, tamanho_grade), campo['grafo']
+
+# --- Busca ponto a ponto: A* e A* bidirecional ---
+# Quando interessam apenas uma origem e poucas saídas, o A* expande só as células
+# promissoras guiado por uma heurística admissível (nunca superestima o custo):
+# como o custo por unidade de comprimento é ≥ 1, a distância geométrica até a
+# saída mais próxima (euclidiana ou octil) é uma cota inferior consistente.
+# Em vizinhança 8, as diagonais custam √2 × o custo de deixar a célula.
+# A versão bidirecional usa potenciais médios (Ikeda et al., 1994) e para quando
+# a soma dos topos das duas filas atinge o melhor custo de encontro conhecido.
+
+DESLOCAMENTOS_VIZINHANCA = {
+    4: [(0, -1, 1.0), (-1, 0, 1.0), (1, 0, 1.0), (0, 1, 1.0)],
+    8: [(0, -1, 1.0), (-1, 0, 1.0), (1, 0, 1.0), (0, 1, 1.0),
+        (-1, -1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (1, 1, math.sqrt(2))]
+}
+
+def calcular_heuristica(tamanho_grade, alvos, tipo='octil'):
+    """
+    Calcula o raster achatado da heurística: distância geométrica ao alvo mais próximo.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - alvos: Lista de coordenadas (x, y)
+    - tipo: 'euclidiana', 'octil' ou 'nenhuma' (Dijkstra)
+
+    Retorna:
+    - Array (N²,) com a heurística de cada célula
+    """
+    n = tamanho_grade
+    if tipo == 'nenhuma':
+        return np.zeros(n * n)
+    no = np.arange(n * n)
+    x, y = no % n, no // n
+    h = np.full(n * n, np.inf)
+    for ax, ay in alvos:
+        dx, dy = np.abs(x - ax), np.abs(y - ay)
+        if tipo == 'euclidiana':
+            d = np.hypot(dx, dy)
+        else:
+            d = np.maximum(dx, dy) + (math.sqrt(2) - 1) * np.minimum(dx, dy)
+        h = np.minimum(h, d)
+    return h
+
+def buscar_rota_astar(tamanho_grade, ponto_origem, pontos_seguros, zonas_perigo, gargalos,
+                      heuristica='octil', vizinhanca=8, bidirecional=False):
+    """
+    Busca a rota de menor custo da origem até o ponto seguro mais barato com A*.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - ponto_origem: Coordenadas (x, y) da origem
+    - pontos_seguros: Lista de coordenadas (x, y) dos pontos seguros
+    - zonas_perigo, gargalos: Mesmo formato de simular_evacuacao
+    - heuristica: 'euclidiana', 'octil' ou 'nenhuma' (equivale a Dijkstra)
+    - vizinhanca: 4 ou 8 vizinhos (diagonais com custo √2)
+    - bidirecional: Busca simultânea a partir da origem e das saídas
+
+    Retorna:
+    - Dicionário com 'rota', 'custo' e 'nos_expandidos' (células retiradas da fila)
+    """
+    n = tamanho_grade
+    custo_saida, custo_entrada = calcular_rasters_custo(n, zonas_perigo, gargalos)
+    cs = custo_saida.ravel().tolist()
+    ce = custo_entrada.ravel().tolist()
+    passos = DESLOCAMENTOS_VIZINHANCA[vizinhanca]
+
+    origem = ponto_origem[1] * n + ponto_origem[0]
+    saidas = {p[1] * n + p[0] for p in pontos_seguros}
+    h_saidas = calcular_heuristica(n, pontos_seguros, heuristica)
+
+    def _vizinhos(u):
+        x, y = u % n, u // n
+        for dx, dy, comprimento in passos:
+            vx, vy = x + dx, y + dy
+            if 0 <= vx < n and 0 <= vy < n:
+                yield vy * n + vx, comprimento
+
+    def _rota(nos):
+        return [(c % n, c // n) for c in nos]
+
+    if not bidirecional:
+        potencial = h_saidas.tolist()
+        g = {origem: 0.0}
+        pred = {origem: -1}
+        fila = [(potencial[origem], origem)]
+        fechados = set()
+        while fila:
+            _, u = heapq.heappop(fila)
+            if u in fechados:
+                continue
+            fechados.add(u)
+            if u in saidas:
+                caminho = [u]
+                while pred[caminho[-1]] >= 0:
+                    caminho.append(pred[caminho[-1]])
+                return {'rota': _rota(caminho[::-1]), 'custo': g[u], 'nos_expandidos': len(fechados)}
+            for v, comprimento in _vizinhos(u):
+                novo = g[u] + comprimento * cs[u] + ce[v]
+                if novo < g.get(v, math.inf):
+                    g[v] = novo
+                    pred[v] = u
+                    heapq.heappush(fila, (novo + potencial[v], v))
+        return {'rota': [ponto_origem], 'custo': math.inf, 'nos_expandidos': len(fechados)}
+
+    # Potenciais médios: p_f = (h_saidas - h_origem) / 2 e p_r = -p_f
+    h_origem = calcular_heuristica(n, [ponto_origem], heuristica)
+    p_f = ((h_saidas - h_origem) / 2).tolist()
+
+    g_f, g_r = {origem: 0.0}, {s: 0.0 for s in saidas}
+    pred_f, prox_r = {origem: -1}, {s: -1 for s in saidas}
+    fila_f = [(p_f[origem], origem)]
+    fila_r = [(-p_f[s], s) for s in saidas]
+    heapq.heapify(fila_r)
+    fechados_f, fechados_r = set(), set()
+    melhor, encontro = math.inf, -1
+    if origem in saidas:
+        melhor, encontro = 0.0, origem
+
+    while fila_f and fila_r and fila_f[0][0] + fila_r[0][0] < melhor:
+        if fila_f[0][0] <= fila_r[0][0]:
+            _, u = heapq.heappop(fila_f)
+            if u in fechados_f:
+                continue
+            fechados_f.add(u)
+            for v, comprimento in _vizinhos(u):
+                novo = g_f[u] + comprimento * cs[u] + ce[v]
+                if novo < g_f.get(v, math.inf):
+                    g_f[v] = novo
+                    pred_f[v] = u
+                    heapq.heappush(fila_f, (novo + p_f[v], v))
+                if v in g_r and novo + g_r[v] < melhor:
+                    melhor, encontro = novo + g_r[v], v
+        else:
+            _, v = heapq.heappop(fila_r)
+            if v in fechados_r:
+                continue
+            fechados_r.add(v)
+            # Na busca reversa, relaxa as arestas u → v que chegam em v
+            for u, comprimento in _vizinhos(v):
+                novo = g_r[v] + comprimento * cs[u] + ce[v]
+                if novo < g_r.get(u, math.inf):
+                    g_r[u] = novo
+                    prox_r[u] = v
+                    heapq.heappush(fila_r, (novo - p_f[u], u))
+                if u in g_f and g_f[u] + novo < melhor:
+                    melhor, encontro = g_f[u] + novo, u
+
+    expandidos = len(fechados_f) + len(fechados_r)
+    if encontro < 0:
+        return {'rota': [ponto_origem], 'custo': math.inf, 'nos_expandidos': expandidos}
+
+    caminho = [encontro]
+    while pred_f[caminho[-1]] >= 0:
+        caminho.append(pred_f[caminho[-1]])
+    caminho = caminho[::-1]
+    while prox_r[caminho[-1]] >= 0:
+        caminho.append(prox_r[caminho[-1]])
+    return {'rota': _rota(caminho), 'custo': melhor, 'nos_expandidos': expandidos}
+
+# =============================================================================
+# 2. EVACUAÇÃO EM MASSA COM CAPACIDADES (FLUXO EM REDE EXPANDIDA NO TEMPO)
+# =============================================================================
+# A rota ótima vale para uma pessoa; milhares evacuando saturam gargalos e saídas.
+# A rede expandida no tempo tem uma camada por passo (tempo de travessia de uma
+# célula): cada célula armazena no máximo capacidade_celula pessoas e cada aresta
+# transporta no máximo capacidade_aresta pessoas por passo (gargalos e saídas com
+# capacidades próprias). Com o roteamento fixado pelo campo reverso de distâncias
+# (calcular_campo_evacuacao), o fluxo de chegada mais cedo nessa rede é obtido
+# camada a camada pelo modelo de transmissão celular (Daganzo, 1994): cada célula
+# envia min(ocupação, capacidade das arestas que descem o campo de distâncias),
+# e a entrada é rateada proporcionalmente quando o espaço livre da célula
+# receptora não basta.
+# Para aproximar o fluxo mais rápido (quickest flow), as rotas são recalculadas
+# periodicamente somando ao custo de cada célula a espera na sua fila
+# (ocupação / capacidade), desviando parte da multidão para saídas mais distantes
+# porém livres.
+# Cada camada é uma atualização vetorizada sobre todas as células, permitindo
+# dezenas de milhares de pessoas em grades de 10^5 células.
+
+def planejar_evacuacao_capacitada(tamanho_grade, populacao, pontos_seguros, zonas_perigo, gargalos,
+                                  capacidade_celula=20.0, capacidade_aresta=5.0, capacidade_gargalo=1.0,
+                                  capacidade_saida=10.0, intervalo_rerroteamento=20, max_passos=20000,
+                                  num_registros=30):
+    """
+    Planeja a evacuação de toda a população respeitando capacidades de células e arestas.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - populacao: Raster (N, N) com o número de pessoas por célula (indexado [y, x])
+    - pontos_seguros, zonas_perigo, gargalos: Mesmo formato de simular_evacuacao
+    - capacidade_celula: Máximo de pessoas que uma célula comporta
+    - capacidade_aresta: Pessoas por passo que atravessam uma aresta livre
+    - capacidade_gargalo: Pessoas por passo em cada aresta que sai de uma célula de gargalo
+    - capacidade_saida: Pessoas por passo absorvidas por cada ponto seguro
+    - intervalo_rerroteamento: A cada quantos passos o campo de rotas é recalculado com
+      o tempo de espera nas filas (0 = rotas fixas do campo estático)
+    - max_passos: Limite de passos da simulação
+    - num_registros: Número de camadas de carga registradas ao longo do tempo
+
+    Retorna:
+    - Dicionário com 'passos_evacuacao' (tempo de liberação, em passos),
+      'limite_inferior' (passos mínimos pela capacidade das saídas),
+      'curva' (DataFrame passo a passo), 'carga_tempo' (array registros × N × N
+      com o fluxo que deixa cada célula no passo), 'passos_registro', 'carga_total' e
+      'pessoas_isoladas' (sem caminho até uma saída)
+    """
+    n = tamanho_grade
+    campo = calcular_campo_evacuacao(n, pontos_seguros, zonas_perigo, gargalos)
+    distancias = campo['distancias'].ravel()
+    alcancavel = np.isfinite(distancias)
+
+    ocupacao = np.asarray(populacao, dtype=float).ravel().copy()
+    pessoas_isoladas = float(ocupacao[~alcancavel].sum())
+    ocupacao[~alcancavel] = 0.0
+
+    saidas = np.unique([p[1] * n + p[0] for p in pontos_seguros])
+    eh_saida = np.zeros(n * n, dtype=bool)
+    eh_saida[saidas] = True
+
+    # Arestas da grade (mesma estrutura CSR do roteamento)
+    G = campo['grafo']
+    origem_aresta = np.repeat(np.arange(n * n), np.diff(G.indptr))
+    destino_aresta = G.indices
+    util = alcancavel[origem_aresta] & alcancavel[destino_aresta] & ~eh_saida[origem_aresta]
+    origem_aresta, destino_aresta = origem_aresta[util], destino_aresta[util]
+
+    # Capacidade por aresta (gargalos limitam as arestas que saem da célula)
+    cap_aresta = np.full(n * n, float(capacidade_aresta))
+    if gargalos:
+        g = np.asarray(gargalos, dtype=int).reshape(-1, 2)
+        g = g[(g >= 0).all(axis=1) & (g < n).all(axis=1)]
+        cap_aresta[g[:, 1] * n + g[:, 0]] = capacidade_gargalo
+    cap_celula = np.full(n * n, float(capacidade_celula))
+    cap_celula[eh_saida] = np.inf
+    custo_saida, custo_entrada = calcular_rasters_custo(n, zonas_perigo, gargalos)
+
+    def _arestas_descendentes(dist):
+        # Arestas que descem o campo de distâncias (acíclicas por construção)
+        desce = dist[origem_aresta] > dist[destino_aresta]
+        eo, ed = origem_aresta[desce], destino_aresta[desce]
+        ec = cap_aresta[eo]
+        return eo, ed, ec, np.bincount(eo, weights=ec, minlength=n * n)
+
+    eo, ed, ec, cap_saida_celula = _arestas_descendentes(distancias)
+
+    total = ocupacao.sum()
+    evacuados = 0.0
+    carga_total = np.zeros(n * n)
+    curva_evacuados, curva_transito = [0.0], [total]
+
+    # Registro das camadas com intervalo adaptativo (memória limitada a 2 × num_registros)
+    intervalo_registro = 1
+    carga_tempo, passos_registro = [], []
+
+    passo = 0
+    tolerancia = 1e-6 * max(total, 1.0)
+    while total - evacuados > tolerancia and passo < max_passos:
+        # Rerroteamento pela espera nas filas (passos até escoar a ocupação de cada célula)
+        if intervalo_rerroteamento and passo > 0 and passo % intervalo_rerroteamento == 0:
+            espera = ocupacao / np.where(eh_saida, capacidade_saida, np.maximum(cap_saida_celula, 1e-9))
+            G_din = construir_grafo_grade(custo_saida + espera.reshape(n, n), custo_entrada)
+            dist_din = dijkstra(G_din.T.tocsr(), directed=True, indices=saidas, min_only=True)
+            eo, ed, ec, cap_saida_celula = _arestas_descendentes(dist_din)
+
+        # Saída pelos pontos seguros
+        absorvido = np.minimum(ocupacao[saidas], capacidade_saida)
+
+        # Apenas células ocupadas participam da camada
+        ativa = ocupacao[eo] > 0
+        ao, ad, ac = eo[ativa], ed[ativa], ec[ativa]
+
+        # Oferta de cada célula dividida entre as arestas descendentes pela capacidade
+        envio = np.minimum(ocupacao, cap_saida_celula)
+        oferta = envio[ao] * ac / cap_saida_celula[ao]
+
+        # Rateio proporcional pelo espaço livre da célula receptora
+        demanda = np.bincount(ad, weights=oferta, minlength=n * n)
+        espaco = np.maximum(cap_celula - ocupacao, 0.0)
+        razao = np.ones(n * n)
+        com_demanda = demanda > 0
+        razao[com_demanda] = np.minimum(1.0, espaco[com_demanda] / np.maximum(demanda[com_demanda], 1e-9))
+        fluxo = oferta * razao[ad]
+
+        carga = np.bincount(ao, weights=fluxo, minlength=n * n).astype(float)
+        ocupacao[saidas] -= absorvido
+        ocupacao += np.bincount(ad, weights=fluxo, minlength=n * n) - carga
+
+        carga[saidas] += absorvido
+        carga_total += carga
+
+        evacuados += absorvido.sum()
+        passo += 1
+        curva_evacuados.append(evacuados)
+        curva_transito.append(total - evacuados)
+
+        if passo % intervalo_registro == 0:
+            carga_tempo.append(carga.reshape(n, n).astype(np.float32))
+            passos_registro.append(passo)
+            if len(carga_tempo) >= 2 * num_registros:
+                carga_tempo, passos_registro = carga_tempo[1::2], passos_registro[1::2]
+                intervalo_registro *= 2
+
+    # Limite inferior: toda a população escoando pela vazão máxima das saídas
+    limite_inferior = int(np.ceil(total / max(len(saidas) * capacidade_saida, 1e-9)))
+
+    curva = pd.DataFrame({
+        'Passo': np.arange(len(curva_evacuados)),
+        'Evacuados': curva_evacuados,
+        'Em Trânsito': curva_transito
+    })
+    return {
+        'passos_evacuacao': passo,
+        'limite_inferior': limite_inferior,
+        'curva': curva,
+        'carga_tempo': np.array(carga_tempo) if carga_tempo else np.zeros((0, n, n)),
+        'passos_registro': passos_registro,
+        'carga_total': carga_total.reshape(n, n),
+        'pessoas_isoladas': pessoas_isoladas
+    }
+
+# =============================================================================
+# 3. SIMULAÇÃO DE PEDESTRES (AUTÔMATO CELULAR COM CAMPO DE PISO)
+# =============================================================================
+# Modelo de campo de piso (Burstedde et al., 2001; Kirchner & Schadschneider, 2002):
+# cada célula comporta no máximo uma pessoa; a cada passo, cada agente escolhe
+# entre ficar ou mover-se para um dos 4 vizinhos livres com probabilidade
+# proporcional a exp(-sensibilidade × ΔS), onde S é o campo reverso de distâncias
+# (calcular_campo_evacuacao). Conflitos pela mesma célula são resolvidos por
+# sorteio, e a entrada em gargalos só ocorre com probabilidade prob_gargalo.
+# O estado dos agentes é mantido em arrays NumPy (estrutura de arrays) e todos
+# os agentes são atualizados em paralelo a cada passo, sem laços por agente.
+
+def posicionar_agentes(tamanho_grade, num_agentes, centro, dispersao, semente=None):
+    """
+    Sorteia posições distintas para os agentes em torno de um centro (gaussiana).
+
+    Usa o truque de Gumbel top-k para amostragem ponderada sem reposição em O(N²).
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - num_agentes: Número de agentes (limitado ao número de células)
+    - centro: Coordenadas (x, y) do centro da multidão
+    - dispersao: Desvio padrão da multidão (células)
+    - semente: Semente do gerador aleatório
+
+    Retorna:
+    - Array (M, 2) com as coordenadas (x, y) dos agentes
+    """
+    rng = np.random.default_rng(semente)
+    n = tamanho_grade
+    num_agentes = min(int(num_agentes), n * n)
+    no = np.arange(n * n)
+    log_peso = -((no % n - centro[0]) ** 2 + (no // n - centro[1]) ** 2) / (2 * dispersao ** 2)
+    chave = log_peso + rng.gumbel(size=n * n)
+    escolhidos = np.argpartition(-chave, num_agentes - 1)[:num_agentes] if num_agentes > 0 else no[:0]
+    return np.column_stack([escolhidos % n, escolhidos // n])
+
+def simular_pedestres(tamanho_grade, posicoes, pontos_seguros, zonas_perigo, gargalos,
+                      sensibilidade=3.0, prob_gargalo=0.5, max_passos=5000, semente=None,
+                      num_registros=30):
+    """
+    Simula a evacuação agente a agente pelo autômato celular de campo de piso.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - posicoes: Array (M, 2) com as coordenadas (x, y) iniciais dos agentes
+    - pontos_seguros, zonas_perigo, gargalos: Mesmo formato de simular_evacuacao
+    - sensibilidade: Peso do campo de piso (alto = movimento determinístico rumo à saída)
+    - prob_gargalo: Probabilidade de conseguir entrar em uma célula de gargalo no passo
+    - max_passos: Limite de passos da simulação
+    - semente: Semente do gerador aleatório
+    - num_registros: Número de mapas de ocupação registrados ao longo do tempo
+
+    Retorna:
+    - Dicionário com 'passos_evacuacao', 'curva' (DataFrame com evacuados e agentes
+      na grade por passo), 'densidade_media' (ocupação média por célula, N x N),
+      'densidade_tempo' (registros × N × N), 'passos_registro', 'tempos_saida'
+      (passo de saída de cada agente evacuado) e 'agentes_isolados'
+    """
+    rng = np.random.default_rng(semente)
+    n = tamanho_grade
+    campo = calcular_campo_evacuacao(n, pontos_seguros, zonas_perigo, gargalos)
+    S = campo['distancias'].ravel()
+
+    eh_saida = np.zeros(n * n, dtype=bool)
+    eh_saida[[p[1] * n + p[0] for p in pontos_seguros]] = True
+    eh_gargalo = np.zeros(n * n, dtype=bool)
+    if gargalos:
+        g = np.asarray(gargalos, dtype=int).reshape(-1, 2)
+        g = g[(g >= 0).all(axis=1) & (g < n).all(axis=1)]
+        eh_gargalo[g[:, 1] * n + g[:, 0]] = True
+
+    # Estado dos agentes (estrutura de arrays): célula atual de cada agente ativo
+    posicoes = np.asarray(posicoes, dtype=np.int64).reshape(-1, 2)
+    celula = np.unique(posicoes[:, 1] * n + posicoes[:, 0]).astype(np.int64)
+    isolado = ~np.isfinite(S[celula])
+    agentes_isolados = int(isolado.sum())
+    celula = celula[~isolado]
+    ocupado = np.zeros(n * n, dtype=bool)
+    ocupado[celula] = True
+    dono = np.zeros(n * n, dtype=np.int64)
+
+    deslocamentos = np.array([0, -n, -1, 1, n])
+    total = len(celula)
+    evacuados = 0
+    tempos_saida = []
+    densidade_acumulada = np.zeros(n * n)
+    curva_evacuados, curva_na_grade = [0], [total]
+    intervalo_registro = 1
+    densidade_tempo, passos_registro = [], []
+
+    passo = 0
+    while len(celula) > 0 and passo < max_passos:
+        passo += 1
+        x, y = celula % n, celula // n
+
+        # Opções: ficar, acima, esquerda, direita, abaixo
+        alvo = celula[:, None] + deslocamentos[None, :]
+        valido = np.stack([np.ones_like(x, dtype=bool), y > 0, x > 0, x < n - 1, y < n - 1], axis=1)
+        alvo = np.where(valido, alvo, celula[:, None])
+        valido[:, 1:] &= ~ocupado[alvo[:, 1:]]
+
+        # Escolha pela regra de Gibbs via Gumbel-max: argmax(log p + Gumbel)
+        with np.errstate(invalid='ignore'):
+            log_peso = -sensibilidade * (S[alvo] - S[celula][:, None])
+        log_peso = np.where(valido & np.isfinite(log_peso), log_peso, -np.inf)
+        log_peso[:, 0] = 0.0
+        escolha = np.argmax(log_peso + rng.gumbel(size=log_peso.shape), axis=1)
+        destino = alvo[np.arange(len(celula)), escolha]
+
+        quer_mover = escolha != 0
+        quer_mover &= ~eh_gargalo[destino] | (rng.random(len(celula)) < prob_gargalo)
+
+        # Conflitos: para cada célula disputada vence um agente sorteado
+        # (em ordem aleatória, a última escrita em 'dono' define o vencedor)
+        candidatos = rng.permutation(np.flatnonzero(quer_mover))
+        dono[destino[candidatos]] = candidatos
+        vencedores = candidatos[dono[destino[candidatos]] == candidatos]
+
+        ocupado[celula[vencedores]] = False
+        celula[vencedores] = destino[vencedores]
+        ocupado[celula[vencedores]] = True
+
+        # Agentes que alcançam um ponto seguro deixam a grade
+        saiu = eh_saida[celula]
+        if saiu.any():
+            ocupado[celula[saiu]] = False
+            tempos_saida.append(np.full(int(saiu.sum()), passo))
+            evacuados += int(saiu.sum())
+            celula = celula[~saiu]
+
+        densidade_passo = np.bincount(celula, minlength=n * n)
+        densidade_acumulada += densidade_passo
+        curva_evacuados.append(evacuados)
+        curva_na_grade.append(len(celula))
+
+        if passo % intervalo_registro == 0:
+            densidade_tempo.append(densidade_passo.reshape(n, n).astype(np.uint8))
+            passos_registro.append(passo)
+            if len(densidade_tempo) >= 2 * num_registros:
+                densidade_tempo, passos_registro = densidade_tempo[1::2], passos_registro[1::2]
+                intervalo_registro *= 2
+
+    curva = pd.DataFrame({
+        'Passo': np.arange(len(curva_evacuados)),
+        'Evacuados': curva_evacuados,
+        'Na Grade': curva_na_grade
+    })
+    return {
+        'passos_evacuacao': passo,
+        'curva': curva,
+        'densidade_media': (densidade_acumulada / max(passo, 1)).reshape(n, n),
+        'densidade_tempo': np.array(densidade_tempo) if densidade_tempo else np.zeros((0, n, n), dtype=np.uint8),
+        'passos_registro': passos_registro,
+        'tempos_saida': np.concatenate(tempos_saida) if tempos_saida else np.zeros(0, dtype=int),
+        'agentes_isolados': agentes_isolados
+    }
+
+# =============================================================================
+# 4. PERIGOS DINÂMICOS (ROTEAMENTO DEPENDENTE DO TEMPO)
+# =============================================================================
+# Uma pluma tóxica se desloca e cresce durante a evacuação. O perigo passa a ser
+# uma série temporal de rasters de intensidade (uma fatia a cada passos_por_fatia
+# passos), fornecida como lista ou como função fatia → raster (por exemplo, a
+# saída de um módulo de dispersão). O custo de deixar a célula u depende da fatia
+# vigente no instante em que u é alcançada, e o Dijkstra dependente do tempo
+# mantém um rótulo por estado (célula, passo) da grade expandida no tempo, pois
+# um desvio que chega depois da pluma pode sair mais barato que o atalho. Os
+# rasters de custo são avaliados sob demanda e memorizados por fatia: cenários
+# longos só calculam as fatias efetivamente alcançadas pela busca.
+
+def criar_camadas_custo(fonte_perigo, num_fatias=None):
+    """
+    Cria o acesso preguiçoso (lazy) e memorizado aos rasters de custo por fatia.
+
+    Parâmetros:
+    - fonte_perigo: Lista de rasters (N, N) de intensidade ou função fatia → raster
+    - num_fatias: Número de fatias disponíveis (None = len da lista ou ilimitado)
+
+    Retorna:
+    - Tupla: (função fatia → custo de saída achatado, dicionário de fatias calculadas)
+    """
+    if num_fatias is None and not callable(fonte_perigo):
+        num_fatias = len(fonte_perigo)
+    memoria = {}
+
+    def custo_fatia(fatia):
+        # Após a última fatia o perigo permanece no estado final
+        if num_fatias is not None:
+            fatia = min(fatia, num_fatias - 1)
+        if fatia not in memoria:
+            raster = fonte_perigo(fatia) if callable(fonte_perigo) else fonte_perigo[fatia]
+            # Mesma penalidade das zonas estáticas: intensidade × 50
+            memoria[fatia] = (1.0 + 50.0 * np.asarray(raster, dtype=float)).ravel()
+        return memoria[fatia]
+
+    return custo_fatia, memoria
+
+def gerar_pluma_movel(tamanho_grade, x0, y0, raio0, intensidade, vx=0.0, vy=0.0, crescimento=0.0):
+    """
+    Gera a função fatia → raster de uma pluma circular que se desloca e cresce.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - x0, y0: Centro inicial da pluma (células)
+    - raio0: Raio inicial (células)
+    - intensidade: Intensidade do perigo dentro da pluma
+    - vx, vy: Deslocamento do centro por fatia (células)
+    - crescimento: Aumento do raio por fatia (células)
+
+    Retorna:
+    - Função fatia → raster (N, N) de intensidade
+    """
+    eixo = np.arange(tamanho_grade)
+    xx, yy = np.meshgrid(eixo, eixo)
+
+    def raster(fatia):
+        dentro = np.hypot(xx - (x0 + vx * fatia), yy - (y0 + vy * fatia)) <= raio0 + crescimento * fatia
+        return dentro * float(intensidade)
+
+    return raster
+
+def rotear_perigo_dinamico(tamanho_grade, ponto_origem, pontos_seguros, fonte_perigo, gargalos,
+                           passos_por_fatia=1, num_fatias=None, limite_passos=None):
+    """
+    Calcula a rota de menor custo com perigo variável no tempo (Dijkstra dependente do tempo).
+
+    Cada movimento entre células leva um passo; o custo de deixar uma célula é
+    avaliado na fatia de perigo vigente quando ela é alcançada. Como chegar mais
+    tarde a uma célula pode ser mais barato adiante (a pluma já passou), os rótulos
+    são mantidos por estado (célula, passo) na grade expandida no tempo. A partir
+    de limite_passos o perigo é tratado como congelado e os estados colapsam em
+    um único rótulo por célula.
+
+    Parâmetros:
+    - tamanho_grade: Tamanho da grade (N x N)
+    - ponto_origem: Coordenadas (x, y) do ponto de origem
+    - pontos_seguros: Lista de coordenadas (x, y) de pontos seguros
+    - fonte_perigo: Lista de rasters de intensidade ou função fatia → raster
+    - gargalos: Lista de coordenadas (x, y) de gargalos logísticos
+    - passos_por_fatia: Passos de movimento por fatia de perigo
+    - num_fatias: Número de fatias disponíveis (None = automático)
+    - limite_passos: Passo a partir do qual o perigo é considerado estático
+      (None = início da última fatia ou 4·N² para fontes sem fim definido)
+
+    Retorna:
+    - Dicionário com 'rota' (lista de (x, y)), 'custo', 'passos_chegada' (passo em
+      que cada célula da rota é alcançada) e 'fatias_avaliadas'
+    """
+    n = tamanho_grade
+    custo_fatia, memoria = criar_camadas_custo(fonte_perigo, num_fatias)
+    _, custo_entrada = calcular_rasters_custo(n, [], gargalos)
+    custo_entrada = custo_entrada.ravel()
+
+    if num_fatias is None and not callable(fonte_perigo):
+        num_fatias = len(fonte_perigo)
+    if limite_passos is None:
+        limite_passos = (max(num_fatias - 1, 0) * passos_por_fatia if num_fatias is not None
+                         else 4 * n * n)
+
+    eh_saida = np.zeros(n * n, dtype=bool)
+    eh_saida[[p[1] * n + p[0] for p in pontos_seguros]] = True
+
+    # Estado = (célula, passo limitado a limite_passos); o passo real segue no rótulo
+    origem = ponto_origem[1] * n + ponto_origem[0]
+    melhor = {(origem, 0): 0.0}
+    predecessor = {(origem, 0): None}
+    fila = [(0.0, 0, origem)]
+    encontrado = None
+
+    while fila:
+        custo, passo, u = heapq.heappop(fila)
+        estado = (u, min(passo, limite_passos))
+        if custo > melhor[estado]:
             continue
-    
-    # Se nenhuma rota foi encontrada, retornar rota vazia
-    if melhor_rota == []:
-        melhor_rota = [ponto_origem]  # Pelo menos manter o ponto de origem
-            
-    return melhor_rota, G
+        if eh_saida[u]:
+            encontrado = estado
+            break
+        custo_saida = custo_fatia(estado[1] // passos_por_fatia)[u]
+        x, y = u % n, u // n
+        for v, ok in ((u - n, y > 0), (u - 1, x > 0), (u + 1, x < n - 1), (u + n, y < n - 1)):
+            if not ok:
+                continue
+            novo = custo + custo_saida + custo_entrada[v]
+            vizinho = (v, min(passo + 1, limite_passos))
+            if novo < melhor.get(vizinho, np.inf):
+                melhor[vizinho] = novo
+                predecessor[vizinho] = (estado, passo + 1)
+                heapq.heappush(fila, (novo, passo + 1, v))
+
+    if encontrado is None:
+        return {'rota': [ponto_origem], 'custo': float('inf'), 'passos_chegada': [0],
+                'fatias_avaliadas': len(memoria)}
+
+    # Reconstrói a rota; o passo real de cada estado vem do rótulo que o fixou
+    caminho, passos = [], []
+    estado, passo = encontrado, None
+    while estado is not None:
+        anterior = predecessor[estado]
+        caminho.append(estado[0])
+        passos.append(anterior[1] if anterior is not None else 0)
+        estado = anterior[0] if anterior is not None else None
+    caminho, passos = caminho[::-1], passos[::-1]
+    return {
+        'rota': [(int(c % n), int(c // n)) for c in caminho],
+        'custo': float(melhor[encontrado]),
+        'passos_chegada': [int(p) for p in passos],
+        'fatias_avaliadas': len(memoria)
+    }
+
+def avaliar_exposicao_rota(rota, fonte_perigo, passos_por_fatia=1, num_fatias=None):
+    """
+    Soma a intensidade de perigo encontrada ao longo da rota, no instante de cada passo.
+
+    Retorna:
+    - Exposição acumulada (intensidade × passos)
+    """
+    custo_fatia, _ = criar_camadas_custo(fonte_perigo, num_fatias)
+    n = int(round(np.sqrt(custo_fatia(0).size)))
+    return float(sum((custo_fatia(passo // passos_por_fatia)[y * n + x] - 1.0) / 50.0
+                     for passo, (x, y) in enumerate(rota)))
 
 # =============================================================================
-# 2. INTERFACE VISUAL
+# 5. REDE VIÁRIA REAL (IMPORTAÇÃO OSM / GEOJSON)
 # =============================================================================
+# Para planejar em ruas reais, a malha viária local é lida de um arquivo GeoJSON
+# (LineStrings/MultiLineStrings), de um extrato OSM XML (.osm) ou OSM PBF (.pbf,
+# requer o pacote opcional 'osmium'). A rede é guardada em formato compacto:
+# grafo CSR (indptr/indices int32, comprimentos float32) e arrays de coordenadas,
+# com árvore KD (scipy.spatial.cKDTree) em coordenadas métricas locais para
+# ajustar origens e saídas ao nó mais próximo. Após a primeira leitura, os arrays
+# são persistidos em .npz ao lado do arquivo de origem para carregamento rápido,
+# junto com o SHA-1 do conteúdo lido (o cache só vale para o mesmo conteúdo).
+
+RAIO_TERRA_M = 6_371_000.0
+
+# Tipos de via OSM considerados na evacuação (pedestres e veículos)
+VIAS_OSM = {
+    "motorway", "trunk", "primary", "secondary", "tertiary", "unclassified", "residential",
+    "motorway_link", "trunk_link", "primary_link", "secondary_link", "tertiary_link",
+    "living_street", "service", "pedestrian", "footway", "path", "steps", "track", "road"
+}
+
+def _sentido_mao_unica(valor):
+    """Interpreta a tag oneway: 1 (sentido do traçado), -1 (sentido inverso) ou 0 (mão dupla)."""
+    valor = str(valor).strip().lower() if valor is not None else 'no'
+    if valor in ('yes', 'true', '1'):
+        return 1
+    if valor in ('-1', 'reverse'):
+        return -1
+    return 0
+
+def _projetar_local(lon, lat, lat_ref):
+    """Projeção equiretangular local (metros) usada pela árvore KD e pelos comprimentos."""
+    x = np.radians(lon) * RAIO_TERRA_M * np.cos(np.radians(lat_ref))
+    y = np.radians(lat) * RAIO_TERRA_M
+    return x, y
+
+def _montar_rede(lon, lat, u, v, mao_unica):
+    """
+    Monta os arrays CSR a partir dos segmentos (u, v) entre vértices.
+
+    Vértices repetidos (extremidades compartilhadas entre vias) devem chegar já
+    unificados; segmentos duplicados mantêm o menor comprimento.
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    mao_unica = np.asarray(mao_unica, dtype=bool)
+
+    lat_ref = float(lat.mean()) if len(lat) else 0.0
+    x, y = _projetar_local(lon, lat, lat_ref)
+    comprimento = np.hypot(x[v] - x[u], y[v] - y[u])
+
+    # Arestas nos dois sentidos, exceto vias de mão única
+    origens = np.concatenate([u, v[~mao_unica]])
+    destinos = np.concatenate([v, u[~mao_unica]])
+    pesos = np.concatenate([comprimento, comprimento[~mao_unica]])
+    validas = origens != destinos
+    origens, destinos, pesos = origens[validas], destinos[validas], pesos[validas]
+
+    # Ordenar por (origem, destino, peso) e manter a primeira ocorrência de cada par
+    ordem = np.lexsort((pesos, destinos, origens))
+    origens, destinos, pesos = origens[ordem], destinos[ordem], pesos[ordem]
+    primeira = np.ones(len(origens), dtype=bool)
+    primeira[1:] = (origens[1:] != origens[:-1]) | (destinos[1:] != destinos[:-1])
+    origens, destinos, pesos = origens[primeira], destinos[primeira], pesos[primeira]
+
+    indptr = np.zeros(len(lon) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(origens, minlength=len(lon)), out=indptr[1:])
+    return {
+        'indptr': indptr,
+        'indices': destinos.astype(np.int32),
+        'comprimentos': pesos.astype(np.float32),
+        'lon': lon,
+        'lat': lat,
+        'lat_ref': np.float64(lat_ref)
+    }
+
+def _ler_geojson(caminho):
+    """Lê LineStrings/MultiLineStrings de um GeoJSON e unifica vértices pela coordenada."""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        dados = json.load(arquivo)
+
+    linhas, mao_unica_linhas = [], []
+    for feicao in dados.get('features', []):
+        geometria = feicao.get('geometry') or {}
+        propriedades = feicao.get('properties') or {}
+        sentido = _sentido_mao_unica(propriedades.get('oneway'))
+        if geometria.get('type') == 'LineString':
+            partes = [geometria['coordinates']]
+        elif geometria.get('type') == 'MultiLineString':
+            partes = geometria['coordinates']
+        else:
+            continue
+        for parte in partes:
+            if len(parte) >= 2:
+                # oneway=-1: a circulação é no sentido inverso ao traçado
+                linha = np.asarray(parte, dtype=np.float64)[:, :2]
+                linhas.append(linha[::-1] if sentido < 0 else linha)
+                mao_unica_linhas.append(sentido != 0)
+
+    if not linhas:
+        raise ValueError("Nenhuma via (LineString) encontrada no arquivo GeoJSON.")
+
+    tamanhos = np.array([len(l) for l in linhas])
+    vertices = np.concatenate(linhas)
+    # Unificar vértices pela coordenada arredondada (~1 cm)
+    _, primeiro, inverso = np.unique(np.round(vertices, 7), axis=0, return_index=True, return_inverse=True)
+    inverso = inverso.ravel()
+
+    # Segmentos entre vértices consecutivos de cada linha (exclui a junção entre linhas)
+    inicio_linha = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    continua = np.ones(len(vertices) - 1, dtype=bool)
+    continua[inicio_linha[1:] - 1] = False
+    u = inverso[:-1][continua]
+    v = inverso[1:][continua]
+    mao_unica = np.repeat(mao_unica_linhas, tamanhos - 1)
+
+    return _montar_rede(vertices[primeiro, 0], vertices[primeiro, 1], u, v, mao_unica)
+
+def _montar_de_vias_osm(ids_nos, lon_nos, lat_nos, vias):
+    """
+    Converte nós OSM (id, lon, lat) e vias (lista de ids, sentido oneway) em rede CSR.
+
+    Extratos recortados costumam conter vias que referenciam nós fora do recorte:
+    essas referências são descartadas e a via é dividida nos trechos contíguos.
+    """
+    ids_nos = np.asarray(ids_nos, dtype=np.int64)
+    ordem = np.argsort(ids_nos)
+    ids_ordenados = ids_nos[ordem]
+
+    # oneway=-1: inverte a sequência de nós e trata a via como mão única
+    vias = [(nos[::-1] if sentido < 0 else nos, sentido != 0) for nos, sentido in vias if len(nos) >= 2]
+    if not vias:
+        raise ValueError("Nenhuma via de circulação encontrada no extrato OSM.")
+    tamanhos = np.array([len(nos) for nos, _ in vias])
+    todos = np.concatenate([np.asarray(nos, dtype=np.int64) for nos, _ in vias])
+    mao_unica = np.repeat([unica for _, unica in vias], tamanhos)[:-1]
+
+    # Segmentos entre nós consecutivos presentes no extrato, sem cruzar o fim de uma via
+    presente = np.isin(todos, ids_nos)
+    if not presente.any():
+        raise ValueError("As vias do extrato OSM não referenciam nenhum nó presente no arquivo.")
+    continua = presente[:-1] & presente[1:]
+    continua[np.cumsum(tamanhos)[:-1] - 1] = False
+
+    # Apenas nós usados por vias, reindexados de 0 a M-1
+    usados, inverso = np.unique(todos[presente], return_inverse=True)
+    indice = np.full(len(todos), -1, dtype=np.int64)
+    indice[presente] = inverso.ravel()
+    posicao = ordem[np.searchsorted(ids_ordenados, usados)]
+    u = indice[:-1][continua]
+    v = indice[1:][continua]
+    return _montar_rede(np.asarray(lon_nos)[posicao], np.asarray(lat_nos)[posicao], u, v, mao_unica[continua])
+
+def _ler_osm_xml(caminho):
+    """Lê um extrato OSM XML (.osm) em fluxo com iterparse."""
+    ids, lons, lats, vias = [], [], [], []
+    nos_via, tags_via = [], {}
+    for evento, elemento in ET.iterparse(caminho, events=('start', 'end')):
+        if evento == 'start':
+            if elemento.tag == 'way':
+                nos_via, tags_via = [], {}
+            continue
+        if elemento.tag == 'node':
+            ids.append(int(elemento.get('id')))
+            lons.append(float(elemento.get('lon')))
+            lats.append(float(elemento.get('lat')))
+            elemento.clear()
+        elif elemento.tag == 'nd':
+            nos_via.append(int(elemento.get('ref')))
+        elif elemento.tag == 'tag':
+            tags_via[elemento.get('k')] = elemento.get('v')
+        elif elemento.tag == 'way':
+            if tags_via.get('highway') in VIAS_OSM:
+                vias.append((nos_via, _sentido_mao_unica(tags_via.get('oneway'))))
+            elemento.clear()
+    return _montar_de_vias_osm(ids, lons, lats, vias)
+
+def _ler_osm_pbf(caminho):
+    """Lê um extrato OSM PBF com o pacote opcional 'osmium' (pyosmium)."""
+    try:
+        import osmium
+    except ImportError:
+        raise ImportError("Leitura de arquivos .pbf requer o pacote 'osmium' (pip install osmium). "
+                          "Alternativamente, exporte o extrato como .osm ou GeoJSON.")
+
+    class _ColetorVias(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.ids, self.lons, self.lats, self.vias = [], [], [], []
+
+        def node(self, n):
+            self.ids.append(n.id)
+            self.lons.append(n.location.lon)
+            self.lats.append(n.location.lat)
+
+        def way(self, w):
+            if w.tags.get('highway') in VIAS_OSM:
+                self.vias.append(([nd.ref for nd in w.nodes], _sentido_mao_unica(w.tags.get('oneway'))))
+
+    coletor = _ColetorVias()
+    coletor.apply_file(caminho)
+    return _montar_de_vias_osm(coletor.ids, coletor.lons, coletor.lats, coletor.vias)
+
+def calcular_hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """SHA-1 do conteúdo de um arquivo, lido em blocos."""
+    sha1 = hashlib.sha1()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha1.update(bloco)
+    return sha1.hexdigest()
+
+def carregar_rede_viaria(caminho, usar_cache=True):
+    """
+    Carrega a rede viária local em formato compacto (CSR + coordenadas + árvore KD).
+
+    Parâmetros:
+    - caminho: Arquivo .geojson/.json, .osm (XML) ou .pbf
+    - usar_cache: Ler/gravar o cache binário '<arquivo>.rede.npz' (validado pelo
+      SHA-1 do conteúdo do arquivo de origem)
+
+    Retorna:
+    - Dicionário com 'grafo' (csr_matrix de comprimentos em metros), 'lon', 'lat',
+      'x', 'y' (metros, projeção local), 'arvore' (cKDTree) e os arrays CSR
+    """
+    caminho_cache = f"{caminho}.rede.npz"
+    arrays = None
+    if usar_cache:
+        hash_origem = calcular_hash_arquivo(caminho)
+        if os.path.exists(caminho_cache):
+            try:
+                with np.load(caminho_cache) as dados:
+                    if 'hash_origem' in dados.files and str(dados['hash_origem']) == hash_origem:
+                        arrays = {chave: dados[chave] for chave in dados.files if chave != 'hash_origem'}
+            except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+                arrays = None  # Cache ilegível (gravação interrompida): tratado como ausente
+
+    if arrays is None:
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao in ('.geojson', '.json'):
+            arrays = _ler_geojson(caminho)
+        elif extensao == '.osm':
+            arrays = _ler_osm_xml(caminho)
+        elif extensao == '.pbf':
+            arrays = _ler_osm_pbf(caminho)
+        else:
+            raise ValueError(f"Formato de rede viária não suportado: {extensao}")
+        if usar_cache:
+            # Gravação atômica: um cache truncado nunca substitui o arquivo final
+            temporario = f"{caminho_cache}.{os.getpid()}.tmp.npz"
+            np.savez(temporario, hash_origem=np.array(hash_origem), **arrays)
+            os.replace(temporario, caminho_cache)
+
+    n = len(arrays['lon'])
+    x, y = _projetar_local(arrays['lon'], arrays['lat'], float(arrays['lat_ref']))
+    rede = dict(arrays)
+    rede['grafo'] = csr_matrix((arrays['comprimentos'], arrays['indices'], arrays['indptr']), shape=(n, n))
+    rede['x'], rede['y'] = x, y
+    rede['arvore'] = cKDTree(np.column_stack([x, y]))
+    return rede
+
+def ajustar_pontos_rede(rede, latitudes, longitudes):
+    """
+    Ajusta pontos (lat, lon) ao nó mais próximo da rede pela árvore KD.
+
+    Retorna:
+    - Tupla: (índices dos nós, distâncias de ajuste em metros)
+    """
+    x, y = _projetar_local(np.atleast_1d(longitudes), np.atleast_1d(latitudes), float(rede['lat_ref']))
+    distancias, indices = rede['arvore'].query(np.column_stack([x, y]))
+    return indices, distancias
+
+def rotear_rede_viaria(rede, origem_latlon, saidas_latlon):
+    """
+    Calcula a rota de evacuação mais curta na rede viária até a saída mais próxima.
+
+    Usa o mesmo esquema do campo reverso da grade: um Dijkstra multi-fonte a
+    partir de todas as saídas no grafo transposto e caminhada pelos próximos passos.
+
+    Parâmetros:
+    - rede: Rede retornada por carregar_rede_viaria
+    - origem_latlon: Tupla (lat, lon) da origem
+    - saidas_latlon: Lista de tuplas (lat, lon) dos pontos seguros
+
+    Retorna:
+    - Dicionário com 'rota' (lista de (lat, lon)), 'distancia_m' e 'ajuste_m'
+      (distâncias de ajuste da origem e das saídas aos nós da rede)
+    """
+    saidas = np.asarray(saidas_latlon, dtype=float).reshape(-1, 2)
+    nos_saida, ajuste_saidas = ajustar_pontos_rede(rede, saidas[:, 0], saidas[:, 1])
+    no_origem, ajuste_origem = ajustar_pontos_rede(rede, origem_latlon[0], origem_latlon[1])
+    no_origem = int(no_origem[0])
+
+    distancias, proximo = dijkstra(rede['grafo'].T.tocsr(), directed=True, indices=np.unique(nos_saida),
+                                   return_predecessors=True, min_only=True)[:2]
+    if not np.isfinite(distancias[no_origem]):
+        return {'rota': [tuple(origem_latlon)], 'distancia_m': float('inf'),
+                'ajuste_m': (float(ajuste_origem[0]), ajuste_saidas)}
+
+    caminho = [no_origem]
+    while proximo[caminho[-1]] >= 0:
+        caminho.append(proximo[caminho[-1]])
+    caminho = np.array(caminho)
+    return {
+        'rota': list(zip(rede['lat'][caminho].tolist(), rede['lon'][caminho].tolist())),
+        'distancia_m': float(distancias[no_origem]),
+        'ajuste_m': (float(ajuste_origem[0]), ajuste_saidas)
+    }
+
+# =============================================================================
+# 6. INTERFACE VISUAL
+# =============================================================================
+
+# Status do mapa tático em ordem crescente de precedência (o de maior código prevalece)
+STATUS_MAPA = ['Livre', 'Ponto de Origem', 'Zona Segura', 'Zona de Perigo', 'Gargalo / Obstrução', 'Rota de Evacuação']
+
+# Acima deste número de células o mapa é agregado em blocos antes de ir ao navegador
+LIMITE_CELULAS_MAPA = 4900
+
+def montar_mapa_tatico(tamanho_grade, rota, pontos_seguros, ponto_origem, zonas_perigo, gargalos,
+                       limite_celulas=LIMITE_CELULAS_MAPA):
+    """
+    Classifica as células do mapa tático com máscaras NumPy e monta o DataFrame do heatmap.
+
+    Em grades maiores que limite_celulas, as células são agregadas em blocos
+    fator × fator mantendo o status de maior precedência de cada bloco (a rota
+    e os gargalos continuam visíveis), limitando o número de retângulos enviados.
+
+    Retorna:
+    - Tupla: (DataFrame com colunas x, y e Status; fator de agregação)
+    """
+    n = tamanho_grade
+    codigos = np.zeros((n, n), dtype=np.int8)
+
+    def _marcar(pontos, codigo):
+        if len(pontos) == 0:
+            return
+        p = np.asarray(pontos, dtype=int).reshape(-1, 2)
+        p = p[(p >= 0).all(axis=1) & (p < n).all(axis=1)]
+        codigos[p[:, 1], p[:, 0]] = codigo
+
+    _marcar([ponto_origem], 1)
+    _marcar(pontos_seguros, 2)
+    yy, xx = np.indices((n, n))
+    for zona in zonas_perigo:
+        codigos[np.hypot(xx - zona['x'], yy - zona['y']) <= zona['raio']] = 3
+    _marcar(gargalos, 4)
+    _marcar(rota, 5)
+
+    fator = max(1, int(np.ceil(n / np.sqrt(limite_celulas))))
+    if fator > 1:
+        m = int(np.ceil(n / fator))
+        preenchido = np.zeros((m * fator, m * fator), dtype=np.int8)
+        preenchido[:n, :n] = codigos
+        codigos = preenchido.reshape(m, fator, m, fator).max(axis=(1, 3))
+        yy, xx = np.indices(codigos.shape)
+
+    df_mapa = pd.DataFrame({
+        'x': xx.ravel() * fator,
+        'y': yy.ravel() * fator,
+        'Status': np.array(STATUS_MAPA)[codigos.ravel()]
+    })
+    return df_mapa, fator
 
 def renderizar():
     st.title("Evacuação Dinâmica e Fluxo Humano")
@@ -123,11 +1230,15 @@ def renderizar():
         - O algoritmo pode escolher passar por gargalos se for a única rota segura
         
         **5. Limitações do Modelo:**
-        - Assume movimento em grade (4 direções: norte, sul, leste, oeste)
+        - Assume movimento em grade: 4 direções na rota principal, na rota dinâmica e nos pedestres;
+          a busca A* aceita também 8 direções (diagonais com custo √2)
         - Não considera terreno irregular ou elevações
         - Assume que todas as pessoas se movem na mesma velocidade
-        - Não modela comportamento de pânico ou multidões
-        - Não considera mudanças dinâmicas nas zonas de perigo ao longo do tempo
+        - Não modela comportamento de pânico; o fluxo de massa é tratado pelo planejamento com capacidades
+          (lotação das células, vazão das passagens e dos gargalos) e a multidão pelo autômato celular de
+          pedestres (uma pessoa por célula, campo de piso)
+        - Zonas de perigo dinâmicas apenas na seção de pluma em movimento; o roteamento aceita qualquer série
+          de rasters de perigo, mas a interface usa uma pluma sintética (deslocamento e crescimento uniformes)
         """)
 
     col1, col2 = st.columns([1, 2])
@@ -236,48 +1347,12 @@ def renderizar():
             gargalos
         )
 
-        # Visualização usando Matriz (Heatmap)
-        grade_visual = np.zeros((tamanho_grade, tamanho_grade))
-        
-        # Marcar Zonas de Perigo
-        for x in range(tamanho_grade):
-            for y in range(tamanho_grade):
-                dist = math.sqrt((x-perigo_x)**2 + (y-perigo_y)**2)
-                if dist <= raio_perigo:
-                    grade_visual[y, x] = 2  # Área de Perigo
-        
-        # Marcar Gargalos
-        for g in gargalos:
-            if 0 <= g[0] < tamanho_grade and 0 <= g[1] < tamanho_grade:
-                grade_visual[g[1], g[0]] = 1.5  # Obstrução
-
-        # Marcar Rota
-        for p in rota:
-            if 0 <= p[0] < tamanho_grade and 0 <= p[1] < tamanho_grade:
-                grade_visual[p[1], p[0]] = 1  # Caminho Calculado
-            
-        # Preparar dados para o gráfico Altair
-        data = []
-        for y in range(tamanho_grade):
-            for x in range(tamanho_grade):
-                tipo = "Livre"
-                val = grade_visual[y, x]
-                if val == 2: 
-                    tipo = "Zona de Perigo"
-                elif val == 1.5: 
-                    tipo = "Gargalo / Obstrução"
-                elif val == 1: 
-                    tipo = "Rota de Evacuação"
-                elif (x, y) in pontos_seguros: 
-                    tipo = "Zona Segura"
-                elif (x, y) == (origem_x, origem_y): 
-                    tipo = "Ponto de Origem"
-                
-                data.append({'x': x, 'y': y, 'Status': tipo})
-
-        df_mapa = pd.DataFrame(data)
-
-        chart = alt.Chart(df_mapa).mark_rect(stroke='white', strokeWidth=0.5).encode(
+        # Visualização usando Matriz (Heatmap), classificada por máscaras vetorizadas
+        df_mapa, fator_mapa = montar_mapa_tatico(
+            tamanho_grade, rota, pontos_seguros, (origem_x, origem_y), zonas_perigo, gargalos
+        )
+
+        chart = alt.Chart(df_mapa).mark_rect(stroke='white', strokeWidth=0.5 if fator_mapa == 1 else 0).encode(
             x=alt.X('x:O', title='Coordenada X', axis=alt.Axis(grid=False)),
             y=alt.Y('y:O', sort='descending', title='Coordenada Y', axis=alt.Axis(grid=False)),
             color=alt.Color('Status:N', 
@@ -327,8 +1402,7 @@ def renderizar():
         for i in range(len(rota) - 1):
             u = rota[i]
             v = rota[i + 1]
-            if grafo.has_edge(u, v):
-                custo_total += grafo[u][v].get('weight', 1.0)
+            custo_total += grafo[u[1] * tamanho_grade + u[0], v[1] * tamanho_grade + v[0]]
     else:
         custo_total = float('inf')
     
@@ -390,7 +1464,279 @@ def renderizar():
     
     if len(rota) == 1:
         st.error("**ERRO:** Nenhuma rota foi encontrada. Verifique se há caminho possível entre origem e destinos seguros.")
-    
+
+    # --- BUSCA A* (VIZINHANÇA E HEURÍSTICA) ---
+    with st.expander("Rota por Busca A* (4 ou 8 Vizinhos)", expanded=False):
+        cb1, cb2, cb3 = st.columns(3)
+        vizinhanca = cb1.radio("Vizinhança", [4, 8], horizontal=True,
+                               help="8 vizinhos permite diagonais com custo √2")
+        tipo_heuristica = cb2.selectbox("Heurística", ["octil", "euclidiana"])
+        bidirecional = cb3.checkbox("Busca Bidirecional", value=False)
+
+        busca = buscar_rota_astar(tamanho_grade, (origem_x, origem_y), pontos_seguros, zonas_perigo,
+                                  gargalos, heuristica=tipo_heuristica, vizinhanca=vizinhanca,
+                                  bidirecional=bidirecional)
+        ca1, ca2, ca3 = st.columns(3)
+        ca1.metric("Custo da Rota A*", f"{busca['custo']:.1f}")
+        ca2.metric("Células na Rota", f"{len(busca['rota'])}")
+        ca3.metric("Nós Expandidos", f"{busca['nos_expandidos']:,}",
+                   help="Células retiradas da fila de prioridade; a heurística reduz as expansões mantendo o custo ótimo")
+        st.caption(f"Grade com {tamanho_grade * tamanho_grade} células. Com 4 vizinhos o custo coincide com o da "
+                   "rota principal; com 8 vizinhos as diagonais (custo √2) podem encurtar o trajeto.")
+
+    # --- EVACUAÇÃO EM MASSA COM CAPACIDADES ---
+    st.markdown("---")
+    st.subheader("Evacuação em Massa com Capacidades (Fluxo em Rede)")
+    st.caption("Toda a população concentrada ao redor do ponto de origem evacua ao mesmo tempo. Células, arestas, "
+              "gargalos e saídas têm capacidade limitada; as rotas se redistribuem conforme as filas crescem.")
+
+    cf1, cf2, cf3, cf4 = st.columns(4)
+    num_pessoas = cf1.number_input("Pessoas a Evacuar", value=2000, min_value=10, step=500)
+    cap_aresta_ui = cf2.number_input("Capacidade por Aresta (pessoas/passo)", value=5.0, min_value=0.5, step=0.5)
+    cap_gargalo_ui = cf3.number_input("Capacidade no Gargalo (pessoas/passo)", value=1.0, min_value=0.1, step=0.5)
+    cap_saida_ui = cf4.number_input("Capacidade por Saída (pessoas/passo)", value=10.0, min_value=0.5, step=1.0)
+
+    # População distribuída em torno da origem (gaussiana de 2 células)
+    eixo_grade = np.arange(tamanho_grade)
+    gx, gy = np.meshgrid(eixo_grade, eixo_grade)
+    peso_pop = np.exp(-((gx - origem_x) ** 2 + (gy - origem_y) ** 2) / (2 * 2.0 ** 2))
+    populacao_grade = num_pessoas * peso_pop / peso_pop.sum()
+
+    plano = planejar_evacuacao_capacitada(
+        tamanho_grade, populacao_grade, pontos_seguros, zonas_perigo, gargalos,
+        capacidade_aresta=cap_aresta_ui, capacidade_gargalo=cap_gargalo_ui, capacidade_saida=cap_saida_ui
+    )
+    minutos_por_passo = 1.5  # Mesmo tempo por célula usado nas métricas da rota
+
+    cm1, cm2, cm3 = st.columns(3)
+    cm1.metric("Tempo de Liberação", f"{plano['passos_evacuacao'] * minutos_por_passo:.0f} min",
+               help="Tempo até a última pessoa alcançar um ponto seguro")
+    cm2.metric("Limite Inferior (Capacidade das Saídas)", f"{plano['limite_inferior'] * minutos_por_passo:.0f} min",
+               help="Tempo mínimo se todas as saídas operassem na vazão máxima desde o início")
+    cm3.metric("Pessoas Sem Rota", f"{plano['pessoas_isoladas']:.0f}",
+               help="Pessoas em células sem caminho até uma saída")
+
+    col_curva, col_carga = st.columns(2)
+    with col_curva:
+        df_curva = plano['curva'].assign(**{'Tempo (min)': plano['curva']['Passo'] * minutos_por_passo})
+        chart_curva = alt.Chart(df_curva).transform_fold(
+            ['Evacuados', 'Em Trânsito'], as_=['Situação', 'Pessoas']
+        ).mark_line().encode(
+            x=alt.X('Tempo (min):Q'),
+            y=alt.Y('Pessoas:Q'),
+            color=alt.Color('Situação:N', scale=alt.Scale(range=['#28a745', '#ff4b4b']))
+        ).properties(height=350, title="Curva de Evacuação")
+        st.altair_chart(chart_curva, use_container_width=True)
+
+    with col_carga:
+        opcoes_instante = ["Acumulado"] + [f"{p * minutos_por_passo:.0f} min" for p in plano['passos_registro']]
+        instante = st.select_slider("Carga no Instante", options=opcoes_instante, value="Acumulado")
+        if instante == "Acumulado":
+            carga_mapa = plano['carga_total']
+        else:
+            carga_mapa = plano['carga_tempo'][opcoes_instante.index(instante) - 1]
+        df_carga = pd.DataFrame({
+            'x': gx.ravel(), 'y': gy.ravel(),
+            'Pessoas': carga_mapa.ravel()
+        })
+        chart_carga = alt.Chart(df_carga).mark_rect().encode(
+            x=alt.X('x:O', title='Coordenada X'),
+            y=alt.Y('y:O', sort='descending', title='Coordenada Y'),
+            color=alt.Color('Pessoas:Q', scale=alt.Scale(scheme='orangered'), title="Fluxo"),
+            tooltip=['x:O', 'y:O', alt.Tooltip('Pessoas:Q', format='.0f')]
+        ).properties(height=350, title="Carga por Célula (pessoas que deixam a célula)")
+        st.altair_chart(chart_carga, use_container_width=True)
+
+    # --- PERIGO DINÂMICO (PLUMA EM MOVIMENTO) ---
+    st.markdown("---")
+    st.subheader("Perigo Dinâmico (Pluma em Movimento)")
+    st.caption("A zona de perigo configurada passa a se deslocar com o vento e crescer a cada fatia de tempo. "
+              "A rota dinâmica considera onde a pluma estará quando cada célula for alcançada.")
+
+    cd1, cd2, cd3, cd4 = st.columns(4)
+    vento_x = cd1.slider("Deslocamento X por Fatia", -2.0, 2.0, 0.5, 0.25)
+    vento_y = cd2.slider("Deslocamento Y por Fatia", -2.0, 2.0, -0.5, 0.25)
+    crescimento_pluma = cd3.slider("Crescimento do Raio por Fatia", 0.0, 1.0, 0.2, 0.05)
+    passos_por_fatia = cd4.slider("Passos por Fatia", 1, 10, 2,
+                                  help="Células percorridas entre duas atualizações da pluma")
+
+    pluma = gerar_pluma_movel(tamanho_grade, perigo_x, perigo_y, raio_perigo, intensidade_perigo,
+                              vx=vento_x, vy=vento_y, crescimento=crescimento_pluma)
+    dinamica = rotear_perigo_dinamico(tamanho_grade, (origem_x, origem_y), pontos_seguros, pluma,
+                                      gargalos, passos_por_fatia=passos_por_fatia)
+    exposicao_estatica = avaliar_exposicao_rota(rota, pluma, passos_por_fatia)
+    exposicao_dinamica = avaliar_exposicao_rota(dinamica['rota'], pluma, passos_por_fatia)
+
+    cdm1, cdm2, cdm3 = st.columns(3)
+    cdm1.metric("Exposição da Rota Estática", f"{exposicao_estatica:.0f}",
+                help="Intensidade × passos encontrada pela rota calculada com a pluma parada")
+    cdm2.metric("Exposição da Rota Dinâmica", f"{exposicao_dinamica:.0f}",
+                delta=f"{exposicao_dinamica - exposicao_estatica:+.0f}", delta_color="inverse")
+    cdm3.metric("Fatias de Perigo Avaliadas", dinamica['fatias_avaliadas'],
+                help="Rasters de custo calculados sob demanda pela busca")
+
+    fatia_mapa = st.slider("Fatia de Tempo no Mapa", 0, max(dinamica['passos_chegada'][-1] // passos_por_fatia, 1), 0)
+    pluma_fatia = pluma(fatia_mapa)
+    status_dinamico = np.where(pluma_fatia > 0, "Pluma na Fatia", "Livre").astype(object)
+    for x, y in dinamica['rota']:
+        status_dinamico[y, x] = "Rota Dinâmica"
+    for x, y in rota:
+        if status_dinamico[y, x] == "Rota Dinâmica":
+            status_dinamico[y, x] = "Ambas as Rotas"
+        else:
+            status_dinamico[y, x] = "Rota Estática"
+    eixo_d = np.arange(tamanho_grade)
+    dx_, dy_ = np.meshgrid(eixo_d, eixo_d)
+    df_dinamico = pd.DataFrame({'x': dx_.ravel(), 'y': dy_.ravel(), 'Status': status_dinamico.ravel()})
+    chart_dinamico = alt.Chart(df_dinamico).mark_rect(stroke='white', strokeWidth=0.5).encode(
+        x=alt.X('x:O', title='Coordenada X'),
+        y=alt.Y('y:O', sort='descending', title='Coordenada Y'),
+        color=alt.Color('Status:N', scale=alt.Scale(
+            domain=['Livre', 'Pluma na Fatia', 'Rota Estática', 'Rota Dinâmica', 'Ambas as Rotas'],
+            range=['#f0f0f0', '#ff4b4b', '#ffa500', '#4b91ff', '#6f42c1'])),
+        tooltip=['x:O', 'y:O', 'Status:N']
+    ).properties(height=450, title="Rotas Estática e Dinâmica sobre a Pluma em Movimento")
+    st.altair_chart(chart_dinamico, use_container_width=True)
+
+    # --- SIMULAÇÃO DE PEDESTRES (AUTÔMATO CELULAR) ---
+    st.markdown("---")
+    st.subheader("Simulação de Pedestres (Autômato Celular)")
+    st.caption("Cada pessoa é um agente que ocupa uma célula e segue o campo de distâncias até a saída, disputando "
+              "espaço com os vizinhos. Mostra a formação de congestionamentos nas saídas e gargalos.")
+
+    cp1, cp2, cp3 = st.columns(3)
+    fator_resolucao = cp1.slider("Resolução (subdivisões por célula)", 1, 10, 5,
+                                 help="Cada célula do mapa tático é subdividida em N × N células do autômato")
+    num_agentes = cp2.number_input("Número de Agentes", value=2000, min_value=10, max_value=50000, step=500)
+    sensibilidade = cp3.slider("Sensibilidade ao Campo de Piso", 0.5, 10.0, 3.0, 0.5,
+                               help="Valores altos tornam o movimento determinístico rumo à saída")
+
+    if st.button("Simular Pedestres", type="primary"):
+        st.session_state['pedestres_sim'] = True
+
+    if st.session_state.get('pedestres_sim'):
+        # Cenário refinado: saídas e gargalos ocupam blocos de fator × fator células
+        f = fator_resolucao
+        n_fino = tamanho_grade * f
+        bloco = [(i, j) for i in range(f) for j in range(f)]
+        saidas_finas = [(px * f + i, py * f + j) for px, py in pontos_seguros for i, j in bloco]
+        gargalos_finos = [(gx_ * f + i, gy_ * f + j) for gx_, gy_ in gargalos for i, j in bloco]
+        zonas_finas = [{'x': z['x'] * f + f / 2, 'y': z['y'] * f + f / 2, 'raio': z['raio'] * f,
+                        'intensidade': z['intensidade']} for z in zonas_perigo]
+
+        posicoes = posicionar_agentes(n_fino, num_agentes, (origem_x * f + f / 2, origem_y * f + f / 2),
+                                      dispersao=2.0 * f, semente=42)
+        sim = simular_pedestres(n_fino, posicoes, saidas_finas, zonas_finas, gargalos_finos,
+                                sensibilidade=sensibilidade, semente=42)
+        minutos_por_passo_fino = 1.5 / f
+
+        cs1, cs2, cs3 = st.columns(3)
+        cs1.metric("Tempo Total de Evacuação", f"{sim['passos_evacuacao'] * minutos_por_passo_fino:.0f} min")
+        tempo_mediano = np.median(sim['tempos_saida']) * minutos_por_passo_fino if len(sim['tempos_saida']) else 0
+        cs2.metric("Tempo Mediano de Saída", f"{tempo_mediano:.0f} min")
+        cs3.metric("Agentes Sem Rota", sim['agentes_isolados'])
+
+        col_ev, col_dens = st.columns(2)
+        with col_ev:
+            df_ev = sim['curva'].assign(**{'Tempo (min)': sim['curva']['Passo'] * minutos_por_passo_fino})
+            chart_ev = alt.Chart(df_ev).mark_area(color='#28a745', opacity=0.6).encode(
+                x=alt.X('Tempo (min):Q'),
+                y=alt.Y('Evacuados:Q', title="Pessoas Evacuadas")
+            ).properties(height=350, title="Curva de Evacuação (Agentes)")
+            st.altair_chart(chart_ev, use_container_width=True)
+
+        with col_dens:
+            opcoes_dens = ["Média"] + [f"{p * minutos_por_passo_fino:.0f} min" for p in sim['passos_registro']]
+            instante_dens = st.select_slider("Densidade no Instante", options=opcoes_dens, value="Média")
+            if instante_dens == "Média":
+                dens = sim['densidade_media']
+            else:
+                dens = sim['densidade_tempo'][opcoes_dens.index(instante_dens) - 1].astype(float)
+
+            # Agregar blocos para limitar o número de retângulos enviados ao navegador
+            passo_bloco = max(1, int(np.ceil(n_fino / 50)))
+            n_bloco = n_fino // passo_bloco
+            dens_bloco = dens[:n_bloco * passo_bloco, :n_bloco * passo_bloco].reshape(
+                n_bloco, passo_bloco, n_bloco, passo_bloco).mean(axis=(1, 3))
+            by, bx = np.mgrid[0:n_bloco, 0:n_bloco]
+            df_dens = pd.DataFrame({'x': bx.ravel(), 'y': by.ravel(), 'Densidade': dens_bloco.ravel()})
+            chart_dens = alt.Chart(df_dens).mark_rect().encode(
+                x=alt.X('x:O', axis=None),
+                y=alt.Y('y:O', sort='descending', axis=None),
+                color=alt.Color('Densidade:Q', scale=alt.Scale(scheme='inferno', reverse=True),
+                                title="Ocupação"),
+                tooltip=[alt.Tooltip('Densidade:Q', format='.2f')]
+            ).properties(height=350, title="Mapa de Densidade de Pedestres")
+            st.altair_chart(chart_dens, use_container_width=True)
+
+    # --- REDE VIÁRIA REAL ---
+    st.markdown("---")
+    st.subheader("Rota em Rede Viária Real (Arquivo Local)")
+    st.caption("Carregue um extrato local da malha viária (GeoJSON, OSM XML ou OSM PBF). A rede é convertida em "
+              "grafo compacto e mantida em cache binário (.npz) para carregamentos seguintes.")
+
+    arquivo_rede = st.file_uploader("Arquivo da Rede Viária", type=["geojson", "json", "osm", "pbf"])
+    if arquivo_rede is not None:
+        pasta_rede = os.path.join(tempfile.gettempdir(), "bnqr_redes")
+        os.makedirs(pasta_rede, exist_ok=True)
+        # Arquivo nomeado pelo SHA-1 do conteúdo: sessões e versões diferentes não colidem
+        conteudo_rede = arquivo_rede.getbuffer()
+        extensao_rede = os.path.splitext(arquivo_rede.name)[1].lower()
+        caminho_rede = os.path.join(pasta_rede, hashlib.sha1(conteudo_rede).hexdigest() + extensao_rede)
+        if not os.path.exists(caminho_rede):
+            temporario = f"{caminho_rede}.{os.getpid()}.tmp"
+            with open(temporario, 'wb') as destino_arquivo:
+                destino_arquivo.write(conteudo_rede)
+            os.replace(temporario, caminho_rede)
+
+        try:
+            rede = carregar_rede_viaria(caminho_rede)
+        except (ImportError, ValueError) as erro:
+            st.error(f"**Erro ao carregar a rede:** {erro}")
+            rede = None
+
+        if rede is not None:
+            lat_centro, lon_centro = float(np.median(rede['lat'])), float(np.median(rede['lon']))
+            cr1, cr2 = st.columns(2)
+            with cr1:
+                origem_lat = st.number_input("Latitude da Origem", value=lat_centro, format="%.6f")
+                origem_lon = st.number_input("Longitude da Origem", value=lon_centro, format="%.6f")
+            with cr2:
+                texto_saidas = st.text_area(
+                    "Pontos Seguros (lat, lon por linha)",
+                    value=f"{rede['lat'].min():.6f}, {rede['lon'].min():.6f}\n{rede['lat'].max():.6f}, {rede['lon'].max():.6f}"
+                )
+            saidas_rede = []
+            for linha in texto_saidas.splitlines():
+                partes = [p.strip() for p in linha.split(',')]
+                if len(partes) == 2:
+                    try:
+                        saidas_rede.append((float(partes[0]), float(partes[1])))
+                    except ValueError:
+                        continue
+
+            if saidas_rede:
+                resultado_rede = rotear_rede_viaria(rede, (origem_lat, origem_lon), saidas_rede)
+                rm1, rm2, rm3 = st.columns(3)
+                rm1.metric("Nós / Arestas", f"{len(rede['lon']):,} / {rede['grafo'].nnz:,}")
+                if np.isfinite(resultado_rede['distancia_m']):
+                    rm2.metric("Distância da Rota", f"{resultado_rede['distancia_m'] / 1000:.2f} km")
+                    # Caminhada a 4 km/h, mesma premissa do tempo estimado na grade
+                    rm3.metric("Tempo a Pé (4 km/h)", f"{resultado_rede['distancia_m'] / 1000 / 4 * 60:.0f} min")
+                else:
+                    rm2.metric("Distância da Rota", "Sem rota")
+                    st.error("**ERRO:** Nenhum ponto seguro alcançável a partir da origem nesta rede.")
+
+                mapa_rede = folium.Map(location=[origem_lat, origem_lon], zoom_start=15)
+                folium.PolyLine(resultado_rede['rota'], color='#4b91ff', weight=5,
+                                tooltip="Rota de Evacuação").add_to(mapa_rede)
+                folium.Marker([origem_lat, origem_lon], tooltip="Origem",
+                              icon=folium.Icon(color='black')).add_to(mapa_rede)
+                for lat_s, lon_s in saidas_rede:
+                    folium.Marker([lat_s, lon_s], tooltip="Ponto Seguro",
+                                  icon=folium.Icon(color='green')).add_to(mapa_rede)
+                st_folium(mapa_rede, width=None, height=500)
+
     st.markdown("---")
     st.markdown("### Interpretação dos Resultados")
     st.info("""
@@ -445,12 +1791,14 @@ def renderizar():
     st.markdown("### Considerações Técnicas")
     st.info("""
     **Limitações do Modelo:**
-    - Assume movimento em grade (4 direções: norte, sul, leste, oeste)
+    - Assume movimento em grade: 4 direções na rota principal, na rota dinâmica e nos pedestres;
+      a busca A* aceita também 8 direções (diagonais com custo √2)
     - Não considera terreno irregular, elevações ou obstáculos naturais
     - Assume que todas as pessoas se movem na mesma velocidade
-    - Não modela comportamento de pânico, multidões ou fluxo de massa
-    - Não considera mudanças dinâmicas nas zonas de perigo ao longo do tempo
-    - Assume que a zona de perigo é estática durante a evacuação
+    - Não modela comportamento de pânico; a evacuação em massa usa capacidades agregadas por célula e passagem
+      (transmissão celular), com rotas recalculadas pela fila, e não decisões individuais
+    - O mapa tático assume zona de perigo estática; a seção de pluma em movimento usa deslocamento e crescimento
+      uniformes, embora rotear_perigo_dinamico aceite séries de rasters (lista ou função fatia → raster)
     
     **Interpretação dos Resultados:**
     - Os resultados são projeções baseadas em um modelo simplificado
@@ -460,9 +1808,8 @@ def renderizar():
     - Considere fatores adicionais (clima, visibilidade, condições físicas das pessoas)
     
     **Melhorias Futuras:**
-    - Modelos de fluxo de multidões (Social Force Model)
+    - Social Force Model em espaço contínuo (hoje: autômato celular com campo de piso)
     - Consideração de terreno e elevações
-    - Modelagem dinâmica de zonas de perigo
-    - Múltiplas rotas simultâneas para grandes grupos
+    - Seleção, na interface, das séries de rasters geradas pelos módulos de dispersão
     - Integração com dados de tráfego em tempo real
     """)
\ No newline at end of file
@@ -4,6 +4,10 @@ from streamlit_folium import st_folium
 import math
 import numpy as np
 import pandas as pd
+import altair as alt
+from scipy.special import exp1
+from modulos import nucleo_radiologico
+from modulos.nucleo_radiologico import HORAS_POR_ANO, atividade_no_tempo, extrair_isocontornos
 
 # =============================================================================
 # 1. BANCO DE DADOS DE ISÓTOPOS (CONHECIMENTO TÉCNICO)
@@ -16,6 +20,7 @@ ISOTOPOS = {
         "meia_vida": "30 anos", 
         "energia": "Gama/Beta", 
         "gama_const": 3.3,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 4.6e-9,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Contaminação de longo prazo (acidente de Goiânia). Liga-se quimicamente ao solo. Perigo de contaminação interna se inalado ou ingerido.",
         "uso": "Hospitais (Radioterapia antiga), Medidores de Nível Industriais, Densímetros."
     },
@@ -23,6 +28,7 @@ ISOTOPOS = {
         "meia_vida": "5.2 anos", 
         "energia": "Gama Muito Forte (1.17 e 1.33 MeV)", 
         "gama_const": 13.0,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 1.0e-8,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Irradiação externa aguda. Alta energia gama penetrante. Morte rápida se exposição a alta dose. Difícil de blindar.",
         "uso": "Esterilização de Alimentos, Radioterapia, Irradiadores Industriais."
     },
@@ -30,6 +36,7 @@ ISOTOPOS = {
         "meia_vida": "73 dias", 
         "energia": "Gama (múltiplas energias)", 
         "gama_const": 4.8,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 4.9e-9,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Queimaduras graves por contato direto. Decai relativamente rápido (meses). Principal causa de acidentes industriais com radiação.",
         "uso": "Gamagrafia Industrial (Raio-X de soldas em tubulações, vasos de pressão)."
     },
@@ -37,6 +44,7 @@ ISOTOPOS = {
         "meia_vida": "432 anos", 
         "energia": "Alfa/Gama Fraco", 
         "gama_const": 0.1,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 4.2e-5,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Perigo extremo se inalado (pó fino). Emite partículas alfa que causam dano severo se incorporado. Gama fraco, mas contaminação interna é letal.",
         "uso": "Perfilagem de Poços de Petróleo, Detectores de Fumaça (antigos), Para-raios (obsoletos)."
     },
@@ -44,6 +52,7 @@ ISOTOPOS = {
         "meia_vida": "28 anos", 
         "energia": "Beta Puro", 
         "gama_const": 0.0,  # Beta puro, sem gama direto
+        "dcf_inalacao": 3.0e-8,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Se ingerido ou inalado, fixa-se nos ossos como cálcio (análogo químico). Causa câncer ósseo e leucemia. Emite beta forte, mas sem gama direto.",
         "uso": "Geradores Termoelétricos Radioisotópicos (RTG) em Faróis Remotos, Satélites, Sondas Espaciais."
     },
@@ -51,6 +60,7 @@ ISOTOPOS = {
         "meia_vida": "6 horas", 
         "energia": "Gama (140 keV)", 
         "gama_const": 0.2,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 2.0e-11,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Isótopo médico mais comum. Decai muito rápido (horas), mas em grandes quantidades pode causar contaminação. Baixa energia gama.",
         "uso": "Medicina Nuclear (diagnóstico por imagem - cintilografia). Mais de 80% dos procedimentos de medicina nuclear."
     },
@@ -58,6 +68,7 @@ ISOTOPOS = {
         "meia_vida": "8 dias", 
         "energia": "Gama/Beta", 
         "gama_const": 2.2,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 7.4e-9,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Muito volátil. Produto de fissão nuclear. Acumula na tireoide humana se inalado ou ingerido. Causa câncer de tireoide. Perigo em acidentes de reator.",
         "uso": "Terapia de Câncer de Tireoide, Medicina Nuclear, Produto de Fissão em Reatores."
     },
@@ -65,6 +76,7 @@ ISOTOPOS = {
         "meia_vida": "1600 anos", 
         "energia": "Alfa/Gama", 
         "gama_const": 0.8,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 3.5e-6,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Fonte órfã histórica. Muito persistente (milênios). Emite radônio-222 gasoso como produto de decaimento. Perigo de contaminação interna.",
         "uso": "Fontes Órfãs Históricas (relógios luminosos, pinturas radioluminescentes antigas)."
     },
@@ -72,6 +84,7 @@ ISOTOPOS = {
         "meia_vida": "138 dias", 
         "energia": "Alfa Puro", 
         "gama_const": 0.0,  # Alfa puro, sem gama
+        "dcf_inalacao": 3.3e-6,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Extremamente tóxico se ingerido ou inalado. Emite partículas alfa de alta energia. Caso Litvinenko (2006). Muito difícil de detectar (sem gama).",
         "uso": "Fontes de Nêutrons (misturado com Berílio), Pesquisa Científica."
     },
@@ -79,6 +92,7 @@ ISOTOPOS = {
         "meia_vida": "24100 anos", 
         "energia": "Alfa/Gama Muito Fraco", 
         "gama_const": 0.0002,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 5.0e-5,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Material físsil. Perigo de contaminação interna e criticidade. Gama muito fraco, mas alfa extremamente perigoso se incorporado. Carcinogênico.",
         "uso": "Combustível de Reatores, Armas Nucleares, Pesquisa."
     },
@@ -86,6 +100,7 @@ ISOTOPOS = {
         "meia_vida": "4.46 bilhões de anos", 
         "energia": "Alfa/Gama Muito Fraco", 
         "gama_const": 0.0001,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 8.0e-6,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Urânio natural. Principalmente perigo químico (metal pesado tóxico) e de contaminação interna. Gama muito fraco. Muito persistente.",
         "uso": "Combustível de Reatores, Munição Depleted Uranium (DU), Pesquisa."
     },
@@ -93,6 +108,7 @@ ISOTOPOS = {
         "meia_vida": "14 bilhões de anos", 
         "energia": "Alfa/Gama Fraco", 
         "gama_const": 0.0003,  # mSv/h a 1m por Ci
+        "dcf_inalacao": 4.2e-5,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Tório natural. Muito persistente. Perigo de contaminação interna. Gama fraco. Usado em alguns reatores experimentais.",
         "uso": "Combustível de Reatores Experimentais, Eletrodos de Solda TIG, Pesquisa."
     },
@@ -100,6 +116,7 @@ ISOTOPOS = {
         "meia_vida": "5730 anos", 
         "energia": "Beta Puro", 
         "gama_const": 0.0,  # Beta puro
+        "dcf_inalacao": 5.8e-10,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Baixo risco externo (beta fraco), mas pode incorporar-se biologicamente. Usado em datação por carbono. Contaminação de longo prazo.",
         "uso": "Datação por Carbono-14, Traçador Radioativo em Pesquisa."
     },
@@ -107,6 +124,7 @@ ISOTOPOS = {
         "meia_vida": "14 dias", 
         "energia": "Beta Forte", 
         "gama_const": 0.0,  # Beta puro
+        "dcf_inalacao": 3.4e-9,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Beta de alta energia. Perigo de queimaduras por contato. Se ingerido, acumula em tecidos com alto metabolismo (osso, medula).",
         "uso": "Medicina Nuclear (terapia), Pesquisa Biológica, Tratamento de Policitemia Vera."
     },
@@ -114,11 +132,47 @@ ISOTOPOS = {
         "meia_vida": "87 dias", 
         "energia": "Beta Fraco", 
         "gama_const": 0.0,  # Beta puro
+        "dcf_inalacao": 1.4e-9,  # Sv/Bq inalado (ICRP 72, adulto)
         "risco": "Beta de baixa energia. Baixo risco externo, mas pode incorporar-se biologicamente. Usado como traçador em pesquisa.",
         "uso": "Pesquisa Biológica (traçador), Estudos Metabólicos."
     }
 }
 
+# Filhos radioativos relevantes das cadeias de decaimento. A constante gama
+# tabelada em ISOTOPOS é a do pai em equilíbrio com seus filhos (como nas
+# tabelas de campo); aqui cada filho traz apenas a sua própria emissão, por Ci
+# do filho, para que o motor de decaimento acompanhe o crescimento (in-growth).
+FILHOS_RADIOATIVOS = {
+    "Bário-137m (Ba-137m)": {
+        "meia_vida": "2.55 minutos",
+        "gama_const": 3.5,       # Fóton de 662 keV (a "gama do Cs-137")
+        "dcf_inalacao": 0.0,     # Vida curta demais para dose interna relevante
+    },
+    "Ítrio-90 (Y-90)": {
+        "meia_vida": "64 horas",
+        "gama_const": 0.0,       # Beta puro
+        "dcf_inalacao": 1.5e-9,
+    },
+    "Radônio-222 + Progênie (Rn-222)": {
+        "meia_vida": "3.82 dias",
+        "gama_const": 0.8,       # Pb-214/Bi-214 (vida curta) agregados ao Rn-222
+        "dcf_inalacao": 0.0,     # Gás nobre: dose da progênie inalada fora do escopo
+    },
+    "Tório-234 + Pa-234m (Th-234)": {
+        "meia_vida": "24.1 dias",
+        "gama_const": 0.0001,
+        "dcf_inalacao": 7.7e-9,
+    },
+}
+
+# Pai -> [(filho, razão de ramificação)]
+CADEIAS_DECAIMENTO = {
+    "Césio-137 (Cs-137)": [("Bário-137m (Ba-137m)", 0.944)],
+    "Estrôncio-90 (Sr-90)": [("Ítrio-90 (Y-90)", 1.0)],
+    "Rádio-226 (Ra-226)": [("Radônio-222 + Progênie (Rn-222)", 1.0)],
+    "Urânio-238 (U-238)": [("Tório-234 + Pa-234m (Th-234)", 1.0)],
+}
+
 # =============================================================================
 # 2. LIMITES DE INTERVENÇÃO (NÍVEIS DE CONTAMINAÇÃO NO SOLO)
 # =============================================================================
@@ -134,82 +188,220 @@ LIMITES_INTERVENCAO = {
 # =============================================================================
 # 3. MOTOR DE CÁLCULO (DISPERSÃO E DEPOSIÇÃO)
 # =============================================================================
-# Baseado em: Gaussian Puff Model simplificado, Church's Explosion Formula,
-# IAEA Technical Reports Series No. 418 (Radiological Consequences)
-def calcular_pluma_rdd(atividade_ci, explosivo_kg, vento_ms, direcao_graus, gama_const=3.3):
+# Baseado em: Modelo de Pluma Gaussiana com depleção da fonte (Chamberlain),
+# Church's Explosion Formula, coeficientes de dispersão de Briggs (campo aberto),
+# HotSpot Health Physics Codes (explosões), IAEA TRS No. 418
+
+# Coeficientes de Briggs (terreno aberto), x em metros:
+# σy = a·x·(1 + b·x)^-0.5 ; σz = c·x·(1 + d·x)^e
+CLASSES_ESTABILIDADE = {
+    "A": {"desc": "Muito Instável (sol forte, vento fraco)", "a": 0.22, "b": 0.0001, "c": 0.20, "d": 0.0, "e": 0.0},
+    "B": {"desc": "Instável", "a": 0.16, "b": 0.0001, "c": 0.12, "d": 0.0, "e": 0.0},
+    "C": {"desc": "Levemente Instável", "a": 0.11, "b": 0.0001, "c": 0.08, "d": 0.0002, "e": -0.5},
+    "D": {"desc": "Neutra (nublado ou vento moderado)", "a": 0.08, "b": 0.0001, "c": 0.06, "d": 0.0015, "e": -0.5},
+    "E": {"desc": "Levemente Estável (noite)", "a": 0.06, "b": 0.0001, "c": 0.03, "d": 0.0003, "e": -1.0},
+    "F": {"desc": "Estável (noite clara, vento fraco)", "a": 0.04, "b": 0.0001, "c": 0.016, "d": 0.0003, "e": -1.0},
+}
+
+FRACAO_LIBERADA = 0.20   # Fração da fonte convertida em aerossol dispersível
+_CACHE_DEPOSICAO = {}
+MAX_RASTERS_CACHE = 16   # Rasters mantidos em memória (descarte do mais antigo)
+
+
+def calcular_sigmas(x, classe_estabilidade, sigma_inicial=0.0):
+    """
+    Coeficientes de dispersão lateral e vertical (m) para distâncias x (m).
+
+    O espalhamento inicial da nuvem de explosão é somado em quadratura.
+    """
+    c = CLASSES_ESTABILIDADE[classe_estabilidade]
+    x = np.maximum(np.asarray(x, dtype=float), 0.0)
+    sigma_y = c["a"] * x * (1 + c["b"] * x) ** -0.5
+    sigma_z = c["c"] * x * (1 + c["d"] * x) ** c["e"]
+    return np.hypot(sigma_y, sigma_inicial), np.hypot(sigma_z, sigma_inicial)
+
+
+def _perfil_deposicao(q_ci, altura, vento_ms, v_d, classe, sigma_inicial, x):
+    """
+    Perfil 1D ao longo do eixo da pluma: sigmas, fração remanescente no ar
+    (depleção da fonte de Chamberlain) e deposição na linha central.
+    """
+    sy, sz = calcular_sigmas(x, classe, sigma_inicial)
+    # Q(x)/Q0 = exp(-√(2/π)·(v_d/u)·∫ exp(-H²/2σz²)/σz dx)
+    integrando = np.exp(-altura ** 2 / (2 * sz ** 2)) / sz
+    integral = np.concatenate([[0.0], np.cumsum(0.5 * (integrando[1:] + integrando[:-1]) * np.diff(x))])
+    remanescente = np.exp(-math.sqrt(2 / math.pi) * (v_d / vento_ms) * integral)
+    # Concentração integrada no solo com reflexão: χ = Q/(π·u·σy·σz)·exp(-H²/2σz²)
+    deposicao_central = v_d * q_ci * remanescente * integrando / (math.pi * vento_ms * sy)
+    return sy, remanescente, deposicao_central
+
+
+def calcular_raster_deposicao(atividade_ci, explosivo_kg, vento_ms, direcao_graus,
+                              classe_estabilidade="D", v_d=0.01, fracao_liberada=FRACAO_LIBERADA,
+                              num_celulas=401, nivel_minimo=None):
+    """
+    Calcula a deposição no solo (Ci/m²) em uma grade alinhada ao vento, com
+    origem no ponto zero, por pluma gaussiana com depleção por deposição seca.
+
+    A nuvem é liberada na altura de Church (H = 76·kg^0.25) com espalhamento
+    inicial σ0 = H/2.15 (aproximação do HotSpot para explosões). A extensão da
+    grade é escolhida a partir do perfil da linha central, para conter a
+    isopleta do nível mínimo. Os eixos ao longo e transversal ao vento têm
+    espaçamentos próprios (num_celulas em cada eixo), de modo que a largura da
+    pluma é sempre amostrada pelo mesmo número de células, qualquer que seja a
+    direção do vento; vento_para_leste_norte leva pontos da grade ao plano
+    leste/norte. Toda a grade é avaliada de uma vez com NumPy; o resultado é
+    guardado em cache pela chave dos parâmetros de entrada.
+
+    Parâmetros:
+    - atividade_ci, explosivo_kg, vento_ms, direcao_graus: Como em calcular_pluma_rdd
+    - classe_estabilidade: Classe de Pasquill-Gifford (A-F)
+    - v_d: Velocidade de deposição seca (m/s)
+    - fracao_liberada: Fração da atividade que vira aerossol dispersível
+    - num_celulas: Células por lado da grade
+    - nivel_minimo: Menor nível de interesse (Ci/m²); padrão é o menor de LIMITES_INTERVENCAO
+
+    Retorna:
+    - Dicionário com deposicao (transversal × ao longo do vento) em Ci/m²,
+      x_vento e y_vento (centros das células em metros ao longo e transversal ao
+      vento), dx e dy (espaçamentos em m), area_celula (m²), direcao_pluma
+      (vetor unitário leste/norte do sentido da pluma), altura_efetiva (m),
+      fracao_depositada (fração do aerossol depositada dentro da grade) e
+      deposicao_maxima (Ci/m²)
+    """
+    if nivel_minimo is None:
+        nivel_minimo = min(LIMITES_INTERVENCAO.values())
+    chave = tuple(round(float(v), 9) for v in (atividade_ci, explosivo_kg, vento_ms, direcao_graus,
+                                                 v_d, fracao_liberada, num_celulas, nivel_minimo))
+    chave += (classe_estabilidade,)
+    if chave in _CACHE_DEPOSICAO:
+        return _CACHE_DEPOSICAO[chave]
+
+    altura = 76 * (explosivo_kg ** 0.25)
+    sigma_inicial = altura / 2.15
+    q_ci = atividade_ci * fracao_liberada
+
+    # Perfil da linha central para dimensionar a grade
+    x_perfil = np.concatenate([[0.0], np.geomspace(1.0, 100_000.0, 4000)])
+    sy, remanescente, dep_central = _perfil_deposicao(q_ci, altura, vento_ms, v_d, classe_estabilidade,
+                                                      sigma_inicial, x_perfil)
+    acima = dep_central >= nivel_minimo
+    if acima.any():
+        alcance = x_perfil[acima].max()
+        meia_largura = np.max(sy[acima] * np.sqrt(2 * np.log(dep_central[acima] / nivel_minimo)))
+    else:
+        alcance, meia_largura = x_perfil[np.argmax(dep_central)] * 2, 3 * sy[np.argmax(dep_central)]
+    alcance = float(np.clip(alcance * 1.1, 200.0, 100_000.0))
+    meia_largura = float(max(meia_largura * 1.2, 50.0))
+
+    # Grade alinhada ao vento: espaçamentos independentes ao longo e transversal
+    angulo_pluma = math.radians((direcao_graus + 180) % 360)
+    x_vento = np.linspace(-0.05 * alcance, alcance, num_celulas)
+    y_vento = np.linspace(-meia_largura, meia_largura, num_celulas)
+    dx, dy = x_vento[1] - x_vento[0], y_vento[1] - y_vento[0]
+
+    xv = np.maximum(x_vento, 0.0)
+    sy_g, sz_g = calcular_sigmas(xv, classe_estabilidade, sigma_inicial)
+    fracao = np.interp(xv, x_perfil, remanescente)
+    # Perfil ao longo do vento (1D) × gaussiana transversal
+    ao_longo = np.where(x_vento > 0, v_d * q_ci * fracao / (math.pi * vento_ms * sy_g * sz_g)
+                        * np.exp(-altura ** 2 / (2 * sz_g ** 2)), 0.0)
+    deposicao = ao_longo[None, :] * np.exp(-y_vento[:, None] ** 2 / (2 * sy_g[None, :] ** 2))
+
+    resultado = {
+        "deposicao": deposicao,
+        "x_vento": x_vento,
+        "y_vento": y_vento,
+        "dx": dx,
+        "dy": dy,
+        "area_celula": dx * dy,
+        "direcao_pluma": (math.sin(angulo_pluma), math.cos(angulo_pluma)),
+        "altura_efetiva": altura,
+        "fracao_depositada": float(deposicao.sum() * dx * dy / q_ci) if q_ci > 0 else 0.0,
+        "deposicao_maxima": float(deposicao.max()),
+    }
+    if len(_CACHE_DEPOSICAO) >= MAX_RASTERS_CACHE:
+        _CACHE_DEPOSICAO.pop(next(iter(_CACHE_DEPOSICAO)))
+    _CACHE_DEPOSICAO[chave] = resultado
+    return resultado
+
+
+def vento_para_leste_norte(raster, pontos):
+    """
+    Converte pontos (K, 2) da grade do raster (metros ao longo / transversal ao
+    vento) em metros a leste/norte do ponto zero.
+    """
+    pontos = np.asarray(pontos, dtype=float).reshape(-1, 2)
+    ux, uy = raster["direcao_pluma"]
+    return np.column_stack([pontos[:, 0] * ux + pontos[:, 1] * uy,
+                            pontos[:, 0] * uy - pontos[:, 1] * ux])
+
+
+def converter_para_latlon(lat_origem, lon_origem, pontos_xy):
+    """
+    Converte pontos locais (metros a leste, metros a norte) em [lat, lon].
+    Usa aproximação de esfera para pequenas distâncias (< 100 km).
+    """
+    pontos_xy = np.asarray(pontos_xy, dtype=float).reshape(-1, 2)
+    r_terra = 6378137  # Raio da Terra em metros (WGS84)
+    d_lat = np.degrees(pontos_xy[:, 1] / r_terra)
+    d_lon = np.degrees(pontos_xy[:, 0] / r_terra) / math.cos(math.radians(lat_origem))
+    return np.column_stack([lat_origem + d_lat, lon_origem + d_lon])
+
+
+def calcular_pluma_rdd(atividade_ci, explosivo_kg, vento_ms, direcao_graus, gama_const=3.3,
+                       classe_estabilidade="D", v_d=0.01):
     """
     Simula a dispersão de particulado radioativo após detonação de RDD.
-    
+
+    As zonas de intervenção são as isopletas de LIMITES_INTERVENCAO extraídas
+    do raster de deposição gaussiana (calcular_raster_deposicao).
+
     Parâmetros:
     - atividade_ci: Atividade inicial em Curies (Ci)
     - explosivo_kg: Massa equivalente de TNT em quilogramas
     - vento_ms: Velocidade do vento em metros por segundo
     - direcao_graus: Direção de onde vem o vento (0° = Norte, 90° = Leste)
     - gama_const: Constante gama do isótopo (mSv/h a 1m por Ci)
-    
+    - classe_estabilidade: Classe de estabilidade atmosférica (A-F)
+    - v_d: Velocidade de deposição seca (m/s)
+
     Retorna:
-    - resultados: Dicionário com dimensões das zonas de contaminação
+    - resultados: Dicionário por zona com dimensões, área e isopletas (anéis em
+      metros a leste/norte do ponto zero)
     - altura_efetiva: Altura da nuvem de detritos em metros
     - dados_detalhados: DataFrame com informações detalhadas por zona
     """
-    # 1. Altura da Nuvem (Fórmula de Church para explosões químicas)
-    # H = 76 * (kg_TNT)^0.25
-    # Baseado em: Church, H.E. (1969) - "Explosions and Blast Waves"
-    altura_efetiva = 76 * (explosivo_kg ** 0.25)
-    
-    # 2. Termo Fonte (Release Fraction - Fração Liberada)
-    # Em RDD ("Bombas Sujas"), assume-se que 20% do material vira pó fino
-    # respirável/dispersível. O resto (80%) são estilhaços grandes que caem
-    # na cratera próxima ao ponto zero.
-    # Baseado em: DHS/NRC RDD Assessment Guidelines
-    RF = 0.20 
-    Q_efetivo = atividade_ci * RF
-    
-    # 3. Velocidade de Deposição (Deposition Velocity)
-    # Velocidade típica para aerossóis radioativos: ~1 cm/s
-    # Depende do tamanho da partícula, densidade e condições meteorológicas
-    v_d = 0.01  # m/s
-    
+    raster = calcular_raster_deposicao(atividade_ci, explosivo_kg, vento_ms, direcao_graus,
+                                       classe_estabilidade, v_d)
+    dep = raster["deposicao"]
+    x_vento, y_vento = np.meshgrid(raster["x_vento"], raster["y_vento"])
+    cores = {"Evacuação Imediata": "#FF0000", "Relocação Temporária": "#FF8C00", "Monitoramento/Abrigo": "#FFD700"}
+
     resultados = {}
     dados_detalhados = []
-    
-    # Loop: calcula as 3 zonas de intervenção automaticamente
     for nivel, limite in LIMITES_INTERVENCAO.items():
-        # Inversão da equação de deposição para encontrar a distância
-        # Equação simplificada: C = (Q * v_d) / (u * L)
-        # Onde: C = concentração depositada (Ci/m²), Q = fonte (Ci),
-        #       v_d = velocidade de deposição (m/s), u = velocidade do vento (m/s),
-        #       L = comprimento da pluma (m)
-        # Reorganizando: L = (Q * v_d) / (u * C)
-        fator_forca = (Q_efetivo * v_d) / (vento_ms * limite)
-        
-        # Comprimento estimado da mancha no chão (em metros)
-        comprimento = math.sqrt(fator_forca) * 50 
-        
-        # Limites físicos do modelo (validação)
-        if comprimento < 20: comprimento = 20  # Mínimo: 20 metros
-        if comprimento > 15000: comprimento = 15000  # Máximo: 15 km
-        
-        # Largura da pluma (Abertura lateral devido à turbulência atmosférica)
-        # Razão típica largura/comprimento para plumas gaussianas: ~0.35
-        largura = comprimento * 0.35 
-        
-        # Área contaminada (aproximação elíptica)
-        area_contaminada = math.pi * (comprimento / 2) * (largura / 2)
-        
-        # Taxa de dose estimada no centro da zona (Ground Shine)
-        # Aproximação: dose diminui com distância e decaimento temporal
-        # Para simplificação, usamos a constante gama ajustada pela atividade depositada
+        dentro = dep >= limite
+        if dentro.any():
+            comprimento = float(x_vento[dentro].max())
+            largura = float(np.ptp(y_vento[dentro]) + raster["dy"])
+        else:
+            comprimento = largura = 0.0
+        area_contaminada = float(dentro.sum() * raster["area_celula"])
+
+        # Taxa de dose de ground shine (aproximação pela atividade depositada no limite)
         dose_rate_centro = (gama_const * limite * 1000) / (1.0 ** 2)  # mSv/h (aproximado)
-        
+
         resultados[nivel] = {
             "comprimento": comprimento,
             "largura": largura,
             "area": area_contaminada,
             "dose_rate_centro": dose_rate_centro,
-            "cor": {"Evacuação Imediata": "#FF0000", "Relocação Temporária": "#FF8C00", "Monitoramento/Abrigo": "#FFD700"}[nivel]
+            "cor": cores[nivel],
+            "isopletas": [vento_para_leste_norte(raster, anel)
+                          for anel in extrair_isocontornos(dep, raster["x_vento"], raster["y_vento"], limite)]
+                         if dentro.any() else [],
         }
-        
         dados_detalhados.append({
             "Zona": nivel,
             "Comprimento (m)": comprimento,
@@ -219,67 +411,189 @@ def calcular_pluma_rdd(atividade_ci, explosivo_kg, vento_ms, direcao_graus, gama
             "Contaminação (Ci/m²)": limite,
             "Taxa de Dose (mSv/h)": dose_rate_centro
         })
-    
+
     df_detalhado = pd.DataFrame(dados_detalhados)
-    
-    return resultados, altura_efetiva, df_detalhado
+    return resultados, raster["altura_efetiva"], df_detalhado
+
+# =============================================================================
+# 4. TERMO FONTE MULTI-ISÓTOPO (CADEIAS DE DECAIMENTO)
+# =============================================================================
+# O inventário da fonte é um vetor de atividades por isótopo. A solução de
+# Bateman matricial (nucleo_radiologico, compartilhada com o módulo radiológico)
+# escreve a atividade de cada nuclídeo como soma de exponenciais, a(t) = C·e^(-λt),
+# de modo que todos os instantes de interesse saem de um único produto matricial.
+
+
+def _dados_nuclideo(nome):
+    return ISOTOPOS[nome] if nome in ISOTOPOS else FILHOS_RADIOATIVOS[nome]
+
+
+def ordenar_nuclideos(inventario):
+    """Nuclídeos do inventário e todos os seus descendentes, pais antes dos filhos."""
+    return nucleo_radiologico.ordenar_nuclideos(inventario, CADEIAS_DECAIMENTO)
 
-def gerar_poligono_pluma(lat_origem, lon_origem, comprimento, largura, direcao_vento_graus):
+
+def resolver_cadeias_decaimento(inventario, equilibrio_inicial=True):
     """
-    Gera os pontos geográficos (Lat/Lon) para desenhar a pluma no mapa.
-    
-    Utiliza geometria vetorial para criar uma forma de "gota" (teardrop) que
-    representa a dispersão da nuvem radioativa. A pluma se estende na direção
-    oposta ao vento (vento vem de X, pluma vai para X + 180°).
-    
+    Cadeias de decaimento do inventário com as tabelas deste módulo.
+
     Parâmetros:
-    - lat_origem: Latitude do ponto zero (graus decimais)
-    - lon_origem: Longitude do ponto zero (graus decimais)
-    - comprimento: Comprimento da pluma em metros
-    - largura: Largura máxima da pluma em metros
-    - direcao_vento_graus: Direção de onde vem o vento (0° = Norte)
-    
+    - inventario: Dicionário {nome em ISOTOPOS: atividade inicial (Ci ou fração)}
+    - equilibrio_inicial: Filhos de vida curta já em equilíbrio em t = 0
+
     Retorna:
-    - coords_mapa: Lista de coordenadas [lat, lon] para desenhar o polígono
+    - Dicionário de nucleo_radiologico.resolver_cadeias_decaimento (nuclideos, lam,
+      coef, atividade_inicial e gama_propria em mSv/h·m²/Ci)
     """
-    # Matemática Vetorial: O vento vem de X, a pluma vai para X + 180°.
-    angulo_pluma = (direcao_vento_graus + 180) % 360
-    theta = math.radians(90 - angulo_pluma)  # Ajuste para o Norte geográfico
+    return nucleo_radiologico.resolver_cadeias_decaimento(
+        inventario, CADEIAS_DECAIMENTO, ISOTOPOS, FILHOS_RADIOATIVOS, "gama_const", equilibrio_inicial)
 
-    pontos_base = []
-    n_pontos = 30  # Resolução da curva (número de pontos na metade da gota)
-    
-    # Desenhar metade da gota e espelhar para criar simetria
-    for i in range(n_pontos + 1):
-        t = (i / n_pontos) * math.pi 
-        # Equação paramétrica da forma de "Gota/Lágrima" (teardrop shape)
-        dx_local = comprimento * math.sin(t/2)
-        dy_local = (largura / 2) * math.sin(t) * (dx_local / comprimento) * 2 
-        
-        pontos_base.append((dx_local, dy_local))
-        pontos_base.insert(0, (dx_local, -dy_local))  # Espelhar para criar simetria
-
-    # Converter Metros -> Graus Lat/Lon (Projeção aproximada)
-    # Usa aproximação de esfera para pequenas distâncias (< 100 km)
-    coords_mapa = []
-    r_terra = 6378137  # Raio da Terra em metros (WGS84)
-    
-    for x, y in pontos_base:
-        # Rotacionar os pontos baseado na direção do vento
-        x_rot = x * math.cos(theta) - y * math.sin(theta)
-        y_rot = x * math.sin(theta) + y * math.cos(theta)
-        
-        # Transladar para a coordenada de origem
-        # Conversão: 1 grau de latitude ≈ 111 km, longitude varia com latitude
-        d_lat = (y_rot / r_terra) * (180 / math.pi)
-        d_lon = (x_rot / r_terra) * (180 / math.pi) / math.cos(math.radians(lat_origem))
-        
-        coords_mapa.append([lat_origem + d_lat, lon_origem + d_lon])
-        
-    return coords_mapa
+# =============================================================================
+# 5. PROJEÇÃO DE DOSE AOS RESIDENTES (GROUND SHINE + RESSUSPENSÃO)
+# =============================================================================
+# Todas as vias são somas de exponenciais no tempo (modos de decaimento da
+# cadeia × fator de ressuspensão biexponencial), cujas integrais têm forma fechada:
+#   ∫[t0, t0+T] e^(-λt) dt = e^(-λ·t0)·(1 - e^(-λT))/λ
+# Como o padrão espacial da deposição é o mesmo para todos os isótopos, a dose
+# de cada célula é a deposição multiplicada por um coeficiente de dose por
+# unidade de deposição, calculado uma vez para todos os nuclídeos e horizontes.
+# Baseado em: EPA PAG Manual (2017), FGR-12 (ground shine), ICRP 72
+# (coeficientes de inalação), Anspaugh et al. (1975) - fator de ressuspensão
+
+BQ_POR_CI = 3.7e10
+
+HORIZONTES_PROJECAO = {
+    "2 dias": 48.0,
+    "1 ano": HORAS_POR_ANO,
+    "50 anos": 50 * HORAS_POR_ANO,
+}
+
+# Níveis de ação protetiva (EPA PAG): (horizonte de projeção, dose em mSv)
+NIVEIS_ACAO_PROTETIVA = {
+    "Evacuação/Abrigo (Fase Inicial)": ("2 dias", 10.0),
+    "Relocação": ("1 ano", 20.0),
+    "Restrição de Longo Prazo": ("50 anos", 50.0),
+}
+
+# Ground shine: plano infinito visto a 1 m, com atenuação no ar e rugosidade do solo
+MU_AR_M = 0.0093            # Coeficiente de atenuação linear do ar (~660 keV), 1/m
+ALTURA_RECEPTOR_M = 1.0
+FATOR_RUGOSIDADE = 0.5      # Redução por rugosidade do terreno (FGR-12/EPA)
+FATOR_PLANO_INFINITO = 2 * math.pi * float(exp1(MU_AR_M * ALTURA_RECEPTOR_M))
+
+# Ressuspensão: K(t) = K_curto·e^(-λr·t) + K_longo  (m⁻¹)
+K_RESSUSPENSAO_CURTO = 1e-5
+MEIA_VIDA_RESSUSPENSAO_H = 35 * 24.0
+K_RESSUSPENSAO_LONGO = 1e-9
+TAXA_RESPIRACAO_M3_H = 0.96  # Adulto, atividade leve
+
+
+def _integral_decaimento(lam, inicio, duracao):
+    """∫[inicio, inicio+duracao] e^(-λt) dt, vetorizada e estável para λ → 0."""
+    lam, inicio, duracao = np.broadcast_arrays(np.asarray(lam, float), np.asarray(inicio, float),
+                                               np.asarray(duracao, float))
+    fator = np.where(lam * duracao > 1e-9, -np.expm1(-lam * duracao) / np.where(lam > 0, lam, 1.0), duracao)
+    return np.exp(-lam * inicio) * fator
+
+
+def coeficientes_dose_projetada(inventario, horizontes_h, inicio_h=0.0, fator_ocupacao=1.0,
+                                equilibrio_inicial=True):
+    """
+    Dose projetada por unidade de deposição total (mSv por Ci/m²), por nuclídeo
+    (incluindo os filhos das cadeias), via e horizonte, em uma única operação vetorizada.
+
+    Parâmetros:
+    - inventario: Dicionário {nome em ISOTOPOS: fração da atividade depositada}
+    - horizontes_h: Array de durações de projeção (horas); aceita matriz de
+      combinações com inicio_h por broadcasting
+    - inicio_h: Tempo após a deposição em que a projeção começa (horas)
+    - fator_ocupacao: Fração do tempo ao ar livre equivalente (blindagem de edificações)
+    - equilibrio_inicial: Filhos já em equilíbrio no depósito (ver resolver_cadeias_decaimento)
+
+    Retorna:
+    - ground_shine, inalacao: Arrays (nuclídeos, *horizontes) em mSv por Ci/m²,
+      na ordem de ordenar_nuclideos(inventario)
+    """
+    cadeia = resolver_cadeias_decaimento(inventario, equilibrio_inicial)
+    dcf = np.array([_dados_nuclideo(n).get("dcf_inalacao", 0.0) for n in cadeia["nuclideos"]])
+
+    # Integrais por modo exponencial; a matriz C leva os modos aos nuclídeos
+    forma = (len(cadeia["lam"]),) + (1,) * np.ndim(np.broadcast(horizontes_h, inicio_h))
+    lam_ = cadeia["lam"].reshape(forma)
+    lam_r = math.log(2) / MEIA_VIDA_RESSUSPENSAO_H
+    integral_dec = np.tensordot(cadeia["coef"], _integral_decaimento(lam_, inicio_h, horizontes_h), axes=1)
+    integral_res = np.tensordot(cadeia["coef"], _integral_decaimento(lam_ + lam_r, inicio_h, horizontes_h), axes=1)
+
+    taxa_gs = (cadeia["gama_propria"] * FATOR_PLANO_INFINITO * FATOR_RUGOSIDADE).reshape(forma)
+    ground_shine = fator_ocupacao * taxa_gs * integral_dec
+
+    # Inalação: σ(t)·K(t)·taxa de respiração·DCF, com K biexponencial
+    exposicao = K_RESSUSPENSAO_CURTO * integral_res + K_RESSUSPENSAO_LONGO * integral_dec
+    inalacao = (dcf * BQ_POR_CI * 1000 * TAXA_RESPIRACAO_M3_H).reshape(forma) * exposicao
+    return ground_shine, inalacao
+
+
+def projetar_doses(deposicao, inventario, inicio_h=0.0, fator_ocupacao=1.0, equilibrio_inicial=True):
+    """
+    Projeta a dose aos residentes em cada célula do raster de deposição para
+    os horizontes de HORIZONTES_PROJECAO e classifica a ação protetiva.
+
+    Também estima o tempo de retorno das células em relocação: o primeiro
+    instante a partir do qual a dose do ano seguinte fica abaixo do nível de
+    relocação. Como essa dose é deposição × g(t), basta inverter por
+    interpolação a envoltória não crescente de g (máximo de g no futuro, que
+    cobre o crescimento de filhos) para todas as células de uma vez.
+
+    Parâmetros:
+    - deposicao: Array (qualquer forma) de deposição total em Ci/m²
+    - inventario: Dicionário {nome em ISOTOPOS: fração da atividade depositada}
+    - inicio_h: Início da projeção após a deposição (horas)
+    - fator_ocupacao: Fração do tempo ao ar livre equivalente
+    - equilibrio_inicial: Filhos já em equilíbrio no depósito
+
+    Retorna:
+    - Dicionário com doses {horizonte: array mSv}, acao (array de inteiros:
+      0 = sem ação, k = k-ésimo nível de NIVEIS_ACAO_PROTETIVA, o mais restritivo atingido),
+      tempo_retorno_anos (array; NaN fora da relocação, inf se > 200 anos) e
+      componentes (DataFrame com coeficientes por nuclídeo, via e horizonte)
+    """
+    deposicao = np.asarray(deposicao, dtype=float)
+    nomes_h = list(HORIZONTES_PROJECAO)
+    duracoes = np.array([HORIZONTES_PROJECAO[h] for h in nomes_h])
+    gs, inal = coeficientes_dose_projetada(inventario, duracoes, inicio_h, fator_ocupacao, equilibrio_inicial)
+    coef_total = (gs + inal).sum(axis=0)
+
+    doses = {h: deposicao * c for h, c in zip(nomes_h, coef_total)}
+
+    # Níveis em ordem decrescente de restrição: o primeiro atingido prevalece
+    acao = np.zeros(deposicao.shape, dtype=int)
+    niveis = list(NIVEIS_ACAO_PROTETIVA.values())
+    for k in range(len(niveis), 0, -1):
+        horizonte, limite = niveis[k - 1]
+        acao = np.where(doses[horizonte] >= limite, k, acao)
+
+    # Tempo de retorno: g(t) = dose do próximo ano começando em t, por Ci/m²
+    _, limite_reloc = NIVEIS_ACAO_PROTETIVA["Relocação"]
+    t_grade = np.concatenate([[0.0], np.geomspace(1.0, 200 * HORAS_POR_ANO, 400)])
+    gs_t, inal_t = coeficientes_dose_projetada(inventario, HORIZONTES_PROJECAO["1 ano"],
+                                               inicio_h + t_grade, fator_ocupacao, equilibrio_inicial)
+    g = np.maximum.accumulate((gs_t + inal_t).sum(axis=0)[::-1])[::-1]
+    relocados = doses["1 ano"] >= limite_reloc
+    with np.errstate(divide="ignore"):
+        alvo = np.where(relocados, limite_reloc / np.maximum(deposicao, 1e-300), np.nan)
+    tempo_retorno = np.interp(alvo, g[::-1], t_grade[::-1], left=np.inf) / HORAS_POR_ANO
+    tempo_retorno = np.where(relocados, tempo_retorno, np.nan)
+
+    componentes = pd.DataFrame([
+        {"Nuclídeo": nome, "Origem": "Inventário" if nome in inventario else "Filho (decaimento)",
+         "Horizonte": h, "Fração Inicial": inventario.get(nome, 0.0),
+         "Ground Shine (mSv por Ci/m²)": gs[i, j], "Inalação (mSv por Ci/m²)": inal[i, j]}
+        for i, nome in enumerate(ordenar_nuclideos(inventario)) for j, h in enumerate(nomes_h)
+    ])
+    return {"doses": doses, "acao": acao, "tempo_retorno_anos": tempo_retorno, "componentes": componentes}
 
 # =============================================================================
-# 4. INTERFACE VISUAL (FRONT-END)
+# 6. INTERFACE VISUAL (FRONT-END)
 # =============================================================================
 def renderizar():
     st.title("RDD - Dispersão de Material Radioativo")
@@ -339,7 +653,8 @@ def renderizar():
         * Assume condições meteorológicas estáveis (sem mudanças de vento)
         * Não considera topografia complexa (montanhas, vales)
         * Usa fração de liberação fixa (20%) - na realidade varia com tipo de explosivo e material
-        * Não modela decaimento radioativo temporal (assume atividade constante)
+        * Pluma gaussiana em terreno aberto (Briggs) com deposição seca e depleção; não modela deposição úmida nem queda balística dos fragmentos grandes
+        * As zonas de deposição não consideram decaimento; o decaimento entra apenas na projeção de dose
         * Não considera chuvas ou outras condições atmosféricas que afetam deposição
         
         Para análises detalhadas, utilize modelos atmosféricos avançados (CALPUFF, AERMOD, HYSPLIT).
@@ -363,6 +678,12 @@ def renderizar():
                                    help="Velocidade do vento em metros por segundo. Valores típicos: Calmaria (< 1 m/s), Leve (1-3 m/s), Moderado (3-7 m/s), Forte (> 7 m/s). Ventos muito fracos podem fazer a nuvem ficar estacionária (muito perigoso).")
         vento_dir = st.number_input("Direção do Vento (graus)", min_value=0, max_value=360, value=90, 
                                    help="Direção DE ONDE vem o vento (direção de origem). 0° = Norte, 90° = Leste, 180° = Sul, 270° = Oeste. A pluma se desloca na direção oposta.")
+        classe_estab = st.selectbox("Classe de Estabilidade Atmosférica", list(CLASSES_ESTABILIDADE.keys()), index=3,
+                                    format_func=lambda c: f"{c} - {CLASSES_ESTABILIDADE[c]['desc']}",
+                                    help="Classe de Pasquill-Gifford. Atmosferas estáveis (E, F) mantêm a pluma concentrada por distâncias maiores.")
+        v_deposicao = st.number_input("Velocidade de Deposição Seca (m/s)", min_value=0.001, max_value=0.5, value=0.01,
+                                      step=0.005, format="%.3f",
+                                      help="Aerossol fino: ~0.001-0.01 m/s. Particulado grosso de explosão: até 0.1 m/s ou mais.")
 
     with col2:
         st.subheader("Termo Fonte (Características da Ameaça)")
@@ -380,6 +701,29 @@ def renderizar():
         atividade = st.number_input("Atividade Estimada (Curies - Ci)", min_value=1.0, value=100.0, step=10.0, 
                                    help="Atividade radioativa total da fonte em Curies. Fontes órfãs geralmente têm entre 10 e 200 Ci. Fontes de radioterapia podem ter milhares de Curies.")
         
+        with st.expander("Fonte Mista (Inventário Multi-Isótopo)"):
+            st.caption("Isótopos adicionais presentes no dispositivo (ex.: fontes de origens diferentes "
+                       "reunidas). Os filhos radioativos (Ba-137m, Y-90, Rn-222...) são gerados "
+                       "automaticamente pelas cadeias de decaimento.")
+            df_adicionais = st.data_editor(
+                pd.DataFrame({"Isótopo": pd.Series([], dtype=str), "Atividade (Ci)": pd.Series([], dtype=float)}),
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Isótopo": st.column_config.SelectboxColumn(options=list(ISOTOPOS.keys()), required=True),
+                    "Atividade (Ci)": st.column_config.NumberColumn(min_value=0.0, required=True),
+                },
+                key="rdd_inventario"
+            ).dropna()
+
+        inventario_ci = {nome_iso: atividade}
+        for _, linha in df_adicionais.iterrows():
+            inventario_ci[linha["Isótopo"]] = inventario_ci.get(linha["Isótopo"], 0.0) + float(linha["Atividade (Ci)"])
+        atividade_total = sum(inventario_ci.values())
+        if len(inventario_ci) > 1:
+            st.caption(f"**Inventário:** {len(inventario_ci)} isótopos, {atividade_total:.1f} Ci no total")
+
         explosivo = st.number_input("Massa do Explosivo (kg TNT equivalente)", min_value=0.5, value=10.0, step=1.0, 
                                    help="Massa do explosivo em quilogramas de TNT equivalente. Mochila-bomba típica: 5-10 kg. Carro-bomba: 50-500 kg. Quanto maior, maior a altura da nuvem e área afetada.")
 
@@ -396,10 +740,14 @@ def renderizar():
     # Exibição dos Resultados
     if st.session_state['rdd_calculado']:
         
-        gama_const = dados_iso.get('gama_const', 3.3)  # Usa constante gama do isótopo
-        zonas, altura_nuvem, df_detalhado = calcular_pluma_rdd(atividade, explosivo, vento_vel, vento_dir, gama_const)
+        # Constante gama da mistura (ponderada pela atividade, filhos em equilíbrio)
+        gama_const = sum(ISOTOPOS[n].get('gama_const', 0.0) * a for n, a in inventario_ci.items()) / atividade_total
+        zonas, altura_nuvem, df_detalhado = calcular_pluma_rdd(atividade_total, explosivo, vento_vel, vento_dir,
+                                                               gama_const, classe_estab, v_deposicao)
+        raster = calcular_raster_deposicao(atividade_total, explosivo, vento_vel, vento_dir, classe_estab, v_deposicao)
+        rotulo_fonte = nome_iso if len(inventario_ci) == 1 else f"FONTE MISTA ({len(inventario_ci)} ISÓTOPOS)"
         
-        st.success(f"**SIMULAÇÃO CONCLUÍDA PARA {nome_iso.upper()}**")
+        st.success(f"**SIMULAÇÃO CONCLUÍDA PARA {rotulo_fonte.upper()}**")
         
         # Métricas principais
         st.markdown("### Resultados da Simulação")
@@ -421,6 +769,11 @@ def renderizar():
                      delta="Alerta",
                      help="Zona de monitoramento - abrigo no local recomendado")
         
+        if raster['deposicao_maxima'] < min(LIMITES_INTERVENCAO.values()):
+            st.info(f"**Nenhuma área atinge os limites de intervenção.** A deposição máxima calculada é "
+                    f"{raster['deposicao_maxima']:.2e} Ci/m² (limite de monitoramento: "
+                    f"{min(LIMITES_INTERVENCAO.values()):.0e} Ci/m²). O mapa mostra isopletas informativas abaixo dos limites.")
+
         # Tabela detalhada
         st.markdown("### Detalhamento das Zonas de Contaminação")
         st.dataframe(df_detalhado, use_container_width=True, hide_index=True)
@@ -432,18 +785,20 @@ def renderizar():
         col_info1, col_info2 = st.columns(2)
         with col_info1:
             st.markdown(f"""
-            **Atividade Total:** {atividade:.1f} Ci  
-            **Atividade Efetiva (20% liberada):** {atividade * 0.20:.1f} Ci  
+            **Atividade Total:** {atividade_total:.1f} Ci  
+            **Atividade Efetiva (20% liberada):** {atividade_total * FRACAO_LIBERADA:.1f} Ci  
             **Carga Explosiva:** {explosivo:.1f} kg TNT  
             **Velocidade do Vento:** {vento_vel:.1f} m/s  
             **Direção do Vento:** {vento_dir}° (origem)
             """)
         with col_info2:
             st.markdown(f"""
-            **Constante Gama:** {gama_const:.2f} mSv/h·m²/Ci  
+            **Constante Gama{' (Média da Mistura)' if len(inventario_ci) > 1 else ''}:** {gama_const:.2f} mSv/h·m²/Ci  
             **Meia-vida:** {dados_iso['meia_vida']}  
             **Tipo de Radiação:** {dados_iso['energia']}  
-            **Área Total Contaminada (Zona Amarela):** {zonas['Monitoramento/Abrigo']['area']/1e6:.2f} km²
+            **Área Total Contaminada (Zona Amarela):** {zonas['Monitoramento/Abrigo']['area']/1e6:.2f} km²  
+            **Deposição Máxima:** {raster['deposicao_maxima']:.2e} Ci/m²  
+            **Estabilidade / Deposição Seca:** Classe {classe_estab} / {v_deposicao:.3f} m/s
             """)
 
         # --- MAPA FOLIUM ---
@@ -455,8 +810,8 @@ def renderizar():
         # Marcador do Epicentro (Ponto Zero)
         folium.Marker(
             [lat, lon], 
-            tooltip=f"<b>PONTO ZERO (Epicentro)</b><br>Explosivo: {explosivo:.1f} kg TNT<br>Atividade: {atividade:.1f} Ci {nome_iso}<br>Altura da Nuvem: {altura_nuvem:.1f} m",
-            popup=f"<b>Local da Detonação</b><br>Isótopo: {nome_iso}<br>Atividade: {atividade:.1f} Ci<br>Explosivo: {explosivo:.1f} kg TNT",
+            tooltip=f"<b>PONTO ZERO (Epicentro)</b><br>Explosivo: {explosivo:.1f} kg TNT<br>Atividade: {atividade_total:.1f} Ci {rotulo_fonte}<br>Altura da Nuvem: {altura_nuvem:.1f} m",
+            popup=f"<b>Local da Detonação</b><br>Fonte: {rotulo_fonte}<br>Atividade: {atividade_total:.1f} Ci<br>Explosivo: {explosivo:.1f} kg TNT",
             icon=folium.Icon(color="black", icon="radiation", prefix="fa")
         ).add_to(m)
 
@@ -468,37 +823,156 @@ def renderizar():
             "Monitoramento/Abrigo": "Zona Amarela - Monitoramento/Abrigo"
         }
         
+        # Isopletas informativas (décadas abaixo dos limites, até 1/1000 do máximo)
+        dep_max = raster['deposicao_maxima']
+        if dep_max > 0:
+            decadas = 10.0 ** np.arange(np.floor(np.log10(dep_max)), np.log10(dep_max) - 3, -1)
+            for nivel_info in decadas[decadas < min(LIMITES_INTERVENCAO.values())]:
+                for anel in extrair_isocontornos(raster['deposicao'], raster['x_vento'], raster['y_vento'], nivel_info):
+                    folium.PolyLine(
+                        converter_para_latlon(lat, lon, vento_para_leste_norte(raster, anel)).tolist(),
+                        color="gray", weight=1.5, dash_array="5, 5",
+                        tooltip=f"Isopleta informativa: {nivel_info:.0e} Ci/m²"
+                    ).add_to(m)
+
         for nivel in ordem:
             dados = zonas[nivel]
-            poligono = gerar_poligono_pluma(lat, lon, dados['comprimento'], dados['largura'], vento_dir)
-            
-            folium.Polygon(
-                locations=poligono,
-                color=dados['cor'],
-                fill=True,
-                fill_color=dados['cor'],
-                fill_opacity=0.4,
-                weight=3,
-                tooltip=f"<b>{nomes_legenda[nivel]}</b><br>Comprimento: {dados['comprimento']:.0f} m<br>Largura: {dados['largura']:.0f} m<br>Área: {dados['area']/1e6:.2f} km²<br>Contaminação: {LIMITES_INTERVENCAO[nivel]:.4f} Ci/m²",
-                popup=f"<b>{nomes_legenda[nivel]}</b><br>Comprimento: {dados['comprimento']:.0f} m<br>Largura: {dados['largura']:.0f} m<br>Área: {dados['area']/1e6:.2f} km²<br>Contaminação: {LIMITES_INTERVENCAO[nivel]:.4f} Ci/m²<br>Taxa de Dose (centro): {dados['dose_rate_centro']:.2f} mSv/h"
-            ).add_to(m)
+            for anel in dados['isopletas']:
+                folium.Polygon(
+                    locations=converter_para_latlon(lat, lon, anel).tolist(),
+                    color=dados['cor'],
+                    fill=True,
+                    fill_color=dados['cor'],
+                    fill_opacity=0.4,
+                    weight=3,
+                    tooltip=f"<b>{nomes_legenda[nivel]}</b><br>Comprimento: {dados['comprimento']:.0f} m<br>Largura: {dados['largura']:.0f} m<br>Área: {dados['area']/1e6:.2f} km²<br>Contaminação: {LIMITES_INTERVENCAO[nivel]:.4f} Ci/m²",
+                    popup=f"<b>{nomes_legenda[nivel]}</b><br>Comprimento: {dados['comprimento']:.0f} m<br>Largura: {dados['largura']:.0f} m<br>Área: {dados['area']/1e6:.2f} km²<br>Contaminação: {LIMITES_INTERVENCAO[nivel]:.4f} Ci/m²<br>Taxa de Dose (centro): {dados['dose_rate_centro']:.2f} mSv/h"
+                ).add_to(m)
 
         # Adicionar legenda
         legend_html = '''
         <div style="position: fixed; 
-                    bottom: 50px; left: 50px; width: 200px; height: 120px; 
+                    bottom: 50px; left: 50px; width: 200px; height: 140px; 
                     background-color: white; border:2px solid grey; z-index:9999; 
                     font-size:12px; padding: 10px">
         <b>Legenda das Zonas</b><br>
         <span style="color: #FF0000;">●</span> Vermelho: Evacuação Imediata<br>
         <span style="color: #FF8C00;">●</span> Laranja: Relocação Temporária<br>
-        <span style="color: #FFD700;">●</span> Amarelo: Monitoramento/Abrigo
+        <span style="color: #FFD700;">●</span> Amarelo: Monitoramento/Abrigo<br>
+        <span style="color: gray;">- - -</span> Isopletas informativas
         </div>
         '''
         m.get_root().html.add_child(folium.Element(legend_html))
         
         st_folium(m, width=None, height=600)
         
+        # --- PROJEÇÃO DE DOSE AOS RESIDENTES ---
+        st.markdown("---")
+        st.markdown("### Projeção de Dose aos Residentes (Ground Shine + Ressuspensão)")
+        st.caption("Dose integrada no tempo com decaimento radioativo de todo o inventário (incluindo o crescimento "
+                   "dos filhos das cadeias de decaimento), em cada célula do raster de deposição. "
+                   "As decisões seguem os níveis de ação protetiva da EPA (PAG): evacuação/abrigo na fase inicial, "
+                   "relocação no primeiro ano e restrição de longo prazo em 50 anos.")
+        c_pd1, c_pd2, c_pd3 = st.columns(3)
+        fator_ocupacao = c_pd1.slider("Fator de Ocupação/Blindagem", 0.1, 1.0, 1.0, 0.05,
+                                      help="Fração do tempo equivalente ao ar livre. 1.0 = conservador; "
+                                           "~0.4-0.6 para população que permanece em edificações.")
+        inicio_proj = c_pd2.number_input("Início da Projeção (horas após a deposição)", min_value=0.0,
+                                         value=0.0, step=12.0,
+                                         help="Momento a partir do qual a dose é integrada (ex.: chegada ou retorno dos residentes).")
+        equilibrio = c_pd3.checkbox("Filhos em equilíbrio na detonação", value=True,
+                                    help="Fontes seladas antigas já contêm os filhos (ex.: Ba-137m no Cs-137). "
+                                         "Desmarque para material recém-purificado, em que os filhos crescem após a deposição.")
+
+        inventario = {nome: a / atividade_total for nome, a in inventario_ci.items()}
+        gs_h, inal_h = coeficientes_dose_projetada(
+            inventario, np.array(list(HORIZONTES_PROJECAO.values())), inicio_proj, fator_ocupacao, equilibrio)
+        coef_h = dict(zip(HORIZONTES_PROJECAO, (gs_h + inal_h).sum(axis=0)))
+        # Grade ampliada até a deposição que produz o menor nível de ação
+        dep_acao = min((lim / coef_h[h] for h, lim in NIVEIS_ACAO_PROTETIVA.values() if coef_h[h] > 0),
+                       default=np.inf)
+        if not np.isfinite(dep_acao):
+            st.info("**Nenhum nível de ação protetiva pode ser atingido:** o inventário não produz dose "
+                    "projetada por ground shine nem por inalação nos horizontes avaliados.")
+        else:
+            raster_dose = calcular_raster_deposicao(atividade_total, explosivo, vento_vel, vento_dir, classe_estab, v_deposicao,
+                                                    nivel_minimo=min(dep_acao, min(LIMITES_INTERVENCAO.values())))
+            projecao = projetar_doses(raster_dose['deposicao'], inventario, inicio_proj, fator_ocupacao, equilibrio)
+            area_celula = raster_dose['area_celula']
+            distancia_celula = np.hypot(*np.meshgrid(raster_dose['x_vento'], raster_dose['y_vento']))
+
+            cols_dose = st.columns(len(HORIZONTES_PROJECAO))
+            for col, horizonte in zip(cols_dose, HORIZONTES_PROJECAO):
+                col.metric(f"Dose Máxima - {horizonte}", f"{projecao['doses'][horizonte].max():.2f} mSv",
+                           help="Maior dose projetada entre as células (indivíduo ao ar livre no ponto mais contaminado)")
+
+            linhas_acao = []
+            for k, (acao_nome, (horizonte, limite)) in enumerate(NIVEIS_ACAO_PROTETIVA.items(), start=1):
+                celulas = projecao['acao'] == k
+                linhas_acao.append({
+                    "Ação Protetiva": acao_nome,
+                    "Critério": f"≥ {limite:.0f} mSv em {horizonte}",
+                    "Área (km²)": celulas.sum() * area_celula / 1e6,
+                    "Distância Máxima (m)": float(distancia_celula[celulas].max()) if celulas.any() else 0.0,
+                })
+            st.dataframe(pd.DataFrame(linhas_acao).style.format({"Área (km²)": "{:.3f}", "Distância Máxima (m)": "{:.0f}"}),
+                         hide_index=True, use_container_width=True)
+
+            retorno = projecao['tempo_retorno_anos']
+            if np.isfinite(retorno).any() or np.isinf(retorno).any():
+                faixas = [(0, 1, "< 1 ano"), (1, 5, "1 a 5 anos"), (5, 30, "5 a 30 anos"), (30, np.inf, "> 30 anos")]
+                df_retorno = pd.DataFrame([
+                    {"Retorno Estimado": rotulo, "Área (km²)": ((retorno >= a) & (retorno < b)).sum() * area_celula / 1e6}
+                    for a, b, rotulo in faixas
+                ] + [{"Retorno Estimado": "Sem retorno em 200 anos", "Área (km²)": np.isinf(retorno).sum() * area_celula / 1e6}])
+                st.markdown("**Tempo de Retorno das Áreas em Relocação** (dose do ano seguinte abaixo de "
+                            f"{NIVEIS_ACAO_PROTETIVA['Relocação'][1]:.0f} mSv, sem descontaminação)")
+                st.dataframe(df_retorno.style.format({"Área (km²)": "{:.3f}"}), hide_index=True, use_container_width=True)
+
+            m_dose = folium.Map(location=[lat, lon], zoom_start=14, tiles="OpenStreetMap")
+            folium.Marker([lat, lon], tooltip="Ponto Zero",
+                          icon=folium.Icon(color="black", icon="radiation", prefix="fa")).add_to(m_dose)
+            cores_acao = ["#8B0000", "#FF4500", "#DAA520"]
+            for (acao_nome, (horizonte, limite)), cor in reversed(list(zip(NIVEIS_ACAO_PROTETIVA.items(), cores_acao))):
+                for anel in extrair_isocontornos(projecao['doses'][horizonte], raster_dose['x_vento'],
+                                                 raster_dose['y_vento'], limite):
+                    folium.Polygon(
+                        converter_para_latlon(lat, lon, vento_para_leste_norte(raster_dose, anel)).tolist(),
+                        color=cor, fill=True, fill_opacity=0.3, weight=2,
+                        tooltip=f"<b>{acao_nome}</b><br>Dose ≥ {limite:.0f} mSv em {horizonte}"
+                    ).add_to(m_dose)
+            st_folium(m_dose, width=None, height=500, key="mapa_dose_projetada")
+
+            with st.expander("Contribuição por Via de Exposição (por unidade de deposição)"):
+                st.dataframe(projecao['componentes'], hide_index=True, use_container_width=True)
+                st.caption("Ground shine: plano infinito a 1 m com atenuação no ar e fator de rugosidade. "
+                           "Inalação: fator de ressuspensão biexponencial, taxa de respiração de adulto e "
+                           "coeficientes de dose ICRP 72. Não inclui ingestão nem intemperismo.")
+
+        with st.expander("Evolução do Inventário (Cadeias de Decaimento)"):
+            cadeia = resolver_cadeias_decaimento(inventario_ci, equilibrio)
+            tempos_h = np.geomspace(1 / 60, 100 * HORAS_POR_ANO, 200)
+            atividades = atividade_no_tempo(cadeia, tempos_h)
+            df_atividade = pd.DataFrame({
+                "Tempo (dias)": np.tile(tempos_h / 24, len(cadeia['nuclideos'])),
+                "Nuclídeo": np.repeat(cadeia['nuclideos'], len(tempos_h)),
+                "Atividade (Ci)": atividades.ravel(),
+            })
+            df_atividade = df_atividade[df_atividade["Atividade (Ci)"] > atividade_total * 1e-6]
+            grafico = alt.Chart(df_atividade).mark_line().encode(
+                x=alt.X("Tempo (dias):Q", scale=alt.Scale(type="log")),
+                y=alt.Y("Atividade (Ci):Q", scale=alt.Scale(type="log")),
+                color="Nuclídeo:N",
+                tooltip=["Nuclídeo", alt.Tooltip("Tempo (dias):Q", format=".3g"),
+                         alt.Tooltip("Atividade (Ci):Q", format=".3g")]
+            ).properties(height=350)
+            st.altair_chart(grafico, use_container_width=True)
+            taxa_1m = cadeia['gama_propria'] @ atividades
+            st.caption(f"Taxa de dose da fonte íntegra a 1 m: {taxa_1m[0]:.2f} mSv/h no início, "
+                       f"{np.interp(24 * 30, tempos_h, taxa_1m):.2f} mSv/h após 30 dias e "
+                       f"{np.interp(HORAS_POR_ANO * 10, tempos_h, taxa_1m):.2f} mSv/h após 10 anos "
+                       "(solução de Bateman para todos os instantes em uma única operação matricial).")
+
         # Recomendações Operacionais
         st.markdown("---")
         st.markdown("### Recomendações Operacionais")
@@ -0,0 +1,236 @@
+import math
+import re
+import numpy as np
+
+# Rotinas numéricas compartilhadas pelos módulos radiológicos (radiologico e
+# nuclear_rdd): leitura de meias-vidas, solução de Bateman das cadeias de
+# decaimento e extração de isocontornos por marching squares. Cada módulo
+# mantém suas próprias tabelas de isótopos e as passa para estas funções.
+
+# =============================================================================
+# 1. MEIAS-VIDAS
+# =============================================================================
+
+HORAS_POR_ANO = 8766.0
+
+_UNIDADES_TEMPO_H = {"segundo": 1 / 3600, "minuto": 1 / 60, "hora": 1.0, "dia": 24.0,
+                     "semana": 168.0, "mes": 730.5, "mês": 730.5, "ano": HORAS_POR_ANO}
+
+
+def converter_meia_vida_h(texto):
+    """
+    Converte a meia-vida textual das tabelas de isótopos (ex.: "30 anos",
+    "6 horas", "4.46 bilhões de anos") em horas. Aceita o ponto como separador
+    de milhar ("1.600 anos") e como decimal ("10.5 anos").
+    """
+    numero_txt = texto.split()[0].replace(",", ".")
+    if re.fullmatch(r"\d{1,3}(\.\d{3})+", numero_txt):
+        numero_txt = numero_txt.replace(".", "")
+    numero = float(numero_txt)
+    texto = texto.lower()
+    if "bilh" in texto:
+        numero *= 1e9
+    elif "milh" in texto:
+        numero *= 1e6
+    for unidade, horas in _UNIDADES_TEMPO_H.items():
+        if unidade in texto:
+            return numero * horas
+    raise ValueError(f"Unidade de meia-vida não reconhecida: {texto}")
+
+# =============================================================================
+# 2. CADEIAS DE DECAIMENTO (SOLUÇÃO DE BATEMAN MATRICIAL)
+# =============================================================================
+# O decaimento com filhos segue dN/dt = M·N, com M triangular (pais antes dos
+# filhos): -λ na diagonal e b·λ_pai abaixo dela. Autovalores distintos permitem
+# escrever a solução como soma de exponenciais, a(t) = C·e^(-λt), de modo que
+# todos os instantes de interesse saem de um único produto matricial.
+
+
+def ordenar_nuclideos(inventario, cadeias):
+    """Nuclídeos do inventário e todos os seus descendentes, pais antes dos filhos."""
+    visitados, pos_ordem = set(), []
+
+    def visitar(nome):
+        if nome in visitados:
+            return
+        visitados.add(nome)
+        for filho, _ in cadeias.get(nome, []):
+            visitar(filho)
+        pos_ordem.append(nome)
+
+    for nome in inventario:
+        visitar(nome)
+    return pos_ordem[::-1]
+
+
+def resolver_cadeias_decaimento(inventario, cadeias, isotopos, filhos, chave_gama, equilibrio_inicial=True):
+    """
+    Solução de Bateman matricial para um inventário multi-isótopo.
+
+    Parâmetros:
+    - inventario: Dicionário {nome em isotopos: atividade inicial (Ci ou fração)}
+    - cadeias: Dicionário pai -> [(filho, razão de ramificação)]
+    - isotopos: Tabela principal; a constante gama tabelada é a da fonte com os
+      filhos em equilíbrio (valor de manual)
+    - filhos: Tabela dos filhos de vida curta, com a constante gama própria
+    - chave_gama: Chave da constante gama nas duas tabelas
+    - equilibrio_inicial: Se True, os filhos de vida mais curta que o pai já
+      estão em equilíbrio em t = 0 (fonte selada envelhecida); se False, partem
+      de zero (material recém-separado quimicamente)
+
+    Retorna:
+    - Dicionário com nuclideos (lista ordenada), lam (1/h), coef (matriz C tal
+      que a_i(t) = Σ_k C[i,k]·e^(-λ_k·t)), atividade_inicial e gama_propria
+      (constante de cada nuclídeo isolado, sem a contribuição dos filhos)
+    """
+    def dados(nome):
+        return isotopos[nome] if nome in isotopos else filhos[nome]
+
+    nuclideos = ordenar_nuclideos(inventario, cadeias)
+    n = len(nuclideos)
+    indice = {nome: i for i, nome in enumerate(nuclideos)}
+    lam = np.array([math.log(2) / converter_meia_vida_h(dados(nome)["meia_vida"]) for nome in nuclideos])
+    ramos = np.zeros((n, n))  # ramos[filho, pai]: razão de ramificação
+    for pai in nuclideos:
+        for filho, razao in cadeias.get(pai, []):
+            ramos[indice[filho], indice[pai]] = razao
+
+    # Razão de equilíbrio a_filho/a_pai = b·λf/(λf - λp), só quando o filho vive menos
+    delta = lam[:, None] - lam[None, :]
+    equilibrio = ramos * np.where(delta > 0, lam[:, None] / np.where(delta > 0, delta, 1.0), 0.0)
+
+    atividade_inicial = np.array([float(inventario.get(nome, 0.0)) for nome in nuclideos])
+    if equilibrio_inicial:
+        for i in range(n):  # ordem topológica: os pais de i já estão resolvidos
+            atividade_inicial[i] += equilibrio[i] @ atividade_inicial
+
+    # Autovetores de M (unitriangulares): v_k resolve (M + λ_k·I)·v = 0 com v_k[k] = 1
+    acoplamento = ramos * lam[None, :]
+    V = np.eye(n)
+    for k in range(n):
+        for j in range(k + 1, n):
+            fonte = acoplamento[j, k:j] @ V[k:j, k]
+            if fonte != 0.0:
+                if delta[j, k] == 0.0:
+                    raise ValueError(f"Meias-vidas coincidentes na cadeia de {nuclideos[k]}")
+                V[j, k] = fonte / delta[j, k]
+    modos = np.linalg.solve(V, atividade_inicial / lam)
+
+    # Constante gama própria: a tabelada (equilíbrio) menos a parcela dos filhos
+    gama_propria = np.array([dados(nome).get(chave_gama, 0.0) for nome in nuclideos], dtype=float)
+    for i in range(n - 1, -1, -1):
+        if nuclideos[i] in isotopos:
+            gama_propria[i] = max(gama_propria[i] - equilibrio[:, i] @ gama_propria, 0.0)
+
+    return {
+        "nuclideos": nuclideos,
+        "lam": lam,
+        "coef": lam[:, None] * V * modos[None, :],
+        "atividade_inicial": atividade_inicial,
+        "gama_propria": gama_propria,
+    }
+
+
+def atividade_no_tempo(cadeia, tempos_h):
+    """
+    Atividade de cada nuclídeo em todos os instantes pedidos.
+
+    Retorna array (nuclídeos, *forma de tempos_h) na unidade do inventário.
+    """
+    t = np.asarray(tempos_h, dtype=float)
+    exponenciais = np.exp(-np.outer(cadeia["lam"], t.ravel()))
+    atividade = (cadeia["coef"] @ exponenciais).reshape((len(cadeia["lam"]),) + t.shape)
+    return np.maximum(atividade, 0.0)  # Remove resíduos de arredondamento (-1e-16)
+
+# =============================================================================
+# 3. ISOCONTORNOS (MARCHING SQUARES)
+# =============================================================================
+
+# Segmentos por caso (bits: 1=canto inf. esq., 2=inf. dir., 4=sup. dir.,
+# 8=sup. esq.). Arestas: 0=inferior, 1=direita, 2=superior, 3=esquerda.
+# Os casos de sela (5 e 10) são resolvidos pela média dos quatro cantos.
+_SEGMENTOS_MS = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 6: [(0, 2)], 7: [(3, 2)],
+    8: [(3, 2)], 9: [(0, 2)], 11: [(1, 2)], 12: [(3, 1)], 13: [(0, 1)], 14: [(3, 0)],
+}
+_SELAS_MS = {
+    # caso: (segmentos com centro acima do nível, segmentos com centro abaixo)
+    5: ([(0, 1), (3, 2)], [(3, 0), (1, 2)]),
+    10: ([(3, 0), (1, 2)], [(0, 1), (3, 2)]),
+}
+
+
+def extrair_isocontornos(campo, x, y, nivel):
+    """
+    Extrai as curvas de nível fechadas de um campo 2D por marching squares.
+
+    A classificação das células e a interpolação dos pontos nas arestas são
+    vetorizadas; os segmentos são então encadeados pelas arestas que
+    compartilham. O campo é cercado por uma borda abaixo do nível, garantindo
+    anéis fechados mesmo quando a curva toca o limite da grade (vale também
+    para campos em escala log10, com valores negativos).
+
+    Para campos que variam com 1/r², passe log10 do campo e do nível: a
+    interpolação linear nas arestas fica muito mais fiel perto das fontes.
+
+    Parâmetros:
+    - campo: Array (ny, nx)
+    - x, y: Coordenadas dos centros das colunas e linhas (espaçamento uniforme)
+    - nivel: Valor da curva de nível
+
+    Retorna:
+    - Lista de arrays (K, 2) com os anéis [x, y], do maior para o menor
+    """
+    dx, dy = x[1] - x[0], y[1] - y[0]
+    v = np.pad(np.asarray(campo, dtype=float), 1, constant_values=min(np.min(campo), nivel) - 1.0)
+    xs = np.concatenate([[x[0] - dx], x, [x[-1] + dx]])
+    ys = np.concatenate([[y[0] - dy], y, [y[-1] + dy]])
+    ny, nx = v.shape
+    acima = v >= nivel
+
+    # Pontos interpolados em todas as arestas horizontais e verticais
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        th = np.nan_to_num(np.clip((nivel - v[:, :-1]) / (v[:, 1:] - v[:, :-1]), 0, 1), nan=0.5)
+        tv = np.nan_to_num(np.clip((nivel - v[:-1, :]) / (v[1:, :] - v[:-1, :]), 0, 1), nan=0.5)
+    pontos = np.vstack([
+        np.stack(np.broadcast_arrays(xs[None, :-1] + th * dx, ys[:, None]), axis=-1).reshape(-1, 2),
+        np.stack(np.broadcast_arrays(xs[None, :], ys[:-1, None] + tv * dy), axis=-1).reshape(-1, 2),
+    ])
+    base_v = ny * (nx - 1)
+
+    caso = acima[:-1, :-1] * 1 + acima[:-1, 1:] * 2 + acima[1:, 1:] * 4 + acima[1:, :-1] * 8
+    centro_acima = (v[:-1, :-1] + v[:-1, 1:] + v[1:, 1:] + v[1:, :-1]) / 4 >= nivel
+    i, j = np.nonzero((caso > 0) & (caso < 15))
+    # Identificador global de cada aresta da célula (i, j): inferior, direita, superior, esquerda
+    arestas = np.stack([i * (nx - 1) + j, base_v + i * nx + j + 1,
+                        (i + 1) * (nx - 1) + j, base_v + i * nx + j], axis=1)
+    casos, centros = caso[i, j], centro_acima[i, j]
+
+    segmentos = [np.zeros((0, 2), dtype=int)]
+    for c, pares in _SEGMENTOS_MS.items():
+        sel = casos == c
+        segmentos += [np.column_stack([arestas[sel, a], arestas[sel, b]]) for a, b in pares]
+    for c, (com_centro, sem_centro) in _SELAS_MS.items():
+        for mascara, pares in ((centros, com_centro), (~centros, sem_centro)):
+            sel = (casos == c) & mascara
+            segmentos += [np.column_stack([arestas[sel, a], arestas[sel, b]]) for a, b in pares]
+
+    # Encadeamento: cada aresta cruzada pertence a exatamente dois segmentos
+    vizinhos = {}
+    for a, b in np.vstack(segmentos).tolist():
+        vizinhos.setdefault(a, []).append(b)
+        vizinhos.setdefault(b, []).append(a)
+    aneis = []
+    while vizinhos:
+        inicio, seguintes = next(iter(vizinhos.items()))
+        anel, anterior, atual = [inicio], inicio, seguintes[0]
+        while atual != inicio:
+            anel.append(atual)
+            opcoes = vizinhos.get(atual, [])
+            proximo = opcoes[0] if opcoes and opcoes[0] != anterior else (opcoes[1] if len(opcoes) > 1 else inicio)
+            anterior, atual = atual, proximo
+        for e in anel:
+            vizinhos.pop(e, None)
+        aneis.append(pontos[anel])
+    aneis.sort(key=len, reverse=True)
+    return aneis
@@ -247,50 +247,87 @@ FATORES_LESAO_COMBINADA = {
 # =============================================================================
 # 2. MOTOR DE CÁLCULO
 # =============================================================================
+# Decaimento do fallout em forma fechada. A primitiva F(t) = ∫0^t R(s) ds tem
+# expressão analítica nos dois modelos, assim como sua inversa; dose em uma
+# janela e stay time saem direto de F e F⁻¹, para arrays de qualquer tamanho.
+#   Regra 7-10:  R(t) = R0·10^(-t/7)      F(t) = (7/ln10)·R0·(1 - 10^(-t/7))
+#   Way-Wigner:  R(t) = R1·t^(-1.2)       F(t) = 5·R1·(tm^(-0.2) - t^(-0.2)) + patamar
+T_MINIMO_WAY_WIGNER_H = 0.5  # Antes de H+0.5 h a equação não vale: taxa mantida em R(0.5 h)
+_K_7_10 = 7.0 / math.log(10)
+
+
+def _escalar_ou_array(valor):
+    return float(valor) if np.ndim(valor) == 0 else valor
+
+
 def calcular_taxa_dose_fallout(taxa_inicial_mSv_h, tempo_horas, usar_regra_7_10=True):
     """
     Calcula taxa de dose de fallout usando Regra dos 7-10 ou Equação de Way-Wigner.
     
     Regra dos 7-10: A cada 7 horas, a taxa cai por fator de 10.
-    Way-Wigner: R(t) = R_1 * t^(-1.2)
+    Way-Wigner: R(t) = R_1 * t^(-1.2), mantida em R(0.5 h) antes de H+0.5 h
+    (o mesmo patamar usado na dose integrada)
+
+    Aceita escalares ou arrays (broadcasting entre taxa e tempo).
     """
-    if tempo_horas <= 0:
-        return taxa_inicial_mSv_h
-    
+    taxa = np.asarray(taxa_inicial_mSv_h, dtype=float)
+    t = np.asarray(tempo_horas, dtype=float)
     if usar_regra_7_10:
         # Regra dos 7-10 (mais conservadora e didática)
-        # A cada 7 horas, divide por 10
-        fator_tempo = (tempo_horas / 7.0)
-        taxa_atual = taxa_inicial_mSv_h / (10 ** fator_tempo)
+        with np.errstate(over="ignore"):
+            taxa_atual = np.where(t <= 0, taxa, np.maximum(taxa / 10 ** (t / 7.0), 0.0))
     else:
         # Equação de Way-Wigner
-        taxa_atual = taxa_inicial_mSv_h * (tempo_horas ** (-1.2))
-    
-    return max(0.0, taxa_atual)
+        taxa_atual = taxa * np.maximum(t, T_MINIMO_WAY_WIGNER_H) ** (-1.2)
+    return _escalar_ou_array(taxa_atual)
+
+
+def _primitiva_fallout(taxa_ref, t, usar_regra_7_10):
+    """Dose acumulada desde a explosão até t (mSv), F(t)."""
+    t = np.maximum(t, 0.0)
+    if usar_regra_7_10:
+        return _K_7_10 * taxa_ref * -np.expm1(-t / 7.0 * math.log(10))
+    tm = T_MINIMO_WAY_WIGNER_H
+    taxa_patamar = taxa_ref * tm ** -1.2
+    t_seguro = np.maximum(t, tm)
+    return taxa_patamar * np.minimum(t, tm) + 5.0 * taxa_ref * (tm ** -0.2 - t_seguro ** -0.2)
+
+
+def _inversa_primitiva_fallout(taxa_ref, dose, usar_regra_7_10):
+    """Instante t em que F(t) = dose; inf se a dose nunca é atingida."""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if usar_regra_7_10:
+            fracao = dose / (_K_7_10 * taxa_ref)
+            return np.where(fracao < 1, -7.0 * np.log10(np.maximum(1 - fracao, 1e-300)), np.inf)
+        tm = T_MINIMO_WAY_WIGNER_H
+        dose_patamar = taxa_ref * tm ** -0.2
+        base = tm ** -0.2 - (dose - dose_patamar) / (5.0 * taxa_ref)
+        apos = np.where(base > 0, np.maximum(base, 1e-300) ** -5.0, np.inf)
+        return np.where(dose <= dose_patamar, dose / (taxa_ref * tm ** -1.2), apos)
 
-def calcular_dose_integrada(taxa_dose_mSv_h, tempo_horas, taxa_inicial_mSv_h=0, is_fallout=False):
+
+def calcular_dose_integrada(taxa_dose_mSv_h, tempo_horas, taxa_inicial_mSv_h=0, is_fallout=False,
+                            tempo_entrada_h=0.0, usar_regra_7_10=True):
     """
     Calcula Dose Total Integrada (TID).
     
     Para taxa constante: D = R * t
-    Para fallout (decai): Integração de R(t) * dt
+    Para fallout (decai): D = F(t_entrada + t) - F(t_entrada), exata
+
+    Todos os parâmetros numéricos aceitam arrays (ex.: tabela de equipes com
+    horários de entrada, durações e taxas diferentes).
     """
-    if is_fallout and taxa_inicial_mSv_h > 0:
-        # Integração numérica do decaimento
-        # D = ∫ R(t) dt de 0 a t
-        num_pontos = max(100, int(tempo_horas * 10))
-        tempos = np.linspace(0, tempo_horas, num_pontos)
-        dt = tempo_horas / num_pontos
-        
-        dose_total = 0.0
-        for t in tempos:
-            taxa_t = calcular_taxa_dose_fallout(taxa_inicial_mSv_h, t, usar_regra_7_10=True)
-            dose_total += taxa_t * dt
-        
-        return dose_total
-    else:
-        # Taxa constante
-        return taxa_dose_mSv_h * tempo_horas
+    taxa = np.asarray(taxa_dose_mSv_h, dtype=float)
+    duracao = np.asarray(tempo_horas, dtype=float)
+    taxa_ref = np.asarray(taxa_inicial_mSv_h, dtype=float)
+    entrada = np.asarray(tempo_entrada_h, dtype=float)
+
+    dose = taxa * duracao
+    if is_fallout:
+        dose_fallout = (_primitiva_fallout(taxa_ref, entrada + duracao, usar_regra_7_10)
+                        - _primitiva_fallout(taxa_ref, entrada, usar_regra_7_10))
+        dose = np.where(taxa_ref > 0, dose_fallout, dose)
+    return _escalar_ou_array(dose)
 
 def calcular_atenuacao_blindagem(dose_inicial, espessura_cm, hvl_cm):
     """
@@ -307,44 +344,32 @@ def calcular_atenuacao_blindagem(dose_inicial, espessura_cm, hvl_cm):
     return dose_protegida
 
 def calcular_stay_time(taxa_dose_mSv_h, limite_operacional_mSv, dose_ja_recebida_mSv=0, 
-                       taxa_inicial_mSv_h=0, is_fallout=False):
+                       taxa_inicial_mSv_h=0, is_fallout=False, tempo_entrada_h=0.0, usar_regra_7_10=True):
     """
     Calcula tempo máximo de permanência (Stay Time).
     
     t_stay = (Limite - Dose_Recebida) / Taxa_Dose
     
-    Para fallout, resolve iterativamente.
+    Para fallout, inverte a dose acumulada analiticamente:
+    t_stay = F⁻¹(F(t_entrada) + Dose_Disponível) - t_entrada (inf se o
+    fallout decai antes de esgotar a dose disponível).
+
+    Todos os parâmetros numéricos aceitam arrays.
     """
-    dose_disponivel = limite_operacional_mSv - dose_ja_recebida_mSv
-    
-    if dose_disponivel <= 0:
-        return 0.0
-    
-    if is_fallout and taxa_inicial_mSv_h > 0:
-        # Resolver iterativamente para fallout
-        tempo_atual = 0.0
-        dose_acumulada = 0.0
-        dt = 0.1  # Passo de 0.1 horas (6 minutos)
-        
-        while dose_acumulada < dose_disponivel and tempo_atual < 1000:  # Limite de segurança
-            taxa_atual = calcular_taxa_dose_fallout(taxa_inicial_mSv_h, tempo_atual)
-            dose_incremento = taxa_atual * dt
-            
-            if dose_acumulada + dose_incremento > dose_disponivel:
-                # Ajuste fino
-                tempo_restante = (dose_disponivel - dose_acumulada) / taxa_atual
-                return tempo_atual + tempo_restante
-            
-            dose_acumulada += dose_incremento
-            tempo_atual += dt
-        
-        return tempo_atual
-    else:
+    taxa = np.asarray(taxa_dose_mSv_h, dtype=float)
+    taxa_ref = np.asarray(taxa_inicial_mSv_h, dtype=float)
+    entrada = np.asarray(tempo_entrada_h, dtype=float)
+    dose_disponivel = np.asarray(limite_operacional_mSv, dtype=float) - np.asarray(dose_ja_recebida_mSv, dtype=float)
+
+    with np.errstate(divide="ignore"):
         # Taxa constante
-        if taxa_dose_mSv_h <= 0:
-            return float('inf')
-        
-        return dose_disponivel / taxa_dose_mSv_h
+        stay = np.where(taxa > 0, dose_disponivel / np.where(taxa > 0, taxa, 1.0), np.inf)
+    if is_fallout:
+        ja_acumulada = _primitiva_fallout(taxa_ref, entrada, usar_regra_7_10)
+        saida = _inversa_primitiva_fallout(taxa_ref, ja_acumulada + dose_disponivel, usar_regra_7_10)
+        stay = np.where(taxa_ref > 0, saida - entrada, stay)
+    stay = np.where(dose_disponivel <= 0, 0.0, np.maximum(stay, 0.0))
+    return _escalar_ou_array(stay)
 
 def avaliar_ars(dose_gy):
     """
@@ -610,6 +635,10 @@ def renderizar():
         taxa_operacao = taxa_dose
         st.warning("**SEM PROTEÇÃO:** Você está recebendo a dose completa da fonte. Considere usar blindagem se disponível.")
 
+    # Fallout: a taxa de referência (H+1) também é reduzida pela blindagem
+    fator_blindagem = taxa_operacao / taxa_dose if taxa_dose > 0 else 1.0
+    entrada_h = tempo_desde_inicio if is_fallout else 0.0
+
     st.markdown("---")
 
     # --- SEÇÃO 3: OPERAÇÃO E LIMITES ---
@@ -651,7 +680,8 @@ def renderizar():
         
         # Calcular dose que será recebida
         if is_fallout:
-            dose_receber = calcular_dose_integrada(taxa_operacao, tempo_operacao, taxa_inicial, is_fallout=True)
+            dose_receber = calcular_dose_integrada(taxa_operacao, tempo_operacao, taxa_inicial * fator_blindagem,
+                                                   is_fallout=True, tempo_entrada_h=entrada_h)
         else:
             dose_receber = calcular_dose_integrada(taxa_operacao, tempo_operacao)
         
@@ -697,13 +727,15 @@ def renderizar():
     if st.session_state.get('rad_tatica_calc', False):
         # Calcular Stay Time
         if is_fallout:
-            stay_time = calcular_stay_time(taxa_operacao, limite_mSv, dose_ja_recebida, taxa_inicial, is_fallout=True)
+            stay_time = calcular_stay_time(taxa_operacao, limite_mSv, dose_ja_recebida, taxa_inicial * fator_blindagem,
+                                           is_fallout=True, tempo_entrada_h=entrada_h)
         else:
             stay_time = calcular_stay_time(taxa_operacao, limite_mSv, dose_ja_recebida)
         
         # Calcular dose total
         if is_fallout:
-            dose_total_calc = calcular_dose_integrada(taxa_operacao, tempo_operacao, taxa_inicial, is_fallout=True) + dose_ja_recebida
+            dose_total_calc = calcular_dose_integrada(taxa_operacao, tempo_operacao, taxa_inicial * fator_blindagem,
+                                                      is_fallout=True, tempo_entrada_h=entrada_h) + dose_ja_recebida
         else:
             dose_total_calc = dose_ja_recebida + (taxa_operacao * tempo_operacao)
         
@@ -723,8 +755,8 @@ def renderizar():
         
         col_res2.metric(
             "Stay Time (Tempo Máximo)",
-            f"{stay_time:.1f} horas",
-            f"{stay_time*60:.0f} minutos",
+            f"{stay_time:.1f} horas" if stay_time < float('inf') else "Ilimitado",
+            f"{stay_time*60:.0f} minutos" if stay_time < float('inf') else "Decaimento antes do limite",
             help="Tempo máximo de permanência antes de atingir o limite de dose"
         )
         
@@ -876,9 +908,10 @@ def renderizar():
             # Comparar com/sem blindagem
             taxa_sem_blindagem = taxa_dose
             stay_time_sem = calcular_stay_time(taxa_sem_blindagem, limite_mSv, dose_ja_recebida, 
-                                               taxa_inicial if is_fallout else 0, is_fallout)
+                                               taxa_inicial if is_fallout else 0, is_fallout, entrada_h)
             
-            aumento_tempo = ((stay_time - stay_time_sem) / stay_time_sem * 100) if stay_time_sem > 0 else 0
+            aumento_tempo = ((stay_time - stay_time_sem) / stay_time_sem * 100
+                             if 0 < stay_time_sem < float('inf') and stay_time < float('inf') else 0)
             
             col_blind1, col_blind2 = st.columns(2)
             
@@ -910,13 +943,8 @@ def renderizar():
         
         tempos_grafico = np.linspace(0, min(stay_time * 1.2, 24), 100)  # Até 24h ou 1.2x stay time
         
-        doses_acumuladas = []
-        for t in tempos_grafico:
-            if is_fallout:
-                dose_t = calcular_dose_integrada(taxa_operacao, t, taxa_inicial, is_fallout=True) + dose_ja_recebida
-            else:
-                dose_t = dose_ja_recebida + (taxa_operacao * t)
-            doses_acumuladas.append(dose_t)
+        doses_acumuladas = dose_ja_recebida + calcular_dose_integrada(
+            taxa_operacao, tempos_grafico, taxa_inicial * fator_blindagem, is_fallout, tempo_entrada_h=entrada_h)
         
         df_evolucao = pd.DataFrame({
             'Tempo (horas)': tempos_grafico,
@@ -947,6 +975,51 @@ def renderizar():
                   "A linha vermelha tracejada indica o limite operacional. "
                   "O ponto onde as linhas se cruzam representa o momento em que você deve sair da zona.")
         
+        # Planejamento de Equipes
+        st.markdown("---")
+        st.markdown("#### Planejamento de Equipes")
+        st.caption("Cada linha é uma equipe com seu próprio horário de entrada, duração e limite. Dose e stay time são "
+                   "calculados para todas as linhas de uma vez, com as integrais exatas do decaimento"
+                   + (" (Regra dos 7-10)." if is_fallout else " (taxa constante)."))
+
+        df_equipes_padrao = pd.DataFrame({
+            'Equipe': ["Alfa", "Bravo", "Charlie", "Delta"],
+            'Entrada (H+h)': [entrada_h, entrada_h + 2, entrada_h + 6, entrada_h + 12],
+            'Duração (h)': [tempo_operacao] * 4,
+            'Dose Prévia (mSv)': [dose_ja_recebida, 0.0, 0.0, 0.0],
+            'Limite (mSv)': [limite_mSv] * 4,
+        })
+        df_equipes = st.data_editor(
+            df_equipes_padrao,
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            key="rad_tatica_equipes"
+        ).dropna()
+
+        if len(df_equipes) > 0:
+            entradas = df_equipes['Entrada (H+h)'].to_numpy(dtype=float)
+            duracoes = df_equipes['Duração (h)'].to_numpy(dtype=float)
+            previas = df_equipes['Dose Prévia (mSv)'].to_numpy(dtype=float)
+            limites = df_equipes['Limite (mSv)'].to_numpy(dtype=float)
+            doses_equipes = previas + calcular_dose_integrada(
+                taxa_operacao, duracoes, taxa_inicial * fator_blindagem, is_fallout, tempo_entrada_h=entradas)
+            stays_equipes = calcular_stay_time(taxa_operacao, limites, previas, taxa_inicial * fator_blindagem,
+                                               is_fallout, tempo_entrada_h=entradas)
+            df_plano = df_equipes.assign(**{
+                'Dose Total (mSv)': doses_equipes,
+                'Stay Time (h)': stays_equipes,
+                'Situação': np.where(doses_equipes > limites, "EXCEDE LIMITE",
+                                     np.where(doses_equipes > 0.8 * limites, "Próximo do limite", "Dentro do limite")),
+            })
+            st.dataframe(df_plano.style.format({'Entrada (H+h)': "{:.1f}", 'Duração (h)': "{:.1f}",
+                                                'Dose Prévia (mSv)': "{:.2f}", 'Limite (mSv)': "{:.0f}",
+                                                'Dose Total (mSv)': "{:.2f}", 'Stay Time (h)': "{:.2f}"}),
+                         use_container_width=True, hide_index=True)
+            if is_fallout:
+                st.caption("Entrar mais tarde reduz a dose: o fallout decai durante a espera. "
+                           "Stay time 'inf' indica que o decaimento impede atingir o limite.")
+
         # Recomendações
         st.markdown("---")
         st.markdown("#### Recomendações Operacionais")
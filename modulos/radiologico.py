@@ -2,7 +2,10 @@ import streamlit as st
 import folium
 from streamlit_folium import st_folium
 import math
+import numpy as np
 import pandas as pd
+from modulos import nucleo_radiologico
+from modulos.nucleo_radiologico import atividade_no_tempo, converter_meia_vida_h, extrair_isocontornos
 
 # =============================================================================
 # 1. BANCO DE DADOS (CONSTANTES GAMA ESPECÍFICAS)
@@ -217,6 +220,23 @@ ISOTOPOS_FONTE = {
     }
 }
 
+# Filhos de vida curta que carregam a emissão gama de alguns pais. A constante
+# "gama" de ISOTOPOS_FONTE é a da fonte em equilíbrio (valor de manual); aqui
+# cada filho tem a sua, por Curie do próprio filho.
+FILHOS_RADIOATIVOS = {
+    "Bário-137m (Ba-137m)": {"gama": 3.5, "meia_vida": "2.55 minutos"},
+    "Radônio-222 + Progênie (Rn-222)": {"gama": 8.25, "meia_vida": "3.82 dias"},
+    "Tório-234 + Pa-234m (Th-234)": {"gama": 0.3, "meia_vida": "24.1 dias"},
+}
+
+# Pai -> [(filho, razão de ramificação)]
+CADEIAS_DECAIMENTO = {
+    "Césio-137 (Cs-137)": [("Bário-137m (Ba-137m)", 0.944)],
+    "Estrôncio-90 (Sr-90)": [("Ítrio-90 (Y-90)", 1.0)],
+    "Rádio-226 (Ra-226)": [("Radônio-222 + Progênie (Rn-222)", 1.0)],
+    "Urânio-238 (U-238)": [("Tório-234 + Pa-234m (Th-234)", 1.0)],
+}
+
 # Limites de Dose Acumulada (Baseado em normas CNEN NN 3.01, ICRP 103, IAEA Safety Standards)
 LIMITES_DOSE = {
     "Zona Quente (Perigo Agudo)": {
@@ -296,7 +316,486 @@ def calcular_zonas_radiacao(atividade_ci, tempo_exposicao_min, gama_factor):
     return raios, dose_a_1m
 
 # =============================================================================
-# 3. INTERFACE VISUAL
+# 3. INVENTÁRIO MULTI-ISÓTOPO (DECAIMENTO COM FILHOS)
+# =============================================================================
+# Uma fonte pode reunir vários isótopos, e alguns deles geram filhos radioativos
+# (Cs-137 -> Ba-137m, Ra-226 -> Rn-222). A atividade de cada nuclídeo é escrita
+# como combinação de exponenciais (solução de Bateman de nucleo_radiologico),
+# a(t) = C·e^(-λt). Com isso a taxa de dose a 1 m em qualquer conjunto de
+# instantes, e a dose integrada na exposição, saem de produtos matriciais, sem
+# laço no tempo.
+
+
+def montar_cadeia_decaimento(inventario_ci, equilibrio_inicial=True):
+    """
+    Resolve o decaimento do inventário (pais e descendentes) em forma matricial.
+
+    Parâmetros:
+        inventario_ci: Dicionário {isótopo de ISOTOPOS_FONTE: atividade em Ci}
+        equilibrio_inicial: True para fonte selada antiga (filhos de vida curta
+            já em equilíbrio com o pai); False para material recém-purificado
+
+    Retorna:
+        Dicionário com nuclideos (pais antes dos filhos), lam (1/h), coef
+        (a_i(t) = Σ_k coef[i,k]·e^(-lam[k]·t), em Ci) e gama_propria (constante
+        de cada nuclídeo isolado, mSv·m²/h·Ci)
+    """
+    return nucleo_radiologico.resolver_cadeias_decaimento(
+        inventario_ci, CADEIAS_DECAIMENTO, ISOTOPOS_FONTE, FILHOS_RADIOATIVOS, "gama", equilibrio_inicial)
+
+
+def taxa_dose_1m_no_tempo(cadeia, tempos_h):
+    """
+    Taxa de dose a 1 m (mSv/h) por nuclídeo em todos os instantes pedidos.
+
+    Retorna array (nuclídeos, len(tempos_h)).
+    """
+    atividade = atividade_no_tempo(cadeia, np.atleast_1d(np.asarray(tempos_h, dtype=float)))
+    return cadeia["gama_propria"][:, None] * atividade
+
+
+def calcular_zonas_inventario(inventario_ci, tempo_exposicao_min, inicio_h=0.0, equilibrio_inicial=True):
+    """
+    Zonas de dose para uma fonte multi-isótopo, com decaimento durante a exposição.
+
+    A dose a 1 m é a integral exata da taxa de dose de todos os nuclídeos entre
+    inicio_h e inicio_h + tempo; os raios seguem a Lei do Inverso do Quadrado
+    de calcular_zonas_radiacao com a constante gama efetiva da mistura.
+
+    Parâmetros:
+        inventario_ci: Dicionário {isótopo de ISOTOPOS_FONTE: atividade em Ci}
+        tempo_exposicao_min: Tempo de exposição em minutos
+        inicio_h: Idade da fonte (horas) quando a exposição começa
+        equilibrio_inicial: Filhos em equilíbrio no instante zero
+
+    Retorna:
+        Tupla: (raios de cada zona, dose a 1 metro, DataFrame por nuclídeo)
+    """
+    cadeia = montar_cadeia_decaimento(inventario_ci, equilibrio_inicial)
+    tempo_h = tempo_exposicao_min / 60.0
+    lam = cadeia["lam"]
+    integral = np.where(lam * tempo_h > 1e-9, -np.expm1(-lam * tempo_h) / lam, tempo_h) * np.exp(-lam * inicio_h)
+    dose_nuclideo = cadeia["gama_propria"] * (cadeia["coef"] @ integral)
+    dose_a_1m = float(dose_nuclideo.sum())
+
+    atividade_total = sum(inventario_ci.values())
+    gama_efetiva = dose_a_1m / (atividade_total * tempo_h) if atividade_total > 0 else 0.0
+    raios, _ = calcular_zonas_radiacao(atividade_total, tempo_exposicao_min, gama_efetiva)
+
+    taxas = taxa_dose_1m_no_tempo(cadeia, [inicio_h, inicio_h + tempo_h])
+    detalhes = pd.DataFrame({
+        "Nuclídeo": cadeia["nuclideos"],
+        "Origem": ["Inventário" if x in inventario_ci else "Filho (decaimento)" for x in cadeia["nuclideos"]],
+        "Gama Própria (mSv·m²/h·Ci)": cadeia["gama_propria"],
+        "Taxa a 1 m no Início (mSv/h)": taxas[:, 0],
+        "Taxa a 1 m no Fim (mSv/h)": taxas[:, 1],
+        "Dose a 1 m (mSv)": dose_nuclideo,
+    })
+    return raios, dose_a_1m, detalhes
+
+# =============================================================================
+# 4. CAMPO DE DOSE MULTI-FONTE (GRADE E ISOCONTORNOS)
+# =============================================================================
+# Várias fontes pontuais (ex.: locais suspeitos numa busca por fonte órfã)
+# somam suas contribuições em cada ponto do terreno:
+#   Taxa(x, y) = Σ_i Γ_i·A_i·B(μr)·e^(-μ·r_i) / r_i²
+# A soma é feita em um broadcast (células × fontes), em blocos de linhas da
+# grade para limitar a memória quando há dezenas de fontes.
+# Os isocontornos das zonas saem do marching squares de nucleo_radiologico.
+
+R_TERRA_M = 6378137.0          # WGS84
+MU_AR_PADRAO = 0.0093          # Atenuação linear do ar para ~660 keV (1/m)
+DISTANCIA_MINIMA_M = 0.5       # Mesma trava visual das zonas circulares
+
+
+def converter_latlon_para_metros(lats, lons, lat_ref, lon_ref):
+    """Projeção local equiretangular: metros a leste (x) e a norte (y) da referência."""
+    x = np.radians(np.asarray(lons, dtype=float) - lon_ref) * R_TERRA_M * math.cos(math.radians(lat_ref))
+    y = np.radians(np.asarray(lats, dtype=float) - lat_ref) * R_TERRA_M
+    return x, y
+
+
+def converter_metros_para_latlon(pontos_xy, lat_ref, lon_ref):
+    """Inverso de converter_latlon_para_metros para um array (K, 2) de [x, y]."""
+    lat = lat_ref + np.degrees(pontos_xy[:, 1] / R_TERRA_M)
+    lon = lon_ref + np.degrees(pontos_xy[:, 0] / (R_TERRA_M * math.cos(math.radians(lat_ref))))
+    return np.column_stack([lat, lon])
+
+
+def calcular_campo_dose(x_fontes, y_fontes, atividades_ci, gamas, x, y, tempo_exposicao_min,
+                        mu_ar=None, buildup=False, fatores_decaimento=None, max_elementos_bloco=4_000_000):
+    """
+    Calcula a taxa de dose e a dose acumulada de N fontes pontuais em uma grade.
+
+    Parâmetros:
+        x_fontes, y_fontes: Posição das fontes em metros (arrays de tamanho N)
+        atividades_ci: Atividade de cada fonte (Ci)
+        gamas: Constante gama de cada fonte (mSv·m²/h·Ci)
+        x, y: Coordenadas das colunas e linhas da grade (metros)
+        tempo_exposicao_min: Tempo de permanência em cada ponto (minutos)
+        mu_ar: Coeficiente de atenuação do ar (1/m), escalar ou por fonte; None desliga
+        buildup: Se True, aplica o fator de buildup linear B = 1 + μr (espalhamento no ar)
+        fatores_decaimento: Atividade média durante a exposição / atividade inicial, por fonte
+        max_elementos_bloco: Limite de células × fontes avaliadas por vez
+
+    Retorna:
+        Dicionário com taxa (ny, nx) em mSv/h, dose (ny, nx) em mSv, x e y
+    """
+    xf, yf, atividades, gamas = (np.atleast_1d(np.asarray(v, dtype=float))
+                                 for v in (x_fontes, y_fontes, atividades_ci, gamas))
+    fontes_forca = gamas * atividades
+    if fatores_decaimento is not None:
+        fontes_forca = fontes_forca * np.asarray(fatores_decaimento, dtype=float)
+    mu = None if mu_ar is None else np.broadcast_to(np.asarray(mu_ar, dtype=float), xf.shape)
+
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    taxa = np.zeros((len(y), len(x)))
+    linhas_bloco = max(1, max_elementos_bloco // max(1, len(x) * len(xf)))
+    for inicio in range(0, len(y), linhas_bloco):
+        yb = y[inicio:inicio + linhas_bloco]
+        r = np.hypot(x[None, :, None] - xf, yb[:, None, None] - yf)
+        r = np.maximum(r, DISTANCIA_MINIMA_M)
+        fator = fontes_forca / r ** 2
+        if mu is not None:
+            fator = fator * np.exp(-mu * r)
+            if buildup:
+                fator = fator * (1.0 + mu * r)
+        taxa[inicio:inicio + linhas_bloco] = fator.sum(axis=-1)
+
+    return {"taxa": taxa, "dose": taxa * tempo_exposicao_min / 60.0, "x": x, "y": y}
+
+
+def gerar_grade_campo(x_fontes, y_fontes, dose_1m_fontes, dose_limite, num_celulas=301):
+    """
+    Grade quadrada que cobre todas as fontes com folga igual ao raio de campo
+    livre em que a dose somada de todas elas cai ao limite mais baixo.
+
+    Retorna: (x, y) em metros
+    """
+    alcance = math.sqrt(max(float(np.sum(dose_1m_fontes)), 0.0) / dose_limite) + 5.0
+    cx = (np.min(x_fontes) + np.max(x_fontes)) / 2
+    cy = (np.min(y_fontes) + np.max(y_fontes)) / 2
+    meia = max(np.ptp(x_fontes), np.ptp(y_fontes)) / 2 + alcance
+    eixo = np.linspace(-meia, meia, num_celulas)
+    return cx + eixo, cy + eixo
+
+
+def _ponto_dentro_anel(ponto, anel):
+    """Teste de paridade (ray casting) vetorizado sobre as arestas do anel."""
+    x0, y0 = anel[:, 0], anel[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    cruza = (y0 > ponto[1]) != (y1 > ponto[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_corte = x0 + (ponto[1] - y0) * (x1 - x0) / (y1 - y0)
+    return bool(np.count_nonzero(cruza & (ponto[0] < x_corte)) % 2)
+
+
+def montar_poligonos_zona(aneis):
+    """
+    Agrupa os anéis de um mesmo nível em polígonos com buracos: um anel contido
+    em um número ímpar de outros é buraco do menor anel externo que o contém.
+
+    Retorna: Lista de listas [anel_externo, buraco, ...]
+    """
+    profundidade = [sum(_ponto_dentro_anel(a[0], b) for b in aneis if b is not a) for a in aneis]
+    poligonos = {k: [a] for k, (a, p) in enumerate(zip(aneis, profundidade)) if p % 2 == 0}
+    for k, (anel, p) in enumerate(zip(aneis, profundidade)):
+        if p % 2 == 1:
+            # Anéis ordenados do maior para o menor: o último externo que contém é o menor
+            donos = [e for e in poligonos if profundidade[e] == p - 1 and _ponto_dentro_anel(anel[0], aneis[e])]
+            if donos:
+                poligonos[donos[-1]].append(anel)
+    return list(poligonos.values())
+
+
+def calcular_zonas_multifonte(fontes, lat_ref, lon_ref, tempo_exposicao_min, atenuacao_ar=True,
+                              buildup=True, inicio_h=0.0, num_celulas=301):
+    """
+    Campo de dose de várias fontes e polígonos de LIMITES_DOSE em lat/lon.
+
+    Parâmetros:
+        fontes: DataFrame com Latitude, Longitude, Isótopo (ISOTOPOS_FONTE) e Atividade (Ci)
+        lat_ref, lon_ref: Origem da projeção local
+        tempo_exposicao_min: Tempo de permanência (minutos)
+        atenuacao_ar, buildup: Liga a atenuação exponencial do ar e o buildup linear
+        inicio_h: Idade das fontes no início da exposição (decaimento, horas)
+        num_celulas: Células por lado da grade
+
+    Retorna:
+        Dicionário com campo (saída de calcular_campo_dose), zonas {nome: polígonos
+        em lat/lon}, areas_m2 {nome: área} e resolucao (m)
+    """
+    xf, yf = converter_latlon_para_metros(fontes["Latitude"], fontes["Longitude"], lat_ref, lon_ref)
+    atividades = fontes["Atividade (Ci)"].to_numpy(dtype=float)
+    gamas = np.array([ISOTOPOS_FONTE[nome]["gama"] for nome in fontes["Isótopo"]])
+
+    # Atividade média na janela de exposição, por fonte (decaimento simples do pai)
+    tempo_h = tempo_exposicao_min / 60.0
+    lam = np.array([math.log(2) / converter_meia_vida_h(ISOTOPOS_FONTE[nome]["meia_vida"])
+                    for nome in fontes["Isótopo"]])
+    fatores = np.exp(-lam * inicio_h) * np.where(lam * tempo_h > 1e-9, -np.expm1(-lam * tempo_h) / (lam * tempo_h), 1.0)
+
+    limite_min = min(d["dose_mSv"] for d in LIMITES_DOSE.values())
+    x, y = gerar_grade_campo(xf, yf, gamas * atividades * fatores * tempo_h, limite_min, num_celulas)
+    campo = calcular_campo_dose(xf, yf, atividades, gamas, x, y, tempo_exposicao_min,
+                                mu_ar=MU_AR_PADRAO if atenuacao_ar else None, buildup=buildup,
+                                fatores_decaimento=fatores)
+
+    resolucao = x[1] - x[0]
+    log_dose = np.log10(np.maximum(campo["dose"], 1e-12))
+    zonas, areas = {}, {}
+    for nome, dados in LIMITES_DOSE.items():
+        aneis = extrair_isocontornos(log_dose, x, y, math.log10(dados["dose_mSv"]))
+        zonas[nome] = [[converter_metros_para_latlon(anel, lat_ref, lon_ref) for anel in poligono]
+                       for poligono in montar_poligonos_zona(aneis)]
+        areas[nome] = float((campo["dose"] >= dados["dose_mSv"]).sum() * resolucao ** 2)
+    return {"campo": campo, "zonas": zonas, "areas_m2": areas, "resolucao": resolucao,
+            "x_fontes": xf, "y_fontes": yf}
+
+# =============================================================================
+# 5. LOCALIZAÇÃO DE FONTE POR LEVANTAMENTO (PROBLEMA INVERSO)
+# =============================================================================
+# Cada leitura de campo é o inverso do quadrado somado ao fundo:
+#   D_k = S / (d_k² + h²) + fundo    (S = Γ·A em mSv·m²/h, h = altura do detector)
+# Longe da fonte o erro é dominado pela flutuação absoluta do fundo; perto
+# dela, pelo erro relativo (multiplicativo) do dosímetro. Por isso as leituras
+# se dividem em dois grupos:
+# - detecções (D_k - fundo > LIMIAR_DETECCAO_SIGMAS·σ_fundo): ajuste em log,
+#   com resíduo Σw·(log(D_k - fundo) + log r_k² - log S)²;
+# - leituras no nível do fundo: ajuste linear, Σv·(D_k - fundo - S/r_k²)², com
+#   v = 1/(σ_fundo² + (ε·D_k)²). Elas não informam o valor do sinal, mas
+#   limitam S em torno de onde foram feitas.
+# Os dois resíduos dependem só de somas das leituras, mantidas para todas as
+# células da grade de candidatos, de modo que uma nova leva de leituras é
+# incorporada sem reprocessar as anteriores. Em cada célula, log S ótimo é a
+# raiz da derivada do resíduo total (bissecção vetorizada), e a posterior
+# (prior uniforme) sai do resíduo mínimo.
+
+ERRO_RELATIVO_LEITURA = 0.2     # Incerteza relativa típica de dosímetro portátil
+ERRO_FUNDO_MSV_H = 1e-4         # Flutuação absoluta do fundo (0.1 µSv/h)
+LIMIAR_DETECCAO_SIGMAS = 3.0    # Sinal líquido mínimo (em σ do fundo) para ajuste em log
+FUNDO_PADRAO_MSV_H = 1e-4       # Radiação de fundo natural típica (0.1 µSv/h)
+ALTURA_DETECTOR_M = 1.0
+COLUNAS_LEITURAS = {
+    "latitude": "Latitude", "lat": "Latitude",
+    "longitude": "Longitude", "lon": "Longitude", "lng": "Longitude",
+    "taxa de dose (usv/h)": "Taxa (uSv/h)", "taxa (usv/h)": "Taxa (uSv/h)", "usv/h": "Taxa (uSv/h)",
+    "taxa_usv_h": "Taxa (uSv/h)", "dose_rate": "Taxa (uSv/h)", "taxa": "Taxa (uSv/h)",
+}
+
+
+def ler_leituras_csv(arquivo):
+    """
+    Lê um CSV de levantamento (latitude, longitude, taxa de dose em µSv/h),
+    aceitando variações usuais dos nomes de coluna. Linhas incompletas são descartadas.
+    """
+    df = pd.read_csv(arquivo, sep=None, engine="python")
+    df = df.rename(columns={c: COLUNAS_LEITURAS.get(str(c).strip().lower(), c) for c in df.columns})
+    faltantes = {"Latitude", "Longitude", "Taxa (uSv/h)"} - set(df.columns)
+    if faltantes:
+        raise ValueError(f"Colunas ausentes no CSV: {', '.join(sorted(faltantes))}")
+    df = df[["Latitude", "Longitude", "Taxa (uSv/h)"]].apply(pd.to_numeric, errors="coerce").dropna()
+    return df[df["Taxa (uSv/h)"] >= 0].reset_index(drop=True)
+
+
+def _grade_candidatos(x, y, num_celulas, margem_m=None):
+    margem = margem_m if margem_m is not None else max(20.0, 0.5 * max(np.ptp(x), np.ptp(y)))
+    cx, cy = (np.min(x) + np.max(x)) / 2, (np.min(y) + np.max(y)) / 2
+    meia = max(np.ptp(x), np.ptp(y)) / 2 + margem
+    eixo = np.linspace(-meia, meia, num_celulas)
+    return cx + eixo, cy + eixo
+
+
+def iniciar_localizacao(lat_ref, lon_ref, x_grade, y_grade, fundo_msv_h=FUNDO_PADRAO_MSV_H,
+                        altura_detector=ALTURA_DETECTOR_M):
+    """
+    Estado vazio do estimador para uma grade de posições candidatas (metros).
+
+    Retorna: Dicionário com a grade, as somas por célula e as leituras incorporadas
+    """
+    forma = (len(y_grade), len(x_grade))
+    return {
+        "lat_ref": lat_ref, "lon_ref": lon_ref, "x": np.asarray(x_grade, float), "y": np.asarray(y_grade, float),
+        "fundo": fundo_msv_h, "altura": altura_detector,
+        # Detecções (ajuste em log)
+        "s_q": np.zeros(forma), "s_qq": np.zeros(forma), "s_lq": np.zeros(forma),
+        "s_w": 0.0, "s_l": 0.0, "s_ll": 0.0,
+        # Leituras no nível do fundo (ajuste linear)
+        "s_gg": np.zeros(forma), "s_gr": np.zeros(forma), "s_rr": 0.0,
+        "leituras": np.zeros((0, 3)),  # x, y, taxa (mSv/h)
+    }
+
+
+def _acumular_somas(estado, xn, yn, dn, max_elementos_bloco=2_000_000):
+    """
+    Soma as contribuições das leituras (metros, mSv/h) em todas as células, em
+    blocos de leituras com no máximo max_elementos_bloco células × leituras.
+    """
+    x, y = estado["x"], estado["y"]
+    liquido = dn - estado["fundo"]
+    detectada = liquido > LIMIAR_DETECCAO_SIGMAS * ERRO_FUNDO_MSV_H
+    sinal_det = np.where(detectada, liquido, 1.0)
+    log_d = np.log(sinal_det)
+    w = np.where(detectada, 1.0 / (ERRO_RELATIVO_LEITURA ** 2 + (ERRO_FUNDO_MSV_H / sinal_det) ** 2), 0.0)
+    v = np.where(detectada, 0.0, 1.0 / (ERRO_FUNDO_MSV_H ** 2 + (ERRO_RELATIVO_LEITURA * dn) ** 2))
+    tamanho_bloco = max(1, max_elementos_bloco // max(1, len(x) * len(y)))
+    for inicio in range(0, len(dn), tamanho_bloco):
+        bloco = slice(inicio, inicio + tamanho_bloco)
+        q = np.log((x[None, :, None] - xn[bloco]) ** 2 + (y[:, None, None] - yn[bloco]) ** 2 + estado["altura"] ** 2)
+        estado["s_q"] += q @ w[bloco]
+        estado["s_lq"] += q @ (w[bloco] * log_d[bloco])
+        estado["s_gg"] += np.exp(-2 * q) @ v[bloco]
+        estado["s_gr"] += np.exp(-q) @ (v[bloco] * liquido[bloco])
+        q *= q
+        estado["s_qq"] += q @ w[bloco]
+    estado["s_w"] += float(w.sum())
+    estado["s_l"] += float((w * log_d).sum())
+    estado["s_ll"] += float((w * log_d ** 2).sum())
+    estado["s_rr"] += float((v * liquido ** 2).sum())
+    estado["leituras"] = np.vstack([estado["leituras"], np.column_stack([xn, yn, dn])])
+
+
+def atualizar_localizacao(estado, lats, lons, taxas_msv_h):
+    """
+    Incorpora novas leituras ao estimador sem reprocessar as anteriores.
+
+    Se as leituras saírem da grade de candidatos, a grade é recriada cobrindo
+    todas as leituras e o histórico é reprocessado uma única vez.
+
+    Parâmetros:
+        estado: Saída de iniciar_localizacao (ou de uma atualização anterior)
+        lats, lons: Posição das leituras
+        taxas_msv_h: Taxa de dose medida (mSv/h)
+
+    Retorna: O estado atualizado
+    """
+    xn, yn = converter_latlon_para_metros(lats, lons, estado["lat_ref"], estado["lon_ref"])
+    dn = np.asarray(taxas_msv_h, dtype=float)
+    x, y = estado["x"], estado["y"]
+    if len(xn) and (xn.min() < x[0] or xn.max() > x[-1] or yn.min() < y[0] or yn.max() > y[-1]):
+        todas = np.vstack([estado["leituras"], np.column_stack([xn, yn, dn])])
+        xg, yg = _grade_candidatos(todas[:, 0], todas[:, 1], len(x))
+        novo = iniciar_localizacao(estado["lat_ref"], estado["lon_ref"], xg, yg, estado["fundo"], estado["altura"])
+        estado.clear()
+        estado.update(novo)
+        xn, yn, dn = todas.T
+    _acumular_somas(estado, xn, yn, dn)
+    return estado
+
+
+def _ajuste_por_celula(estado, iteracoes=60):
+    """
+    log S ótimo e resíduo χ² em cada célula, somando o ajuste em log das
+    detecções e o ajuste linear das leituras no nível do fundo.
+    """
+    soma = estado["s_l"] + estado["s_q"]
+    s_w, s_gg, s_gr = estado["s_w"], estado["s_gg"], estado["s_gr"]
+
+    def derivada(log_s):  # metade de dχ²/d(log S)
+        sinal = np.exp(log_s)
+        return s_w * log_s - soma + sinal * (s_gg * sinal - s_gr)
+
+    # A derivada vai de negativa (S → 0) a positiva (S → ∞): bissecção em log S
+    baixo = np.full(soma.shape, math.log(1e-12))
+    alto = np.full(soma.shape, math.log(1e8))
+    for _ in range(iteracoes):
+        meio = (baixo + alto) / 2
+        positiva = derivada(meio) > 0
+        alto = np.where(positiva, meio, alto)
+        baixo = np.where(positiva, baixo, meio)
+    log_s = (baixo + alto) / 2
+    sinal = np.exp(log_s)
+    chi2 = (estado["s_ll"] + 2 * estado["s_lq"] + estado["s_qq"] - 2 * soma * log_s + s_w * log_s ** 2
+            + estado["s_rr"] - 2 * sinal * s_gr + s_gg * sinal ** 2)
+    return log_s, np.maximum(chi2, 0.0)
+
+
+def _posterior(estado):
+    log_s, chi2 = _ajuste_por_celula(estado)
+    post = np.exp(-0.5 * (chi2 - chi2.min()))
+    return post / post.sum(), log_s, chi2
+
+
+def _desvio_radial(post, X, Y):
+    """Desvio padrão radial da posição sob a posterior (metros)."""
+    x_medio, y_medio = (post * X).sum(), (post * Y).sum()
+    return math.sqrt(float((post * ((X - x_medio) ** 2 + (Y - y_medio) ** 2)).sum()))
+
+
+def estimar_fonte(estado, gama, credibilidade=0.95, refinar=True, celulas_refino=61):
+    """
+    Estimativa bayesiana da posição e da atividade da fonte.
+
+    Parâmetros:
+        estado: Estimador com leituras incorporadas
+        gama: Constante gama do isótopo suspeito (mSv·m²/h·Ci), para converter S em Ci
+        credibilidade: Massa de probabilidade da região de credibilidade
+        refinar: Reavalia as leituras em uma grade fina em torno do máximo da
+            posterior (janela de ±4 desvios), onde são extraídos os resultados
+
+    Retorna:
+        Dicionário com lat, lon, atividade_ci, taxa_1m (mSv/h), incerteza_m
+        (desvio padrão radial da posterior), regiao (anéis lat/lon da região de
+        credibilidade), posterior (ny, nx) com seus eixos x, y e chi2_reduzido
+    """
+    post, log_s, chi2 = _posterior(estado)
+    if refinar and len(estado["leituras"]):
+        X, Y = np.meshgrid(estado["x"], estado["y"])
+        i, j = np.unravel_index(np.argmax(post), post.shape)
+        passo = estado["x"][1] - estado["x"][0]
+        meia = min(max(3 * passo, 4 * _desvio_radial(post, X, Y)), np.ptp(estado["x"]) / 2)
+        fino = iniciar_localizacao(estado["lat_ref"], estado["lon_ref"],
+                                   X[i, j] + np.linspace(-meia, meia, celulas_refino),
+                                   Y[i, j] + np.linspace(-meia, meia, celulas_refino),
+                                   estado["fundo"], estado["altura"])
+        _acumular_somas(fino, *estado["leituras"].T)
+        estado = fino
+        post, log_s, chi2 = _posterior(estado)
+
+    X, Y = np.meshgrid(estado["x"], estado["y"])
+    k, m = np.unravel_index(np.argmax(post), post.shape)
+
+    # Região de credibilidade: células de maior densidade até acumular a massa pedida
+    ordenada = np.sort(post.ravel())[::-1]
+    limiar = ordenada[min(np.searchsorted(np.cumsum(ordenada), credibilidade), len(ordenada) - 1)]
+    aneis = extrair_isocontornos(post, estado["x"], estado["y"], limiar)
+
+    lat_est, lon_est = converter_metros_para_latlon(np.array([[X[k, m], Y[k, m]]]),
+                                                    estado["lat_ref"], estado["lon_ref"])[0]
+    taxa_1m = float(np.exp(log_s[k, m]))
+    return {
+        "lat": float(lat_est), "lon": float(lon_est),
+        "taxa_1m": taxa_1m,
+        "atividade_ci": taxa_1m / gama if gama > 0 else float("nan"),
+        "incerteza_m": max(_desvio_radial(post, X, Y), (estado["x"][1] - estado["x"][0]) / 2),
+        "regiao": [converter_metros_para_latlon(anel, estado["lat_ref"], estado["lon_ref"]) for anel in aneis],
+        "posterior": post, "x": estado["x"], "y": estado["y"],
+        "chi2_reduzido": float(chi2[k, m]) / max(len(estado["leituras"]) - 3, 1),
+    }
+
+
+def simular_levantamento(lat_fonte, lon_fonte, taxa_1m, num_leituras=200, raio_m=60.0, fundo=1e-4, semente=None):
+    """
+    Leituras sintéticas de um levantamento em ziguezague ao redor de uma fonte
+    (para treinamento), com ruído relativo de ERRO_RELATIVO_LEITURA.
+
+    Retorna: DataFrame com Latitude, Longitude e Taxa (uSv/h)
+    """
+    rng = np.random.default_rng(semente)
+    # Trajeto da equipe: faixas paralelas deslocadas em relação à fonte
+    u = np.linspace(0, 1, num_leituras)
+    faixas = 6
+    x = (np.mod(u * faixas, 1.0) * 2 - 1) * raio_m * np.where(np.floor(u * faixas) % 2 == 0, 1, -1)
+    y = (np.floor(u * faixas) / (faixas - 1) * 2 - 1) * raio_m
+    x += rng.normal(0, 2.0, num_leituras) + rng.uniform(-0.3, 0.3) * raio_m
+    y += rng.normal(0, 2.0, num_leituras) + rng.uniform(-0.3, 0.3) * raio_m
+    taxa = taxa_1m / (x ** 2 + y ** 2 + ALTURA_DETECTOR_M ** 2) + fundo
+    taxa = np.maximum(taxa * (1 + rng.normal(0, ERRO_RELATIVO_LEITURA, num_leituras)), 0.0)
+    lat, lon = converter_metros_para_latlon(np.column_stack([x, y]), lat_fonte, lon_fonte).T
+    return pd.DataFrame({"Latitude": lat, "Longitude": lon, "Taxa (uSv/h)": taxa * 1000})
+
+# =============================================================================
+# 6. INTERFACE VISUAL
 # =============================================================================
 def renderizar():
     st.title("Irradiação de Ponto Fixo")
@@ -415,6 +914,33 @@ def renderizar():
         st.caption("**Nota:** O cálculo assume fonte 'nua' (sem blindagem adicional de chumbo ou concreto). "
                   "Se a fonte estiver blindada, as zonas de risco serão menores.")
 
+        with st.expander("Fonte Mista e Decaimento"):
+            st.caption("Outros isótopos presentes no mesmo local (ex.: depósito de fontes apreendidas). "
+                       "Os filhos radioativos (Ba-137m, Rn-222...) entram automaticamente.")
+            df_adicionais = st.data_editor(
+                pd.DataFrame({"Isótopo": pd.Series([], dtype=str), "Atividade (Ci)": pd.Series([], dtype=float)}),
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Isótopo": st.column_config.SelectboxColumn(options=list(ISOTOPOS_FONTE.keys()), required=True),
+                    "Atividade (Ci)": st.column_config.NumberColumn(min_value=0.0, required=True),
+                },
+                key="radio_inventario"
+            ).dropna()
+            inicio_exposicao_h = st.number_input(
+                "Início da Exposição (horas após a medição da atividade)", value=0.0, min_value=0.0, step=1.0,
+                help="Relevante para isótopos de vida curta (Na-24, Tc-99m): a atividade informada decai até a chegada da equipe.")
+            equilibrio = st.checkbox(
+                "Filhos em equilíbrio com o pai", value=True,
+                help="Fontes seladas já contêm os filhos (ex.: Ba-137m no Cs-137, que emite o gama). "
+                     "Desmarque para material recém-purificado.")
+
+        inventario_ci = {fonte_nome: atividade}
+        for _, linha in df_adicionais.iterrows():
+            inventario_ci[linha["Isótopo"]] = inventario_ci.get(linha["Isótopo"], 0.0) + float(linha["Atividade (Ci)"])
+        atividade_total = sum(inventario_ci.values())
+
     # Estado
     if 'radio_calc' not in st.session_state:
         st.session_state['radio_calc'] = False
@@ -425,18 +951,22 @@ def renderizar():
     # Resultados
     if st.session_state['radio_calc']:
         
-        raios, dose_1m = calcular_zonas_radiacao(atividade, tempo, dados_fonte['gama'])
+        raios, dose_1m, df_nuclideos = calcular_zonas_inventario(inventario_ci, tempo, inicio_exposicao_h, equilibrio)
         
         st.markdown("---")
         st.markdown("### Resultados da Análise")
         
-        # Alerta se isótopo não emite gama
-        if dados_fonte['gama'] == 0.0:
+        # Alerta se o inventário não emite gama
+        if dose_1m == 0.0:
             st.warning("**Atenção:** Este isótopo não emite radiação gama significativa. As zonas calculadas são "
                       "para exposição externa. O risco principal é de contaminação interna se o material for liberado "
                       "e inalado ou ingerido.")
         
         st.info(f"**Dose Potencial a 1 Metro:** {dose_1m:.2f} mSv em {tempo} minutos de exposição.")
+
+        if len(df_nuclideos) > 1 or inicio_exposicao_h > 0:
+            with st.expander("Contribuição por Nuclídeo (com Decaimento Durante a Exposição)"):
+                st.dataframe(df_nuclideos, use_container_width=True, hide_index=True)
         
         # Métricas visuais
         st.markdown("#### Zonas de Dose por Distância")
@@ -460,7 +990,7 @@ def renderizar():
         # Marcador da fonte
         folium.Marker(
             [lat, lon],
-            popup=f"<b>Fonte Radioativa</b><br>Isótopo: {fonte_nome}<br>Atividade: {atividade:.1f} Ci<br>"
+            popup=f"<b>Fonte Radioativa</b><br>Isótopos: {', '.join(inventario_ci)}<br>Atividade: {atividade_total:.1f} Ci<br>"
                  f"Tempo de Exposição: {tempo} min<br>Dose a 1m: {dose_1m:.2f} mSv",
             tooltip="Localização da Fonte",
             icon=folium.Icon(color="purple", icon="exclamation-triangle", prefix="fa")
@@ -507,8 +1037,8 @@ def renderizar():
         with st.expander("Recomendações Operacionais", expanded=False):
             st.markdown(f"""
             **Cenário Analisado:**
-            - **Isótopo:** {fonte_nome}
-            - **Atividade:** {atividade:.1f} Ci
+            - **Isótopo(s):** {', '.join(inventario_ci)}
+            - **Atividade:** {atividade_total:.1f} Ci
             - **Tempo de Exposição:** {tempo} minutos
             - **Dose a 1 Metro:** {dose_1m:.2f} mSv
             
@@ -554,4 +1084,192 @@ def renderizar():
             **Importante:** Este modelo assume fonte pontual sem blindagem. Se a fonte estiver blindada ou em 
             recipiente de transporte, as zonas de risco serão menores. Sempre valide com medições de campo usando 
             equipamentos de detecção apropriados.
-            """)
\ No newline at end of file
+            """)
+    # --- CAMPO MULTI-FONTE ---
+    st.markdown("---")
+    st.markdown("### Campo de Dose Multi-Fonte (Busca de Fontes Órfãs)")
+    st.caption("Soma as contribuições de várias fontes pontuais (fontes conhecidas ou locais suspeitos) em uma grade "
+               "e traça as zonas de dose como polígonos reais, em vez de círculos isolados. Útil quando há dezenas de "
+               "pontos suspeitos ou fontes próximas cujas zonas se sobrepõem.")
+
+    df_fontes_padrao = pd.DataFrame({
+        "Latitude": [lat, lat + 0.0003, lat - 0.0002],
+        "Longitude": [lon, lon + 0.0004, lon + 0.0005],
+        "Isótopo": [fonte_nome, "Césio-137 (Cs-137)", "Irídio-192 (Ir-192)"],
+        "Atividade (Ci)": [atividade, 5.0, 20.0],
+    })
+    df_fontes = st.data_editor(
+        df_fontes_padrao,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Latitude": st.column_config.NumberColumn(format="%.6f", required=True),
+            "Longitude": st.column_config.NumberColumn(format="%.6f", required=True),
+            "Isótopo": st.column_config.SelectboxColumn(options=list(ISOTOPOS_FONTE.keys()), required=True),
+            "Atividade (Ci)": st.column_config.NumberColumn(min_value=0.0, required=True),
+        },
+        key="radio_multifonte"
+    ).dropna()
+
+    c_mf1, c_mf2, c_mf3 = st.columns(3)
+    atenuacao_ar = c_mf1.checkbox("Atenuação do Ar", value=True,
+                                  help=f"Fator e^(-μr) com μ = {MU_AR_PADRAO} /m (~660 keV). Relevante a dezenas de metros.")
+    buildup = c_mf2.checkbox("Buildup (Espalhamento)", value=True, disabled=not atenuacao_ar,
+                             help="Fator de buildup linear B = 1 + μr: fótons espalhados no ar que ainda chegam ao ponto.")
+    num_celulas = c_mf3.select_slider("Resolução da Grade (células por lado)", options=[151, 201, 301, 401, 601],
+                                      value=301)
+
+    if 'radio_multifonte_calc' not in st.session_state:
+        st.session_state['radio_multifonte_calc'] = False
+
+    if st.button("Calcular Campo Multi-Fonte", use_container_width=True):
+        st.session_state['radio_multifonte_calc'] = True
+
+    if st.session_state['radio_multifonte_calc'] and len(df_fontes) == 0:
+        st.error("Informe ao menos uma fonte na tabela.")
+    elif st.session_state['radio_multifonte_calc']:
+        resultado = calcular_zonas_multifonte(df_fontes, lat, lon, tempo, atenuacao_ar, buildup and atenuacao_ar,
+                                              num_celulas=num_celulas)
+        campo = resultado['campo']
+
+        c_r1, c_r2, c_r3 = st.columns(3)
+        c_r1.metric("Fontes no Campo", f"{len(df_fontes)}",
+                    help=f"Atividade total: {df_fontes['Atividade (Ci)'].sum():.1f} Ci")
+        c_r2.metric(f"Área ≥ {LIMITES_DOSE['Zona Livre (Público)']['dose_mSv']:.0f} mSv",
+                    f"{resultado['areas_m2']['Zona Livre (Público)']:.0f} m²")
+        c_r3.metric("Resolução da Grade", f"{resultado['resolucao']:.2f} m",
+                    help="Zonas com raio menor que ~2 células não aparecem; aumente a resolução se necessário.")
+
+        m_campo = folium.Map(location=[lat, lon], zoom_start=17, tiles="OpenStreetMap")
+        for nome, dados in LIMITES_DOSE.items():
+            for poligono in resultado['zonas'][nome]:
+                folium.Polygon(
+                    locations=[anel.tolist() for anel in poligono] if len(poligono) > 1 else poligono[0].tolist(),
+                    color=dados['cor'], fill=True, fill_color=dados['cor'], fill_opacity=0.25, weight=2,
+                    tooltip=f"<b>{nome}</b><br>Dose ≥ {dados['dose_mSv']} mSv em {tempo} min"
+                ).add_to(m_campo)
+
+        # Taxa de dose no próprio ponto de cada fonte (1 m) para o tooltip
+        for _, fonte in df_fontes.iterrows():
+            folium.CircleMarker(
+                [fonte['Latitude'], fonte['Longitude']], radius=5, color="purple", fill=True, fill_opacity=0.9,
+                tooltip=f"{fonte['Isótopo']}<br>{fonte['Atividade (Ci)']:.1f} Ci<br>"
+                        f"Taxa a 1 m: {ISOTOPOS_FONTE[fonte['Isótopo']]['gama'] * fonte['Atividade (Ci)']:.2f} mSv/h"
+            ).add_to(m_campo)
+        st_folium(m_campo, width=None, height=550, key="mapa_multifonte")
+
+        df_areas = pd.DataFrame({
+            "Zona de Dose": list(LIMITES_DOSE),
+            "Dose Limite (mSv)": [d['dose_mSv'] for d in LIMITES_DOSE.values()],
+            "Área (m²)": [resultado['areas_m2'][n] for n in LIMITES_DOSE],
+            "Polígonos": [len(resultado['zonas'][n]) for n in LIMITES_DOSE],
+        })
+        st.dataframe(df_areas.style.format({"Área (m²)": "{:.1f}"}), use_container_width=True, hide_index=True)
+        st.caption(f"Taxa de dose máxima na grade: {campo['taxa'].max():.2f} mSv/h "
+                   f"(distância mínima de {DISTANCIA_MINIMA_M} m de cada fonte). "
+                   "Decaimento de cada fonte durante a exposição incluído.")
+
+    # --- LOCALIZAÇÃO DE FONTE (PROBLEMA INVERSO) ---
+    st.markdown("---")
+    st.markdown("### Localização de Fonte por Levantamento de Campo")
+    st.caption("Estima a posição e a atividade de uma fonte desconhecida a partir das leituras dos dosímetros "
+               "(latitude, longitude, taxa de dose). As leituras podem chegar aos poucos: cada novo lote é somado "
+               "à estimativa sem reprocessar os anteriores.")
+
+    c_loc1, c_loc2 = st.columns(2)
+    with c_loc1:
+        iso_suspeito = st.selectbox("Isótopo Suspeito", list(ISOTOPOS_FONTE.keys()),
+                                    index=list(ISOTOPOS_FONTE.keys()).index(fonte_nome), key="radio_iso_suspeito",
+                                    help="Usado apenas para converter a intensidade estimada (mSv/h a 1 m) em Curies.")
+        fundo_usv = st.number_input("Radiação de Fundo (µSv/h)", value=FUNDO_PADRAO_MSV_H * 1000, min_value=0.0,
+                                    step=0.05, format="%.2f",
+                                    help="Taxa medida longe da fonte. Leituras próximas do fundo limitam a atividade em vez de medi-la.")
+    with c_loc2:
+        # A chave do uploader muda ao limpar, para que o arquivo já enviado não volte a ser lido
+        st.session_state.setdefault('radio_versao_uploader', 0)
+        arquivo = st.file_uploader("CSV de Leituras (Latitude, Longitude, Taxa em µSv/h)", type=["csv"],
+                                   key=f"radio_csv_leituras_{st.session_state['radio_versao_uploader']}",
+                                   help="Reenvie o arquivo à medida que cresce: apenas as linhas novas são incorporadas.")
+        c_b1, c_b2 = st.columns(2)
+        simular = c_b1.button("Simular Levantamento", use_container_width=True,
+                              help="Gera 100 leituras sintéticas em torno de uma fonte oculta de 5 Ci do isótopo suspeito "
+                                   "(Co-60 se ele não emitir gama), para treinamento.")
+        limpar = c_b2.button("Limpar Leituras", use_container_width=True)
+
+    if 'radio_localizacao' not in st.session_state or limpar:
+        st.session_state['radio_localizacao'] = None
+        st.session_state['radio_linhas_csv'] = {}
+        st.session_state['radio_lotes_simulados'] = 0
+    if limpar:
+        st.session_state['radio_versao_uploader'] += 1
+
+    novas = []
+    if arquivo is not None and not limpar:
+        try:
+            df_csv = ler_leituras_csv(arquivo)
+            processadas = st.session_state['radio_linhas_csv'].get(arquivo.name, 0)
+            if len(df_csv) > processadas:
+                novas.append(df_csv.iloc[processadas:])
+                st.session_state['radio_linhas_csv'][arquivo.name] = len(df_csv)
+        except ValueError as erro:
+            st.error(f"Erro ao ler o CSV: {erro}")
+    if simular:
+        lote = st.session_state['radio_lotes_simulados']
+        gama_simulada = ISOTOPOS_FONTE[iso_suspeito]['gama'] or ISOTOPOS_FONTE["Cobalto-60 (Co-60)"]['gama']
+        novas.append(simular_levantamento(lat + 0.0004, lon - 0.0003, gama_simulada * 5, num_leituras=100,
+                                          fundo=fundo_usv / 1000, semente=lote))
+        st.session_state['radio_lotes_simulados'] = lote + 1
+
+    estado = st.session_state['radio_localizacao']
+    if estado is not None and not math.isclose(estado['fundo'], fundo_usv / 1000):
+        # Fundo alterado: as somas dependem dele, reprocessa o histórico na mesma grade
+        refeito = iniciar_localizacao(estado['lat_ref'], estado['lon_ref'], estado['x'], estado['y'], fundo_usv / 1000)
+        _acumular_somas(refeito, *estado['leituras'].T)
+        estado = refeito
+    for df_novas in novas:
+        if estado is None:
+            lat_ref, lon_ref = df_novas['Latitude'].mean(), df_novas['Longitude'].mean()
+            xg, yg = _grade_candidatos(*converter_latlon_para_metros(df_novas['Latitude'], df_novas['Longitude'],
+                                                                     lat_ref, lon_ref), num_celulas=201)
+            estado = iniciar_localizacao(lat_ref, lon_ref, xg, yg, fundo_usv / 1000)
+        atualizar_localizacao(estado, df_novas['Latitude'], df_novas['Longitude'], df_novas['Taxa (uSv/h)'] / 1000)
+    st.session_state['radio_localizacao'] = estado
+
+    if estado is None or len(estado['leituras']) < 4:
+        st.info("Carregue um CSV ou simule um levantamento para estimar a fonte (mínimo de 4 leituras).")
+        return
+
+    estimativa = estimar_fonte(estado, ISOTOPOS_FONTE[iso_suspeito]['gama'])
+    c_e1, c_e2, c_e3, c_e4 = st.columns(4)
+    c_e1.metric("Leituras Incorporadas", f"{len(estado['leituras'])}")
+    c_e2.metric("Atividade Estimada", f"{estimativa['atividade_ci']:.2f} Ci" if np.isfinite(estimativa['atividade_ci'])
+                else "Γ = 0", help=f"Taxa de dose a 1 m estimada: {estimativa['taxa_1m']:.3f} mSv/h")
+    c_e3.metric("Incerteza da Posição", f"± {estimativa['incerteza_m']:.1f} m",
+                help="Desvio padrão radial da distribuição posterior da posição.")
+    c_e4.metric("χ² Reduzido", f"{estimativa['chi2_reduzido']:.2f}",
+                help="Próximo de 1: leituras compatíveis com uma única fonte pontual sem blindagem.")
+    if estimativa['chi2_reduzido'] > 3:
+        st.warning("As leituras não se ajustam bem a uma única fonte pontual. Possíveis causas: mais de uma fonte, "
+                   "blindagem parcial, contaminação espalhada ou erros de georreferenciamento.")
+
+    m_loc = folium.Map(location=[estimativa['lat'], estimativa['lon']], zoom_start=18, tiles="OpenStreetMap")
+    for anel in estimativa['regiao']:
+        folium.Polygon(anel.tolist(), color="#8e44ad", fill=True, fill_opacity=0.2, weight=2,
+                       tooltip="Região de 95% de credibilidade da posição").add_to(m_loc)
+    leituras_latlon = converter_metros_para_latlon(estado['leituras'][:, :2], estado['lat_ref'], estado['lon_ref'])
+    passo_amostra = max(1, len(leituras_latlon) // 1000)  # Limita os marcadores no navegador
+    for (lat_l, lon_l), taxa_l in zip(leituras_latlon[::passo_amostra], estado['leituras'][::passo_amostra, 2]):
+        taxa_usv = taxa_l * 1000
+        cor = "green" if taxa_usv < 0.5 else "gold" if taxa_usv < 10 else "orange" if taxa_usv < 100 else "red"
+        folium.CircleMarker([lat_l, lon_l], radius=4, color=cor, fill=True, fill_opacity=0.8, weight=1,
+                            tooltip=f"{taxa_usv:.2f} µSv/h").add_to(m_loc)
+    folium.Marker(
+        [estimativa['lat'], estimativa['lon']],
+        tooltip=f"<b>Posição Estimada da Fonte</b><br>{estimativa['atividade_ci']:.2f} Ci de {iso_suspeito}<br>"
+                f"± {estimativa['incerteza_m']:.1f} m",
+        icon=folium.Icon(color="purple", icon="crosshairs", prefix="fa")
+    ).add_to(m_loc)
+    st_folium(m_loc, width=None, height=550, key="mapa_localizacao")
+    st.caption(f"Estimativa: {estimativa['lat']:.6f}, {estimativa['lon']:.6f}. Modelo do inverso do quadrado com "
+               f"detector a {ALTURA_DETECTOR_M:.0f} m e erro relativo de {ERRO_RELATIVO_LEITURA:.0%} por leitura.")
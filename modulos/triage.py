@@ -43,37 +43,243 @@ def calcular_triage(populacao_exposta, gravidade_incidente):
     Retorna:
         Dicionário com distribuição de vítimas por categoria
     """
+    f_vermelho, f_amarelo, f_verde, f_preto = calcular_fracoes_start(gravidade_incidente)
+
+    vitimas = {
+        "Vermelho (Imediato)": int(populacao_exposta * f_vermelho),
+        "Amarelo (Retardado)": int(populacao_exposta * f_amarelo),
+        "Verde (Leve)": int(populacao_exposta * f_verde),
+        "Preto (Expectante/Óbito)": int(populacao_exposta * f_preto)
+    }
+
+    return vitimas
+
+CATEGORIAS_START = ["Vermelho (Imediato)", "Amarelo (Retardado)", "Verde (Leve)", "Preto (Expectante/Óbito)"]
+
+def calcular_fracoes_start(gravidade_incidente):
+    """
+    Calcula as frações de cada categoria START para a gravidade informada.
+
+    Aceita escalar ou array NumPy de gravidades (0.0 a 1.0); a última dimensão do
+    resultado segue a ordem de CATEGORIAS_START.
+
+    Parâmetros:
+        gravidade_incidente: Severidade do incidente (escalar ou array)
+
+    Retorna:
+        Array (..., 4) com as frações Vermelho, Amarelo, Verde e Preto
+    """
+    g = np.asarray(gravidade_incidente, dtype=float)
+
     # Lógica de distribuição estatística baseada em dados históricos de desastres:
     # À medida que a gravidade sobe, a mortalidade (Preto) e casos críticos (Vermelho) aumentam exponencialmente.
-    
+
     # Fator Preto (Óbitos): Curva exponencial acelerada
     # Para gravidade alta, a mortalidade aumenta rapidamente
-    f_preto = (gravidade_incidente ** 2.5) * 0.7
-    
+    f_preto = (g ** 2.5) * 0.7
+
     # Fator Vermelho (Crítico): Curva exponencial moderada
     # Vítimas que requerem tratamento imediato
-    f_vermelho = (gravidade_incidente ** 1.5) * 0.3
-    
+    f_vermelho = (g ** 1.5) * 0.3
+
     # Fator Amarelo (Retardado): Inversamente proporcional à gravidade
     # Vítimas sérias mas estáveis
-    f_amarelo = (1 - gravidade_incidente) * 0.4
-    
+    f_amarelo = (1 - g) * 0.4
+
     # Fator Verde (Leve): O restante após subtrair os casos críticos
     # Vítimas com lesões menores, ambulatoriais
     soma_criticos = f_preto + f_vermelho + f_amarelo
-    f_verde = max(0, 1.0 - soma_criticos)
-    
-    vitimas = {
-        "Vermelho (Imediato)": int(populacao_exposta * f_vermelho),
-        "Amarelo (Retardado)": int(populacao_exposta * f_amarelo),
-        "Verde (Leve)": int(populacao_exposta * f_verde),
-        "Preto (Expectante/Óbito)": int(populacao_exposta * f_preto)
+    f_verde = np.maximum(0, 1.0 - soma_criticos)
+
+    return np.stack([f_vermelho, f_amarelo, f_verde, f_preto], axis=-1)
+
+# =============================================================================
+# 3. GERADOR ESTOCÁSTICO DE VÍTIMAS (FLUXO PARA MODELOS A JUSANTE)
+# =============================================================================
+# Em vez de contagens determinísticas, gera registros individuais de vítimas:
+# - Categoria START: amostragem multinomial com as frações de calcular_fracoes_start
+# - Chegada: processo de Poisson (intervalos exponenciais acumulados)
+# - Local: ponto uniforme no círculo da zona de risco (metros em relação ao centro)
+# - Ambulante: apenas Verdes caminham (definição do START); demais exigem maca
+# - Descontaminação: Bernoulli com a fração de vítimas contaminadas (Pretos excluídos)
+# Os registros são produzidos em lotes vetorizados e entregues sob demanda
+# (gerador), de forma que decon e filas hospitalares consomem o fluxo sem
+# materializar toda a população em memória.
+
+def gerar_fluxo_vitimas(num_vitimas, gravidade_incidente, taxa_chegada_h=None, duracao_chegada_h=2.0,
+                        raio_zona_m=500.0, fracao_contaminados=0.8, semente=None, tamanho_lote=250_000):
+    """
+    Gera um fluxo preguiçoso (lazy) de registros individuais de vítimas.
+
+    Parâmetros:
+        num_vitimas: Número total de vítimas a gerar
+        gravidade_incidente: Severidade do incidente (0.0 a 1.0)
+        taxa_chegada_h: Taxa de chegada ao posto de triagem (vítimas/hora);
+                        padrão = num_vitimas / duracao_chegada_h
+        duracao_chegada_h: Duração média do fluxo de chegada (horas), se taxa não informada
+        raio_zona_m: Raio da zona de risco onde as vítimas são localizadas (metros)
+        fracao_contaminados: Fração de vítimas que necessitam descontaminação (0-1)
+        semente: Semente do gerador aleatório (reprodutibilidade)
+        tamanho_lote: Número de registros gerados por lote
+
+    Retorna:
+        Gerador de DataFrames (lotes) com as colunas: ID, Categoria, Chegada (min),
+        X (m), Y (m), Ambulante, Necessita Descontaminação (vazio se num_vitimas == 0)
+    """
+    # Validação imediata: o gerador interno só executa na primeira iteração
+    if taxa_chegada_h is not None and taxa_chegada_h <= 0:
+        raise ValueError("A taxa de chegada deve ser positiva (vítimas/hora).")
+    if num_vitimas <= 0:
+        return iter(())
+    if taxa_chegada_h is None:
+        taxa_chegada_h = num_vitimas / max(duracao_chegada_h, 1e-9)
+    return _gerar_lotes_vitimas(int(num_vitimas), gravidade_incidente, 60.0 / taxa_chegada_h,
+                                raio_zona_m, fracao_contaminados, semente, tamanho_lote)
+
+def _gerar_lotes_vitimas(num_vitimas, gravidade_incidente, intervalo_medio_min, raio_zona_m,
+                         fracao_contaminados, semente, tamanho_lote):
+    """Gerador dos lotes de vítimas (parâmetros já validados por gerar_fluxo_vitimas)."""
+    rng = np.random.default_rng(semente)
+    fracoes = calcular_fracoes_start(gravidade_incidente)
+    fracoes = fracoes / fracoes.sum()
+
+    codigo_verde = CATEGORIAS_START.index("Verde (Leve)")
+    codigo_preto = CATEGORIAS_START.index("Preto (Expectante/Óbito)")
+    tempo_atual = 0.0
+
+    for inicio in range(0, num_vitimas, tamanho_lote):
+        n = min(tamanho_lote, num_vitimas - inicio)
+
+        # Categoria: contagens multinomiais do lote, embaralhadas na ordem de chegada
+        contagens = rng.multinomial(n, fracoes)
+        codigos = rng.permutation(np.repeat(np.arange(len(CATEGORIAS_START), dtype=np.int8), contagens))
+
+        # Chegadas de Poisson contínuas entre lotes
+        chegadas = tempo_atual + np.cumsum(rng.exponential(intervalo_medio_min, n))
+        tempo_atual = chegadas[-1]
+
+        # Local uniforme no disco (r = R·√u garante densidade uniforme por área)
+        r = raio_zona_m * np.sqrt(rng.random(n))
+        theta = rng.random(n) * 2 * np.pi
+
+        yield pd.DataFrame({
+            'ID': np.arange(inicio, inicio + n),
+            'Categoria': pd.Categorical.from_codes(codigos, CATEGORIAS_START),
+            'Chegada (min)': chegadas,
+            'X (m)': r * np.cos(theta),
+            'Y (m)': r * np.sin(theta),
+            'Ambulante': codigos == codigo_verde,
+            'Necessita Descontaminação': (rng.random(n) < fracao_contaminados) & (codigos != codigo_preto)
+        })
+
+def agregar_chegadas(fluxo, intervalo_min=60.0, categorias=None):
+    """
+    Consome um fluxo de vítimas e conta as chegadas por intervalo de tempo,
+    formato usado como taxa de chegada pelos modelos de fila hospitalar.
+
+    Parâmetros:
+        fluxo: Gerador de lotes produzido por gerar_fluxo_vitimas
+        intervalo_min: Largura do intervalo de agregação (minutos)
+        categorias: Lista de categorias START consideradas (None = todas)
+
+    Retorna:
+        DataFrame com início do intervalo (horas) e chegadas por categoria; a taxa
+        do intervalo (vítimas/hora) é a contagem × 60 / intervalo_min
+    """
+    contagens = {}
+    for lote in fluxo:
+        if categorias is not None:
+            lote = lote[lote['Categoria'].isin(categorias)]
+        indice = (lote['Chegada (min)'].to_numpy() // intervalo_min).astype(int)
+        for codigo, nome in enumerate(CATEGORIAS_START):
+            if categorias is not None and nome not in categorias:
+                continue
+            bins = np.bincount(indice[lote['Categoria'].cat.codes.to_numpy() == codigo])
+            atual = contagens.get(nome, np.zeros(0, dtype=int))
+            tamanho = max(len(atual), len(bins))
+            contagens[nome] = np.pad(atual, (0, tamanho - len(atual))) + np.pad(bins, (0, tamanho - len(bins)))
+
+    n_intervalos = max((len(v) for v in contagens.values()), default=0)
+    df = pd.DataFrame({nome: np.pad(v, (0, n_intervalos - len(v))) for nome, v in contagens.items()})
+    df.insert(0, 'Início (Horas)', np.arange(n_intervalos) * intervalo_min / 60)
+    return df
+
+# =============================================================================
+# 4. TRIAGEM ESPACIAL (RASTER DE PERIGO × RASTER POPULACIONAL)
+# =============================================================================
+# Cada módulo de perigo produz um campo de intensidade em grade (sobrepressão,
+# dose térmica, concentração tóxica). A intensidade de cada célula é convertida
+# em gravidade 0-1 por interpolação logarítmica entre o limiar de efeitos e o
+# nível de ground zero, e a gravidade em frações START pela mesma curva de
+# calcular_fracoes_start. Células abaixo do limiar não geram vítimas.
+
+# limiar: início dos efeitos (gravidade 0) | maximo: ground zero (gravidade 1)
+PERFIS_PERIGO = {
+    "Sobrepressão de Explosão (kPa)": {
+        "limiar": 3.5, "maximo": 350.0,
+        "desc": "3.5 kPa: quebra de vidros | 35 kPa: ruptura de tímpano | 200+ kPa: lesão pulmonar/letal"
+    },
+    "Dose Térmica (TDU)": {
+        "limiar": 40.0, "maximo": 2400.0,
+        "desc": "TDU = (kW/m²)^(4/3)·s | 92: dor | 240: queimadura de 2º grau | 2400: ~50% letalidade"
+    },
+    "Concentração Tóxica (múltiplo do AEGL-1)": {
+        "limiar": 1.0, "maximo": 100.0,
+        "desc": "1: desconforto (AEGL-1) | ~10: efeitos incapacitantes (AEGL-2) | ~100: letal (AEGL-3+)"
     }
-    
-    return vitimas
+}
+
+def converter_intensidade_gravidade(intensidade, limiar, maximo):
+    """
+    Converte um raster de intensidade do agente em gravidade (0.0 a 1.0).
+
+    Parâmetros:
+        intensidade: Array com a intensidade por célula (unidade do perfil)
+        limiar: Intensidade de início dos efeitos (gravidade 0)
+        maximo: Intensidade de ground zero (gravidade 1)
+
+    Retorna:
+        Tupla: (array de gravidade, máscara booleana das células afetadas)
+    """
+    intensidade = np.asarray(intensidade, dtype=float)
+    afetada = intensidade >= limiar
+    gravidade = np.log(np.maximum(intensidade, limiar) / limiar) / np.log(maximo / limiar)
+    return np.clip(gravidade, 0.0, 1.0), afetada
+
+def calcular_triage_espacial(populacao, intensidade, limiar, maximo, semente=None):
+    """
+    Distribui vítimas por célula sobrepondo um raster de perigo a um raster
+    populacional de mesma forma.
+
+    Parâmetros:
+        populacao: Array (ny, nx) com pessoas por célula
+        intensidade: Array (ny, nx) com a intensidade do agente por célula
+        limiar: Intensidade de início dos efeitos
+        maximo: Intensidade de ground zero
+        semente: Se informada, amostra as contagens por multinomial em cada célula;
+                 caso contrário retorna o valor esperado
+
+    Retorna:
+        Tupla: (array (ny, nx, 4) de vítimas por célula na ordem de CATEGORIAS_START,
+                dicionário com o total por categoria)
+    """
+    populacao = np.asarray(populacao, dtype=float)
+    gravidade, afetada = converter_intensidade_gravidade(intensidade, limiar, maximo)
+    fracoes = calcular_fracoes_start(gravidade)
+    fracoes = fracoes / fracoes.sum(axis=-1, keepdims=True)
+    expostos = np.where(afetada, populacao, 0.0)
+
+    if semente is None:
+        vitimas = expostos[..., None] * fracoes
+    else:
+        rng = np.random.default_rng(semente)
+        vitimas = rng.multinomial(np.round(expostos).astype(np.int64), fracoes)
+
+    totais = vitimas.reshape(-1, len(CATEGORIAS_START)).sum(axis=0)
+    return vitimas, {nome: int(round(total)) for nome, total in zip(CATEGORIAS_START, totais)}
 
 # =============================================================================
-# 3. INTERFACE DO USUÁRIO
+# 5. INTERFACE DO USUÁRIO
 # =============================================================================
 def renderizar():
     st.title("Triagem e Carga de Vítimas")
@@ -275,7 +481,51 @@ def renderizar():
         else:
             st.info("**Situação Controlada:** O número de vítimas críticas está dentro da capacidade típica "
                    "de resposta local. Monitore a situação e ajuste conforme necessário.")
-        
+
+        # Fluxo estocástico de chegada (entrada para decon e filas hospitalares)
+        st.markdown("---")
+        st.markdown("#### Fluxo Estocástico de Chegada de Vítimas")
+        st.caption("Cada vítima é amostrada individualmente (categoria START multinomial, chegada por processo de "
+                  "Poisson, local na zona de risco e necessidade de descontaminação). O fluxo alimenta os simuladores "
+                  "de descontaminação e de colapso hospitalar.")
+
+        col_f1, col_f2, col_f3 = st.columns(3)
+        duracao_chegada = col_f1.slider("Duração do Fluxo de Chegada (h)", 0.5, 12.0, 2.0, 0.5,
+                                        help="Tempo médio para todas as vítimas chegarem ao posto de triagem.")
+        fracao_contaminados = col_f2.slider("Vítimas Contaminadas (%)", 0, 100, 80, 5,
+                                            help="Fração das vítimas que necessitam descontaminação.") / 100
+        semente_fluxo = col_f3.number_input("Semente Aleatória", value=42, min_value=0, step=1)
+
+        raio_zona = math.sqrt(area_afetada_m2 / math.pi)
+        fluxo = gerar_fluxo_vitimas(total_expostos, nivel_perigo, duracao_chegada_h=duracao_chegada,
+                                    raio_zona_m=raio_zona, fracao_contaminados=fracao_contaminados,
+                                    semente=int(semente_fluxo))
+        primeiro_lote = None
+
+        def _fluxo_com_amostra():
+            nonlocal primeiro_lote
+            for lote in fluxo:
+                if primeiro_lote is None:
+                    primeiro_lote = lote
+                yield lote
+
+        df_chegadas = agregar_chegadas(_fluxo_com_amostra(), intervalo_min=15.0)
+
+        if not df_chegadas.empty:
+            df_chegadas_long = df_chegadas.melt('Início (Horas)', var_name='Categoria', value_name='Chegadas')
+            chart_chegadas = alt.Chart(df_chegadas_long).mark_bar().encode(
+                x=alt.X('Início (Horas):Q', title="Tempo após o Incidente (Horas)"),
+                y=alt.Y('Chegadas:Q', title="Chegadas por 15 min", stack=True),
+                color=alt.Color('Categoria:N', scale=alt.Scale(domain=CATEGORIAS_START,
+                                range=['#e74c3c', '#f39c12', '#2ecc71', '#34495e'])),
+                tooltip=['Início (Horas)', 'Categoria', 'Chegadas']
+            ).properties(height=300, title="Chegadas ao Posto de Triagem por Categoria")
+            st.altair_chart(chart_chegadas, use_container_width=True)
+
+            n_decon = int(primeiro_lote['Necessita Descontaminação'].sum()) if primeiro_lote is not None else 0
+            st.caption(f"Amostra dos primeiros registros do fluxo ({n_decon} vítimas do primeiro lote necessitam descontaminação):")
+            st.dataframe(primeiro_lote.head(50), use_container_width=True, hide_index=True)
+
         # Recomendações operacionais
         with st.expander("Recomendações Operacionais", expanded=False):
             st.markdown(f"""
@@ -319,4 +569,49 @@ def renderizar():
             
             **Importante:** Esta é uma estimativa baseada em modelos estatísticos. A distribuição real pode variar. 
             Ajuste os recursos conforme informações reais se tornem disponíveis através de triagem de campo.
-            """)
\ No newline at end of file
+            """)
+    # Triagem espacial: raster de perigo sobreposto ao raster populacional
+    st.markdown("---")
+    st.markdown("### Triagem Espacial (Raster de Perigo × População)")
+    st.caption("Em vez de um número único de expostos, a gravidade é calculada célula a célula a partir do campo "
+              "de intensidade do agente e aplicada à população de cada célula.")
+
+    col_e1, col_e2, col_e3 = st.columns(3)
+    tipo_perigo = col_e1.selectbox("Tipo de Campo de Perigo", list(PERFIS_PERIGO.keys()))
+    perfil = PERFIS_PERIGO[tipo_perigo]
+    intensidade_centro = col_e2.number_input("Intensidade no Ponto Zero", value=float(perfil["maximo"]),
+                                             min_value=float(perfil["limiar"]) * 1.01, step=float(perfil["limiar"]))
+    raio_efeitos = col_e3.number_input("Raio até o Limiar de Efeitos (m)", value=500, min_value=10, step=50)
+    st.caption(perfil["desc"])
+
+    # Grade demonstrativa: decaimento exponencial da intensidade e população heterogênea
+    n_celulas = 60
+    extensao = 1.2 * raio_efeitos
+    eixo = np.linspace(-extensao, extensao, n_celulas)
+    xx, yy = np.meshgrid(eixo, eixo)
+    area_celula_km2 = (eixo[1] - eixo[0]) ** 2 / 1_000_000
+    escala = raio_efeitos / np.log(intensidade_centro / perfil["limiar"])
+    campo_intensidade = intensidade_centro * np.exp(-np.hypot(xx, yy) / escala)
+    rng_pop = np.random.default_rng(7)
+    campo_populacao = densidade_ref * area_celula_km2 * rng_pop.lognormal(-0.18, 0.6, campo_intensidade.shape)
+
+    vitimas_celula, totais_espaciais = calcular_triage_espacial(campo_populacao, campo_intensidade,
+                                                                perfil["limiar"], perfil["maximo"])
+
+    ce1, ce2, ce3, ce4 = st.columns(4)
+    for coluna, nome in zip([ce1, ce2, ce3, ce4], CATEGORIAS_START):
+        coluna.metric(nome, f"{totais_espaciais[nome]:,}")
+
+    categoria_mapa = st.selectbox("Categoria no Mapa", CATEGORIAS_START)
+    df_espacial = pd.DataFrame({
+        'X (m)': xx.ravel(), 'Y (m)': yy.ravel(),
+        'Vítimas': vitimas_celula[..., CATEGORIAS_START.index(categoria_mapa)].ravel(),
+        'Intensidade': campo_intensidade.ravel()
+    })
+    mapa_espacial = alt.Chart(df_espacial).mark_rect().encode(
+        x=alt.X('X (m):O', axis=None),
+        y=alt.Y('Y (m):O', axis=None, sort='descending'),
+        color=alt.Color('Vítimas:Q', scale=alt.Scale(scheme='reds'), title="Vítimas/célula"),
+        tooltip=[alt.Tooltip('Vítimas:Q', format='.1f'), alt.Tooltip('Intensidade:Q', format='.1f')]
+    ).properties(height=400, title=f"Distribuição Espacial: {categoria_mapa}")
+    st.altair_chart(mapa_espacial, use_container_width=True)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from modulos.colapso_hospitalar import simular_fila_transiente, simular_rede_hospitalar
+
+
+@pytest.mark.parametrize("rho", [0.5, 0.95, 1.2])
+def test_rede_de_um_hospital_igual_ao_mms_transiente(rho):
+    leitos, mu, dt = 10, 1.5, 1 / 60
+    rede = simular_rede_hospitalar([rho * leitos * mu], [leitos], mu, [[1.0]], horizonte_h=12.0, dt_h=dt)
+    # A rede atrasa as chegadas em um passo (tempo mínimo de viagem)
+    df, _ = simular_fila_transiente(rho * leitos * mu, mu, leitos, np.arange(1, 720) * dt)
+    espera_mms = df['Pacientes Aguardando'].sum() * dt
+    assert rede['espera_total_h'] > 0
+    assert rede['espera_total_h'] == pytest.approx(espera_mms, rel=0.02)
+
+
+def test_menor_carga_reparte_sem_alternar():
+    rede = simular_rede_hospitalar([30.0], [10, 8, 6, 4], 1.5, [[10, 20, 25, 15]], politica="menor_carga")
+    ocupacao = rede['df_evolucao'].pivot(index='Horas após o Início', columns='Hospital', values='Ocupação')
+    variacao = np.abs(np.diff(ocupacao.to_numpy()[60:], axis=0))
+    assert variacao.max() < 0.02
+    assert (ocupacao.iloc[-1] > 0.3).all()
@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+import pytest
+
+from scipy.sparse.csgraph import dijkstra
+
+from modulos.fluxo_humano import (
+    buscar_rota_astar, calcular_rasters_custo, carregar_rede_viaria, construir_grafo_grade, gerar_pluma_movel,
+    rotear_perigo_dinamico,
+)
+
+
+def _custo_exato(n, origem, saidas, pluma, passos_por_fatia, max_passos):
+    """Programação dinâmica por camadas de passo: custo mínimo exato até uma saída."""
+    custo_saida = lambda passo: (1.0 + 50.0 * pluma(passo // passos_por_fatia)).ravel()
+    eh_saida = np.zeros(n * n, dtype=bool)
+    eh_saida[[y * n + x for x, y in saidas]] = True
+    atual = np.full(n * n, np.inf)
+    atual[origem[1] * n + origem[0]] = 0.0
+    melhor = atual[eh_saida].min()
+    for passo in range(max_passos):
+        expandir = np.where(eh_saida, np.inf, atual + custo_saida(passo)).reshape(n, n)
+        proximo = np.full((n, n), np.inf)
+        proximo[1:, :] = np.minimum(proximo[1:, :], expandir[:-1, :])
+        proximo[:-1, :] = np.minimum(proximo[:-1, :], expandir[1:, :])
+        proximo[:, 1:] = np.minimum(proximo[:, 1:], expandir[:, :-1])
+        proximo[:, :-1] = np.minimum(proximo[:, :-1], expandir[:, 1:])
+        atual = proximo.ravel()
+        melhor = min(melhor, atual[eh_saida].min())
+    return melhor
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_rota_dinamica_igual_a_busca_exata(semente):
+    rng = np.random.default_rng(semente)
+    n = 8
+    origem = tuple(int(v) for v in rng.integers(0, n, 2))
+    saidas = [(0, 0), (n - 1, n - 1)]
+    passos_por_fatia = int(rng.integers(1, 4))
+    pluma = gerar_pluma_movel(n, *rng.uniform(0, n, 2), rng.uniform(1, 3), rng.uniform(0.5, 2),
+                              vx=rng.uniform(-1.5, 1.5), vy=rng.uniform(-1.5, 1.5),
+                              crescimento=rng.uniform(0, 0.3))
+    resultado = rotear_perigo_dinamico(n, origem, saidas, pluma, [], passos_por_fatia=passos_por_fatia)
+    exato = _custo_exato(n, origem, saidas, pluma, passos_por_fatia, max_passos=6 * n)
+    assert resultado['custo'] == pytest.approx(exato)
+    assert resultado['rota'][0] == origem and resultado['rota'][-1] in saidas
+    assert resultado['passos_chegada'] == list(range(len(resultado['rota'])))
+
+
+def test_desvio_que_chega_depois_da_pluma():
+    # Corredor livre na linha 2; a célula (2, 2) só é perigosa nos passos 0-2
+    n = 5
+    fundo = np.ones((n, n))
+    fundo[2, :] = 0.0
+    fundo[1, 1:3] = 0.0
+    fatias = []
+    for passo in range(4):
+        raster = fundo.copy()
+        raster[2, 2] = 1.0 if passo < 3 else 0.0
+        fatias.append(raster)
+    resultado = rotear_perigo_dinamico(n, (0, 2), [(4, 2)], fatias, [])
+    assert resultado['custo'] == pytest.approx(6.0)
+    assert resultado['passos_chegada'][resultado['rota'].index((2, 2))] >= 3
+
+
+def test_cache_truncado_da_rede_e_descartado(tmp_path):
+    caminho = tmp_path / "rede.geojson"
+    caminho.write_text(json.dumps({"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {},
+         "geometry": {"type": "LineString", "coordinates": [[-46.63, -23.55], [-46.62, -23.55], [-46.62, -23.54]]}},
+    ]}), encoding="utf-8")
+    cache = tmp_path / "rede.geojson.rede.npz"
+    cache.write_bytes(b"PK\x03\x04truncado")
+
+    rede = carregar_rede_viaria(str(caminho))
+    assert len(rede['lon']) == 3
+    # O cache foi regravado por inteiro e volta a ser lido
+    assert len(carregar_rede_viaria(str(caminho))['lon']) == 3
+    assert not list(tmp_path.glob("*.tmp.npz"))
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_astar_igual_a_dijkstra(semente):
+    rng = np.random.default_rng(semente)
+    n = 25
+    zonas = [{'x': int(rng.integers(0, n)), 'y': int(rng.integers(0, n)), 'raio': float(rng.uniform(2, 6)),
+              'intensidade': float(rng.uniform(0.5, 3))} for _ in range(3)]
+    gargalos = [tuple(int(v) for v in rng.integers(0, n, 2)) for _ in range(5)]
+    saidas = [(0, 0), (n - 1, n - 1), (n - 1, 0)]
+    origem = tuple(int(v) for v in rng.integers(0, n, 2))
+
+    # Referência: Dijkstra do SciPy no grafo CSR da grade (4 vizinhos)
+    grafo = construir_grafo_grade(*calcular_rasters_custo(n, zonas, gargalos))
+    distancias = dijkstra(grafo, indices=origem[1] * n + origem[0])
+    referencia = min(distancias[y * n + x] for x, y in saidas)
+
+    for vizinhanca in (4, 8):
+        base = buscar_rota_astar(n, origem, saidas, zonas, gargalos, heuristica='nenhuma', vizinhanca=vizinhanca)
+        if vizinhanca == 4:
+            assert base['custo'] == pytest.approx(referencia)
+        for heuristica in ('octil', 'euclidiana'):
+            for bidirecional in (False, True):
+                busca = buscar_rota_astar(n, origem, saidas, zonas, gargalos, heuristica=heuristica,
+                                          vizinhanca=vizinhanca, bidirecional=bidirecional)
+                assert busca['custo'] == pytest.approx(base['custo'])
+                assert busca['nos_expandidos'] <= base['nos_expandidos'] or bidirecional
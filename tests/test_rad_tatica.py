@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from modulos.rad_tatica import T_MINIMO_WAY_WIGNER_H, calcular_dose_integrada, calcular_taxa_dose_fallout
+
+
+def test_way_wigner_patamar_antes_de_meia_hora():
+    patamar = 100.0 * T_MINIMO_WAY_WIGNER_H ** -1.2
+    np.testing.assert_allclose(calcular_taxa_dose_fallout(100.0, [0.0, 0.2, 0.5], usar_regra_7_10=False), patamar)
+    assert calcular_taxa_dose_fallout(100.0, 2.0, usar_regra_7_10=False) == pytest.approx(100.0 * 2.0 ** -1.2)
+
+
+@pytest.mark.parametrize("usar_regra_7_10", [True, False])
+def test_taxa_e_derivada_da_dose_integrada(usar_regra_7_10):
+    tempos = np.array([0.1, 0.3, 0.49, 0.6, 2.0, 30.0])
+    h = 1e-6
+    dose = calcular_dose_integrada(0.0, 2 * h, taxa_inicial_mSv_h=100.0, is_fallout=True,
+                                   tempo_entrada_h=tempos - h, usar_regra_7_10=usar_regra_7_10)
+    np.testing.assert_allclose(dose / (2 * h), calcular_taxa_dose_fallout(100.0, tempos, usar_regra_7_10), rtol=1e-5)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from modulos.radiologico import (
+    ISOTOPOS_FONTE, atualizar_localizacao, converter_latlon_para_metros, estimar_fonte,
+    iniciar_localizacao, simular_levantamento, _acumular_somas, _grade_candidatos,
+)
+
+LAT, LON = -23.55, -46.63
+GAMA_CS137 = ISOTOPOS_FONTE["Césio-137 (Cs-137)"]["gama"]
+
+
+def _localizar(df, num_celulas=121, fundo=1e-4):
+    x, y = converter_latlon_para_metros(df["Latitude"], df["Longitude"], LAT, LON)
+    xg, yg = _grade_candidatos(x, y, num_celulas)
+    estado = iniciar_localizacao(LAT, LON, xg, yg, fundo)
+    atualizar_localizacao(estado, df["Latitude"], df["Longitude"], df["Taxa (uSv/h)"] / 1000)
+    estimativa = estimar_fonte(estado, GAMA_CS137)
+    erro_m = np.hypot(*converter_latlon_para_metros(np.array([estimativa["lat"]]),
+                                                    np.array([estimativa["lon"]]), LAT, LON))[0]
+    return estimativa, erro_m
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_levantamento_ate_o_fundo_sem_vies(semente):
+    # 1 Ci de Cs-137, levantamento de ±400 m: a maioria das leituras é só fundo
+    df = simular_levantamento(LAT, LON, GAMA_CS137 * 1.0, num_leituras=200, raio_m=400.0,
+                              fundo=1e-4, semente=semente)
+    estimativa, erro_m = _localizar(df)
+    assert estimativa["atividade_ci"] == pytest.approx(1.0, rel=0.2)
+    assert erro_m < 10.0
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_levantamento_proximo(semente):
+    df = simular_levantamento(LAT, LON, GAMA_CS137 * 1.0, num_leituras=200, raio_m=60.0,
+                              fundo=1e-4, semente=semente)
+    estimativa, erro_m = _localizar(df)
+    assert estimativa["atividade_ci"] == pytest.approx(1.0, rel=0.1)
+    assert erro_m < 2.0
+
+
+def test_leituras_incrementais_equivalem_ao_lote():
+    df = simular_levantamento(LAT, LON, GAMA_CS137 * 2.0, num_leituras=150, raio_m=100.0, semente=7)
+    x, y = converter_latlon_para_metros(df["Latitude"], df["Longitude"], LAT, LON)
+    xg, yg = _grade_candidatos(x, y, 61)
+    lote = iniciar_localizacao(LAT, LON, xg, yg)
+    atualizar_localizacao(lote, df["Latitude"], df["Longitude"], df["Taxa (uSv/h)"] / 1000)
+    partes = iniciar_localizacao(LAT, LON, xg, yg)
+    for inicio in range(0, len(df), 40):
+        bloco = df.iloc[inicio:inicio + 40]
+        atualizar_localizacao(partes, bloco["Latitude"], bloco["Longitude"], bloco["Taxa (uSv/h)"] / 1000)
+    a, b = estimar_fonte(lote, GAMA_CS137), estimar_fonte(partes, GAMA_CS137)
+    assert b["atividade_ci"] == pytest.approx(a["atividade_ci"], rel=1e-9)
+    np.testing.assert_allclose(b["posterior"], a["posterior"], atol=1e-9)
+
+
+def test_blocos_de_leituras_nao_alteram_as_somas():
+    df = simular_levantamento(LAT, LON, GAMA_CS137, num_leituras=120, raio_m=80.0, semente=3)
+    x, y = converter_latlon_para_metros(df["Latitude"], df["Longitude"], LAT, LON)
+    dn = df["Taxa (uSv/h)"].to_numpy() / 1000
+    xg, yg = _grade_candidatos(x, y, 41)
+    inteiro, em_blocos = iniciar_localizacao(LAT, LON, xg, yg), iniciar_localizacao(LAT, LON, xg, yg)
+    _acumular_somas(inteiro, x, y, dn)
+    _acumular_somas(em_blocos, x, y, dn, max_elementos_bloco=41 * 41 * 7)
+    for chave in ("s_q", "s_qq", "s_lq", "s_gg", "s_gr"):
+        np.testing.assert_allclose(em_blocos[chave], inteiro[chave], rtol=1e-12)